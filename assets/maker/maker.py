@@ -12,17 +12,20 @@ from OpenGL.GLU import *
 # -------------------------------------------------
 WIDTH, HEIGHT = 800, 800
 
-pygame.init()
-pygame.display.set_caption("Freehand Drawing, Shapes, Fill, Undo/Redo, Erase, and Save/Load")
-pygame.display.set_mode((WIDTH, HEIGHT), DOUBLEBUF | OPENGL)
-
-# Set up an orthographic projection with (0,0) at the TOP-LEFT.
-glMatrixMode(GL_PROJECTION)
-glLoadIdentity()
-gluOrtho2D(0, WIDTH, HEIGHT, 0)  # Top-left is (0,0); y increases downward.
-glMatrixMode(GL_MODELVIEW)
-glLoadIdentity()
-glClearColor(1.0, 1.0, 1.0, 1.0)  # White background
+def init_window():
+    pygame.init()
+    pygame.display.set_caption("Freehand Drawing, Shapes, Fill, Undo/Redo, Erase, and Save/Load")
+    pygame.display.set_mode((WIDTH, HEIGHT), DOUBLEBUF | OPENGL)
+    setup_view()
+
+def setup_view():
+    # Set up an orthographic projection with (0,0) at the TOP-LEFT.
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluOrtho2D(0, WIDTH, HEIGHT, 0)  # Top-left is (0,0); y increases downward.
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    glClearColor(1.0, 1.0, 1.0, 1.0)  # White background
 
 # -------------------------------------------------
 # Global Drawing State
@@ -390,6 +393,7 @@ def main():
     global current_color, draw_mode
     global start_x, start_y
 
+    init_window()
     clock = pygame.time.Clock()
 
     while True:
@@ -2,6 +2,7 @@ import numpy as np
 import math
 import ctypes
 from OpenGL.GL import *
+from utils.gpu import tracker
 
 def create_rect(x, y, width, height, color):
     """
@@ -62,7 +63,48 @@ def create_square(pos, size, color):
     return vertices.reshape(-1, 6), indices
 
 
+def create_triangle(v1, v2, v3, color):
+    """
+    Creates a single triangle from three [x, y, z] corners with the given color.
+    Returns (vertices, indices) as numpy arrays.
+    """
+    vertices = [*v1, *color, *v2, *color, *v3, *color]
+    indices = [0, 1, 2]
+    return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.uint32)
+
+
+def create_spiked_rect(height, spike_height, color, spike_color, n_spikes=3, flip=False):
+    """
+    Creates a unit-width platform (x in [-0.5, 0.5], bottom edge at y=0) with
+    n_spikes triangles standing on its top edge, or hanging from its bottom
+    edge when flip is True, all in one vertex buffer. Spike spacing and base
+    are proportional to the width, so scaling x alone gives any platform width.
+    Returns (vertices, indices) as numpy arrays.
+    """
+    body_vertices, indices = create_rect(-0.5, 0, 1.0, height, color)
+    vertices = [body_vertices]
+    indices = [indices]
+    spike_base = 1.0 / (n_spikes * 1.5)
+    base_y = 0.0 if flip else height
+    tip_y = -spike_height if flip else height + spike_height
+    for i in range(n_spikes):
+        center_x = -0.5 + (i + 1) / (n_spikes + 1)
+        spike_vertices, spike_indices = create_triangle(
+            [center_x - spike_base/2, base_y, 0.0],
+            [center_x + spike_base/2, base_y, 0.0],
+            [center_x, tip_y, 0.0],
+            spike_color)
+        vertices.append(spike_vertices)
+        indices.append(spike_indices + 4 + 3 * i)
+    return np.concatenate(vertices), np.concatenate(indices)
+
+
 def create_object(vertices, indices):
+    vao, _, _, count = _upload_object(vertices, indices)
+    return vao, count
+
+
+def _upload_object(vertices, indices):
     vao = glGenVertexArrays(1)
     glBindVertexArray(vao)
 
@@ -81,4 +123,76 @@ def create_object(vertices, indices):
     glEnableVertexAttribArray(1)
 
     glBindVertexArray(0)
-    return vao, len(indices)
\ No newline at end of file
+    tracker.created("vertex array", vao)
+    tracker.created("buffer", vbo, vertices.nbytes)
+    tracker.created("buffer", ebo, indices.nbytes)
+    return vao, vbo, ebo, len(indices)
+
+
+# --- Shared mesh registry ---
+# Meshes are keyed by the builder and the arguments they were built from, so
+# every caller asking for the same geometry gets the same (vao, count). Each
+# acquire_mesh must be paired with a release_mesh; the GL objects are deleted
+# once the last user releases them.
+MESH_BUILDERS = {
+    "rect": create_rect,
+    "circle": create_circle,
+    "square": create_square,
+    "triangle": create_triangle,
+    "spiked_rect": create_spiked_rect,
+}
+
+_meshes = {}      # key -> {"mesh": (vao, count), "buffers": (vbo, ebo), "refs": n}
+_mesh_keys = {}   # vao -> key
+
+
+def register_mesh_builder(shape, builder):
+    """Makes a (vertices, indices) builder available to acquire_mesh under the given name."""
+    MESH_BUILDERS[shape] = builder
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def acquire_mesh(shape, *args, **kwargs):
+    """
+    Returns the shared (vao, count) for the given shape and builder arguments,
+    building and uploading it on first use, and adds one reference to it.
+    """
+    key = (shape, _freeze(args), _freeze(sorted(kwargs.items())))
+    entry = _meshes.get(key)
+    if entry is None:
+        vertices, indices = MESH_BUILDERS[shape](*args, **kwargs)
+        vao, vbo, ebo, count = _upload_object(vertices, indices)
+        entry = {"mesh": (vao, count), "buffers": (vbo, ebo), "refs": 0}
+        _meshes[key] = entry
+        _mesh_keys[vao] = key
+    entry["refs"] += 1
+    return entry["mesh"]
+
+
+def release_mesh(mesh):
+    """Drops one reference to a mesh from acquire_mesh, deleting its GL objects on the last one."""
+    key = _mesh_keys.get(mesh[0])
+    if key is None:
+        return
+    entry = _meshes[key]
+    entry["refs"] -= 1
+    if entry["refs"] > 0:
+        return
+    del _meshes[key]
+    del _mesh_keys[mesh[0]]
+    glDeleteVertexArrays(1, [mesh[0]])
+    glDeleteBuffers(2, list(entry["buffers"]))
+    tracker.deleted("vertex array", mesh[0])
+    tracker.deleted("buffer", *entry["buffers"])
+
+
+def mesh_stats():
+    """Returns (live meshes, outstanding references) held by the registry."""
+    return len(_meshes), sum(entry["refs"] for entry in _meshes.values())
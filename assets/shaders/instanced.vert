@@ -0,0 +1,11 @@
+#version 330 core
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in vec3 aColor;
+layout (location = 2) in vec2 iOffset;
+layout (location = 3) in vec2 iScale;
+layout (location = 4) in vec3 iColor;
+out vec3 vColor;
+void main(){
+    gl_Position = vec4(aPos.xy * iScale + iOffset, aPos.z, 1.0);
+    vColor = aColor * iColor;
+}
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Frame-time benchmark for the biomes and the shape maker.
+
+Each biome runs for a fixed number of frames with a seeded world and a seeded
+input script, one simulation tick per frame, so two runs on the same machine
+do the same work. The maker redraws a seeded canvas while a scripted freehand
+stroke is dragged across it. Per-frame update time, render time, total frame
+time and OpenGL call counts are summarized and written as JSON:
+
+    python benchmark.py                          # everything, uncapped
+    python benchmark.py space --entities 1000    # stress the asteroid pool
+    python benchmark.py --fps 60 --output capped.json
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import importlib
+import functools
+from collections import Counter
+
+import pygame
+from OpenGL.GL import glFinish, glGetString, GL_RENDERER, GL_VERSION
+
+from utils.window_manager import WindowManager
+from utils.loop import TICK_RATE
+from utils.pool import ProjectilePool
+from utils.sim import BIOMES, random_script
+from utils.profiler import GLCallCounter, draw_calls, summarize
+
+TARGETS = (*BIOMES, "maker")
+MAKER_STROKES = 50
+
+
+def asteroid(rng):
+    radius = rng.uniform(0.03, 0.07)
+    return rng.uniform(-1.0, 1.1), rng.uniform(-0.9, 0.9), -rng.uniform(0.1, 0.3), radius, radius
+
+
+def arrow(rng):
+    vx = rng.choice([-1, 1]) * rng.uniform(0.3, 0.6)
+    return rng.uniform(-1.1, 1.1), rng.uniform(-0.8, 0.8), vx, 0.1, 0.1
+
+
+# Projectile pool each biome can be flooded with via --entities, and how to
+# spawn one on screen: rng -> (x, y, vx, w, h).
+STRESS = {
+    "space": ("asteroids", asteroid),
+    "upside_down": ("arrows", arrow),
+}
+
+
+def top_up(sim, biome, entities, rng):
+    """Respawns projectiles until the biome's pool holds `entities` of them."""
+    attr, spawn_args = STRESS[biome]
+    pool = getattr(sim, attr)
+    if pool.capacity < entities:
+        pool = ProjectilePool(entities)
+        setattr(sim, attr, pool)
+    while pool.count < entities:
+        pool.spawn(*spawn_args(rng))
+
+
+def measure(wm, frames, warmup, update, render, counter):
+    """
+    Calls update() then render() once per frame and summarizes their timings.
+    render() must present the frame itself.
+    """
+    clock = pygame.time.Clock()
+    frame_ms, update_ms, render_ms = [], [], []
+    gl_calls, draws = [], []
+    totals = Counter()
+    last = time.perf_counter()
+    for frame in range(warmup + frames):
+        pygame.event.pump()
+        start = time.perf_counter()
+        update(frame)
+        updated = time.perf_counter()
+        render()
+        # Wait for the GPU so each frame's render time includes its own work
+        # rather than whatever the driver deferred from earlier frames.
+        glFinish()
+        rendered = time.perf_counter()
+        counts = counter.take() if counter else Counter()
+        if wm.max_fps:
+            clock.tick(wm.max_fps)
+        now = time.perf_counter()
+        if frame >= warmup:
+            frame_ms.append((now - last) * 1000.0)
+            update_ms.append((updated - start) * 1000.0)
+            render_ms.append((rendered - updated) * 1000.0)
+            gl_calls.append(sum(counts.values()))
+            draws.append(draw_calls(counts))
+            totals.update(counts)
+        last = now
+
+    result = {
+        "frame_ms": summarize(frame_ms),
+        "update_ms": summarize(update_ms),
+        "render_ms": summarize(render_ms),
+    }
+    if counter:
+        result["gl_calls_per_frame"] = summarize(gl_calls)
+        result["draw_calls_per_frame"] = summarize(draws)
+        result["top_gl_calls"] = {name: count / frames for name, count in totals.most_common(10)}
+    return result
+
+
+def run_biome(wm, biome, module, frames, warmup, seed, entities, counter):
+    random.seed(seed)
+    rng = random.Random(seed)
+    script = random_script(seed)
+    view = module.create_view(wm)
+    dt = 1.0 / TICK_RATE
+    stress = entities and biome in STRESS
+    sim = module.create_simulation(autosave=False)
+    restarts = 0
+
+    def update(frame):
+        nonlocal sim, restarts
+        if stress:
+            top_up(sim, biome, entities, rng)
+        sim.snapshot()
+        sim.step(script(frame, sim), dt)
+        if sim.result is not None:
+            # Keep measuring a live game rather than an end state.
+            restarts += 1
+            sim.release()
+            sim = module.create_simulation(autosave=False)
+
+    def render():
+        view.draw(sim, 1.0)
+        wm.swap_buffers()
+
+    result = measure(wm, frames, warmup, update, render, counter)
+    view.delete()
+    sim.release()
+    result["restarts"] = restarts
+    result["entities"] = entities if stress else None
+    return result
+
+
+def random_shape(maker, rng):
+    x, y = rng.uniform(50, maker.WIDTH - 50), rng.uniform(80, maker.HEIGHT - 50)
+    size = rng.uniform(10, 80)
+    kind = rng.choice(["rectangle", "circle", "star"])
+    if kind == "rectangle":
+        points = maker.generate_rectangle_points(x, y, x + size, y + size)
+    elif kind == "circle":
+        points = maker.generate_circle_points(x, y, size)
+    else:
+        points = maker.generate_star_points(x, y, size, size / 2)
+    filled = rng.random() < 0.5
+    return {
+        "type": kind,
+        "points": points,
+        "line_color": rng.choice(maker.palette_buttons)[4],
+        "filled": filled,
+        "fill_color": rng.choice(maker.palette_buttons)[4] if filled else None,
+    }
+
+
+def run_maker(wm, module, frames, warmup, seed, entities, counter):
+    """
+    Benchmarks the maker's redraw: a canvas of seeded shapes plus a freehand
+    stroke that is dragged for a second, committed, and started again.
+    """
+    rng = random.Random(seed)
+    count = entities or MAKER_STROKES
+    module.setup_view()
+    module.strokes[:] = [random_shape(module, rng) for _ in range(count)]
+    module.undo_stack.clear()
+
+    def update(frame):
+        stroke = module.current_stroke
+        if frame % TICK_RATE == 0:
+            if stroke is not None:
+                # Commit the stroke and drop the oldest so the canvas size holds.
+                module.strokes.append(stroke)
+                module.strokes.pop(0)
+            x, y = rng.uniform(0, module.WIDTH), rng.uniform(50, module.HEIGHT)
+            module.current_stroke = stroke = {
+                "type": "freehand", "points": [(x, y)],
+                "line_color": module.current_color, "filled": False, "fill_color": None,
+            }
+        x, y = stroke["points"][-1]
+        stroke["points"].append((x + rng.uniform(-8, 8), y + rng.uniform(-8, 8)))
+
+    result = measure(wm, frames, warmup, update, module.render, counter)
+    module.strokes.clear()
+    module.current_stroke = None
+    result["entities"] = count
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure frame times of the biomes and the maker with scripted input.")
+    parser.add_argument("targets", nargs="*", help=f"what to run (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60, help="frames run before measuring")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fps", type=int, default=0, help="frame cap; 0 runs uncapped")
+    parser.add_argument("--entities", type=int, default=0,
+                        help="keep this many asteroids/arrows alive (space, upside_down), "
+                             f"or shapes on the maker canvas (default {MAKER_STROKES})")
+    parser.add_argument("--no-gl-count", action="store_true",
+                        help="skip GL call counting, which adds a little overhead per call")
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+    for target in args.targets:
+        if target not in TARGETS:
+            parser.error(f"unknown target {target!r}")
+    # Always in TARGETS order: the maker replaces the fixed-function
+    # projection, so it runs after the biomes.
+    targets = [target for target in TARGETS if not args.targets or target in args.targets]
+
+    wm = WindowManager(800, 800, "Benchmark", max_fps=args.fps)
+    counter = None if args.no_gl_count else GLCallCounter()
+    report = {
+        "seed": args.seed,
+        "frames": args.frames,
+        "warmup": args.warmup,
+        "fps_cap": args.fps,
+        "entities": args.entities,
+        "machine": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "gl_renderer": (glGetString(GL_RENDERER) or b"").decode(),
+            "gl_version": (glGetString(GL_VERSION) or b"").decode(),
+        },
+        "results": {},
+    }
+    # Import everything before the counter patches the GL functions, so their
+    # star-imported names are patched too and restored afterwards.
+    modules = {target: importlib.import_module("assets.maker.maker" if target == "maker"
+                                               else f"biomes.{target}.{target}")
+               for target in targets}
+    if counter:
+        counter.install()
+    try:
+        for target in targets:
+            run = run_maker if target == "maker" else functools.partial(run_biome, biome=target)
+            report["results"][target] = result = run(
+                wm, module=modules[target], frames=args.frames, warmup=args.warmup,
+                seed=args.seed, entities=args.entities, counter=counter)
+            frame = result["frame_ms"]
+            print(f"{target}: frame mean {frame['mean']:.2f} ms, p95 {frame['p95']:.2f} ms, "
+                  f"p99 {frame['p99']:.2f} ms")
+    finally:
+        if counter:
+            counter.uninstall()
+        wm.quit()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Results written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
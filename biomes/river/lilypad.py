@@ -2,7 +2,8 @@ from OpenGL.GL import *
 import numpy as np
 import math
 import ctypes
-from assets.objects.objects import  create_object
+from assets.objects.objects import acquire_mesh, release_mesh, register_mesh_builder
+from utils.loop import lerp
 
 def create_lilypad(center, radius, color, points=30):
     """
@@ -26,22 +27,42 @@ def create_lilypad(center, radius, color, points=30):
         indices.extend([0, i, i+1])
     return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.uint32)
 
+register_mesh_builder("lilypad", create_lilypad)
+
 class LilyPad:
+    # Unit lily pad shared by every pad; each one is drawn as an instance
+    # scaled by its radius.
+    color = (0.4, 0.8, 0.4)
     def __init__(self, x, y, speed, direction, right_bound, left_bound, radius=0.1):
         self.pos = [x, y, 0.0]
         self.speed = speed
         self.direction = direction  # 1 = right, -1 = left
         self.radius = radius
-        self.vertices, self.indices = create_lilypad(self.pos, self.radius, [0.4, 0.8, 0.4], points=30)
-        self.vao, self.count = create_object(self.vertices, self.indices)
+        self.prev_x = x
+        self.mesh = None  # acquired on first draw
         self.right_bound = right_bound
         self.left_bound = left_bound
 
     def update(self, dt):
+        self.prev_x = self.pos[0]
         self.pos[0] += self.direction * self.speed * dt
         if self.pos[0] > self.right_bound or self.pos[0] < self.left_bound:
             self.direction = -self.direction
 
+    def render_x(self, alpha):
+        return lerp(self.prev_x, self.pos[0], alpha)
+
+    def draw(self, renderer, alpha=1.0):
+        if self.mesh is None:
+            self.mesh = acquire_mesh("lilypad", [0.0, 0.0, 0.0], 1.0, [1.0, 1.0, 1.0], points=30)
+        # Drawn where collides_with and the keys expect the pad to be.
+        renderer.submit(self.mesh, self.render_x(alpha), self.pos[1] * 2, self.radius, self.radius, self.color)
+
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
+
     def collides_with(self, x, y):
         dx = x - self.pos[0]
         dy = y - self.pos[1] * 2
@@ -1,240 +1,360 @@
-import sys
-import os
 import pygame
 import numpy as np
-import math
-import ctypes
 import random
-import json
-import ast
-import re
 from OpenGL.GL import *
 from pygame.locals import DOUBLEBUF, OPENGL, QUIT, KEYDOWN
 
-from src.end_screen import display_end_screen
-from src.game_launcher import start_game
-
 # Import helper modules:
 from utils.window_manager import WindowManager
-from utils.graphics import Shader
-from assets.objects.objects import create_rect, create_square, create_circle, create_object
-
-# --- Helper Functions ---
-def load_shader_source(filepath):
-    with open(filepath, 'r') as f:
-        return f.read()
-
-def translation_matrix(x, y, z):
-    return np.array([
-        [1, 0, 0, x],
-        [0, 1, 0, y],
-        [0, 0, 1, z],
-        [0, 0, 0, 1]
-    ], dtype=np.float32)
-
-def draw_text(text, font_obj, pos_x, pos_y, color=(255, 255, 255)):
-    """Renders text onto a texture and draws it as a quad with its bottom-left corner at (pos_x, pos_y)."""
-    text_surface = font_obj.render(text, True, color).convert_alpha()
-    text_width, text_height = text_surface.get_size()
-    text_data = pygame.image.tostring(text_surface, 'RGBA', True)
-
-    texture = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, texture)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, text_width, text_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
-
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, texture)
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(pos_x, pos_y)
-    glTexCoord2f(1, 0); glVertex2f(pos_x + text_width, pos_y)
-    glTexCoord2f(1, 1); glVertex2f(pos_x + text_width, pos_y + text_height)
-    glTexCoord2f(0, 1); glVertex2f(pos_x, pos_y + text_height)
-    glEnd()
-    glDisable(GL_TEXTURE_2D)
-    glDeleteTextures([texture])
-
-# --- Background Setup ---
-bg_path = os.path.join(os.path.dirname(__file__), "../../assets/textures/space.jpg")
-try:
-    bg_image = pygame.image.load(bg_path).convert_alpha()
-except Exception as e:
-    print("Error loading background image:", e)
-    sys.exit(1)
-bg_width, bg_height = bg_image.get_size()
-bg_data = pygame.image.tostring(bg_image, "RGBA", True)
-bg_texture = glGenTextures(1)
-glBindTexture(GL_TEXTURE_2D, bg_texture)
-glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, bg_width, bg_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, bg_data)
-glBindTexture(GL_TEXTURE_2D, 0)
+from utils.graphics import InstancedRenderer, INSTANCED_SHADER
+from utils.assets import AssetScope
+from utils.text import draw_text
+from utils.hud import HUD
+from utils.loop import FixedTimestep, lerp
+from utils.sim import read_keyboard
+from utils.profiler import FrameProfiler
+from utils import checkpoint
+from assets.objects.objects import acquire_mesh, release_mesh
 
 # --- Checkpoint Functions ---
-CHECKPOINT_FILE = "saves/river_checkpoint.json"
+CHECKPOINT_FILE = "saves/river_checkpoint.ckpt"
+CHECKPOINT_SCHEMA = checkpoint.Schema(
+    "river", 1,
+    player=[("lives", "<i2"), ("health", "<i2")],
+    waves=[("x", "<f4"), ("speed", "<f4"), ("width", "<f4"), ("height", "<f4")],
+    lily_pads=[("x", "<f4"), ("y", "<f4"), ("speed", "<f4"), ("direction", "i1"), ("radius", "<f4")],
+    keys=[("lily_pad", "<i2"), ("collected", "?")],
+    journal=[("player", "lives"), ("player", "health"), ("keys", "collected")],
+)
 
-def save_checkpoint(lives, health, keys_collected, waves, lily_pads, keys):
-    """
-    Saves the current game state to a JSON file.
-    """
-    data = {}
-    data["lives"] = lives
-    data["health"] = health
-    data["keys_collected"] = keys_collected
-    data["waves"] = []
-    for wave in waves:
-        data["waves"].append({
-            "pos": wave.pos,
-            "speed": wave.speed,
-            "width": wave.width,
-            "height": wave.height
-        })
-    data["lily_pads"] = []
-    for lp in lily_pads:
-        data["lily_pads"].append({
-            "pos": lp.pos,
-            "speed": lp.speed,
-            "direction": lp.direction,
-            "radius": lp.radius
-        })
-    data["keys"] = []
+def checkpoint_records(lives, health, waves, lily_pads, keys):
+    records = {"player": [(lives, health)]}
+    records["waves"] = [(wave.pos[0], wave.speed, wave.width, wave.height) for wave in waves]
+    records["lily_pads"] = [(lp.pos[0], lp.pos[1], lp.speed, lp.direction, lp.radius) for lp in lily_pads]
+    keys_records = []
     for key in keys:
         try:
             lp_index = lily_pads.index(key['lily_pad'])
         except ValueError:
             lp_index = -1
-        data["keys"].append({
-            "lily_pad_index": lp_index,
-            "collected": key['collected']
-        })
-    with open("saves/river_checkpoint.json", "w") as f:
-        json.dump(data, f)
-    print("Checkpoint saved.")
+        keys_records.append((lp_index, key['collected']))
+    records["keys"] = keys_records
+    return records
 
 def load_checkpoint_data():
-    with open("saves/river_checkpoint.json", "r") as f:
-        return json.load(f)
+    return checkpoint.load(CHECKPOINT_FILE, CHECKPOINT_SCHEMA)
 
 # --- River-Specific Classes ---
 from biomes.river.lilypad import LilyPad
 from biomes.river.waves import Wave
 
 # --- State Initialization ---
-def initialize_game_state(state_data, model_loc):
+def initialize_game_state(state_data):
     # Create environment objects (grass and river geometry) are static; we focus on dynamic objects.
-    # Create lily pads, waves, keys and the player.
+    # Create lily pads, waves, keys and the player, either at random or from
+    # the sections read by load_checkpoint_data().
     
     # Player: defaults
     if state_data:
-        lives = state_data.get("lives", 3)
-        health = state_data.get("health", 100)
+        lives, health = state_data["player"][0].tolist()
     else:
         lives = 3
         health = 100
     # Create the player (using a circle)
     player_radius = 0.05
-    from assets.objects.objects import create_circle
-    player_vertices, player_indices = create_circle([0,0,0], player_radius, [1.0, 0.5, 0.0], points=30)
-    player_vao, player_count = create_object(player_vertices, player_indices)
     # We'll store player data in a dict for now:
-    player = {"pos": [-0.8, 0.0, 0.0], "vao": player_vao, "count": player_count, "radius": player_radius}
-    
-    # Create lily pads (using your fixed y positions)
-    fixed_y_positions = [-0.1, 0.15, -0.25, 0.3, -0.4, 0.45]
-    lily_pads = [LilyPad(random.uniform(-0.05, 0.05), y,
-                         random.uniform(0.1, 0.3),
-                         random.choice([-1, 1]), 0.59, -0.59)
-                 for y in fixed_y_positions]
-    if state_data:
-        lp_data = state_data.get("lily_pads", [])
-        for i, d in enumerate(lp_data):
-            if i < len(lily_pads):
-                lily_pads[i].pos = d.get("pos", lily_pads[i].pos)
-                lily_pads[i].speed = d.get("speed", lily_pads[i].speed)
-                lily_pads[i].direction = d.get("direction", lily_pads[i].direction)
-                lily_pads[i].radius = d.get("radius", lily_pads[i].radius)
-    
-    # Create waves
-    waves = [Wave(-0.65 + i * 0.4, random.uniform(0.05, 0.1), [0.0, 0.0, 1.0],
-                  random.uniform(0.1, 0.3), 2.5)
-             for i in range(2)]
-    if state_data:
-        waves_data = state_data.get("waves", [])
-        for i, d in enumerate(waves_data):
-            if i < len(waves):
-                waves[i].pos = d.get("pos", waves[i].pos)
-                waves[i].speed = d.get("speed", waves[i].speed)
-                waves[i].width = d.get("width", waves[i].width)
-                waves[i].height = d.get("height", waves[i].height)
+    player = {"pos": [-0.8, 0.0, 0.0], "radius": player_radius}
     
-    # Create keys: each key is tied to a lily pad.
-    key_size = 0.03
-    from assets.objects.objects import create_square
-    keys = []
     if not state_data:
-        selected_lily_pads = random.sample(lily_pads, 3)
-        for lp in selected_lily_pads:
-            key_vertices, key_indices = create_square([0,0,0], key_size, [1.0,1.0,0.0])
-            key_vao, key_count = create_object(key_vertices, key_indices)
-            keys.append({'vao': key_vao, 'count': key_count, 'lily_pad': lp, 'collected': False})
+        # Create lily pads (using your fixed y positions)
+        fixed_y_positions = [-0.1, 0.15, -0.25, 0.3, -0.4, 0.45]
+        lily_pads = [LilyPad(random.uniform(-0.05, 0.05), y,
+                             random.uniform(0.1, 0.3),
+                             random.choice([-1, 1]), 0.59, -0.59)
+                     for y in fixed_y_positions]
+        # Create waves
+        waves = [Wave(-0.65 + i * 0.4, random.uniform(0.05, 0.1), [0.0, 0.0, 1.0],
+                      random.uniform(0.1, 0.3), 2.5)
+                 for i in range(2)]
+        # Create keys: each key is tied to a lily pad.
+        keys = [{'lily_pad': lp, 'collected': False} for lp in random.sample(lily_pads, 3)]
     else:
-        selected_lily_pads = random.sample(lily_pads, 3)
-        for lp in selected_lily_pads:
-            key_vertices, key_indices = create_square([0,0,0], key_size, [1.0,1.0,0.0])
-            key_vao, key_count = create_object(key_vertices, key_indices)
-            keys.append({'vao': key_vao, 'count': key_count, 'lily_pad': lp, 'collected': False})
-        keys_data = state_data.get("keys", [])
-        for i, d in enumerate(keys_data):
-            if i < len(keys):
-                keys[i]['collected'] = d.get("collected", False)
+        lily_pads = [LilyPad(x, y, speed, direction, 0.59, -0.59, radius)
+                     for x, y, speed, direction, radius in state_data["lily_pads"].tolist()]
+        waves = [Wave(x, speed, [0.0, 0.0, 1.0], width, height)
+                 for x, speed, width, height in state_data["waves"].tolist()]
+        keys = [{'lily_pad': lily_pads[index], 'collected': collected}
+                for index, collected in state_data["keys"].tolist()
+                if 0 <= index < len(lily_pads)]
     
     return {"player": player, "lily_pads": lily_pads, "waves": waves, "keys": keys, "lives": lives, "health": health}
 
-# --- Game Loop with Integrated Pause Menu ---
-def run_game_loop(wm, assets, modelLoc, shader_program):
-    hud_font = pygame.font.SysFont("Arial", 24)
-    # Unpack assets
-    player = assets["player"]
-    lily_pads = assets["lily_pads"]
-    waves = assets["waves"]
-    keys = assets["keys"]
-    lives = assets["lives"]
-    health = assets["health"]
-    
-    # Create environment geometry (grass and river)
-    left_grass_vertices, left_grass_indices = create_rect(-1.0, -1.0, 0.3, 2.0, [0.0, 0.8, 0.0])
-    left_grass_vao, left_grass_count = create_object(left_grass_vertices, left_grass_indices)
-    river_vertices, river_indices = create_rect(-0.7, -1.0, 1.4, 2.0, [0.0, 0.0, 0.7])
-    river_vao, river_count = create_object(river_vertices, river_indices)
-    right_grass_vertices, right_grass_indices = create_rect(0.7, -1.0, 0.3, 2.0, [0.0, 0.8, 0.0])
-    right_grass_vao, right_grass_count = create_object(right_grass_vertices, right_grass_indices)
-    
-    # Variables for player movement and jumping
-    player_pos = assets["player"]["pos"]  # [x, y, z]
-    jump_duration = 30
+# --- Simulation ---
+class RiverSim:
+    """
+    Game state and per-tick logic for the river biome, with no window or GL
+    needed. run_game_loop drives it from the keyboard; utils/sim.py runs it
+    headless with scripted input.
+    """
+    jump_duration = 30  # ticks
     jump_height = 0.3
-    jump_time = 0
-    is_jumping = False
-    jump_offset = 0
-
-    # Variables for health blinking
-    health_cooldown = 0
     blink_interval = 0.05
-    blink_timer = 0
-    player_visible = True
 
-    clock = pygame.time.Clock()
-    game_over = False
-    game_over_timer = 0.0
+    def __init__(self, assets, autosave=True):
+        self.player = assets["player"]
+        self.player_pos = self.player["pos"]  # [x, y, z]
+        self.lily_pads = assets["lily_pads"]
+        self.waves = assets["waves"]
+        self.keys = assets["keys"]
+        self.lives = assets["lives"]
+        self.health = assets["health"]
+        self.autosave = autosave
+        # Logs lives, health and collected keys as they change; see checkpoint().
+        self.journal = checkpoint.Journal(CHECKPOINT_FILE, CHECKPOINT_SCHEMA, self.checkpoint_records) if autosave else None
+        self.result = None  # "win" or "lose" once the game is over
+
+        # Player movement and jumping
+        self.jump_time = 0
+        self.is_jumping = False
+        self.jump_offset = 0
+        # Health blinking
+        self.health_cooldown = 0
+        self.blink_timer = 0
+        self.player_visible = True
+        self.snapshot()
+        self.checkpoint()
+
+    def collected_count(self):
+        return sum(1 for k in self.keys if k['collected'])
+
+    def checkpoint(self):
+        """Journals any change to lives, health or collected keys."""
+        if self.journal is None:
+            return
+        self.journal.track("player", "lives", 0, self.lives)
+        self.journal.track("player", "health", 0, self.health)
+        for i, key in enumerate(self.keys):
+            self.journal.track("keys", "collected", i, key['collected'])
+
+    def checkpoint_records(self):
+        return checkpoint_records(self.lives, self.health, self.waves, self.lily_pads, self.keys)
+
+    def snapshot(self):
+        self.prev_x, self.prev_y = self.player_pos[0], self.player_pos[1]
+        self.prev_jump = self.jump_offset
+
+    def release(self):
+        """Frees the meshes the entities acquired when they were drawn."""
+        for entity in [*self.waves, *self.lily_pads]:
+            entity.release()
+
+    def respawn(self):
+        self.player_pos[:] = [-0.8, 0.0, 0.0]
+        self.prev_x, self.prev_y = self.player_pos[0], self.player_pos[1]
+
+    def step(self, inputs, dt):
+        """Advances the game by one fixed tick of dt seconds."""
+        player_pos, keys = self.player_pos, self.keys
+        if inputs.action and not self.is_jumping:
+            self.is_jumping = True
+            self.jump_time = 0
+
+        # Movement input
+        move_speed = 0.8 * (0.5 if self.is_jumping else 1)
+        if inputs.left:
+            player_pos[0] -= move_speed * dt
+        if inputs.right:
+            player_pos[0] += move_speed * dt
+        if inputs.up:
+            player_pos[1] += move_speed * dt
+        if inputs.down:
+            player_pos[1] -= move_speed * dt
+
+        # Start jump if active
+        if self.is_jumping:
+            self.jump_time += 1
+            t = self.jump_time / self.jump_duration
+            self.jump_offset = self.jump_height * 4 * t * (1 - t)
+            if self.jump_time >= self.jump_duration:
+                self.is_jumping = False
+        else:
+            self.jump_offset = 0
+
+        # Update blinking if under health cooldown
+        if self.health_cooldown > 0:
+            self.health_cooldown -= dt
+            self.blink_timer += dt
+            if self.blink_timer >= self.blink_interval:
+                self.player_visible = not self.player_visible
+                self.blink_timer = 0
+        else:
+            self.player_visible = True
+
+        # Clamp player position
+        player_pos[0] = max(-1.0, min(1.0, player_pos[0]))
+        player_pos[1] = max(-1.0, min(1.0, player_pos[1]))
+        effective_y = player_pos[1] + self.jump_offset
+
+        # Update waves
+        for wave in self.waves:
+            wave.update(dt)
+            if wave.collides_with_player(player_pos[0], effective_y) and self.health_cooldown <= 0:
+                self.health -= 5
+                self.checkpoint()
+                self.health_cooldown = 0.5
+                if self.health <= 0:
+                    self.lives -= 1
+                    self.checkpoint()
+                    if self.lives <= 0:
+                        self.result = "lose"
+                    else:
+                        self.respawn()
+                        self.health = 100
+
+        # Check for lily pad collisions and key collection
+        if -0.7 <= player_pos[0] <= 0.7:
+            on_lily_pad = False
+            for lp in self.lily_pads:
+                distance = np.sqrt((player_pos[0] - lp.pos[0])**2 + ((effective_y) - lp.pos[1]*2)**2)
+                if distance < 0.15:
+                    on_lily_pad = True
+                    for key in keys:
+                        if not key['collected'] and key['lily_pad'] == lp:
+                            if distance < 0.1:
+                                key['collected'] = True
+                                self.checkpoint()
+                    break
+            if not on_lily_pad and not self.is_jumping:
+                self.lives -= 1
+                self.checkpoint()
+                if self.lives <= 0:
+                    self.result = "lose"
+                    self.checkpoint()
+                else:
+                    self.respawn()
+
+        # Check win condition: if player reaches right side and all keys are collected.
+        if player_pos[0] > 0.7:
+            all_keys_collected = all(key['collected'] for key in keys)
+            if all_keys_collected:
+                self.result = "win"
+                if self.autosave:
+                    checkpoint.writer.save("saves/river_checkpoint.txt", "")
+            else:
+                player_pos[0] = min(0.75, player_pos[0])
+
+        # Update lily pads
+        for lp in self.lily_pads:
+            lp.update(dt)
+
+def create_simulation(state_data=None, autosave=True):
+    """Builds a GL-free RiverSim, from checkpoint data if given."""
+    return RiverSim(initialize_game_state(state_data), autosave)
+
+# --- Rendering ---
+class RiverView:
+    """
+    Draws a RiverSim: the banks, river and entities through one instanced
+    renderer, then the HUD. Owns every GL resource the scene needs.
+    """
+    key_size = 0.03
+
+    def __init__(self, wm):
+        self.wm = wm
+        self.assets = AssetScope()
+        self.font = self.assets.font(24)
+        self.hud = HUD(wm, self.font)
+        # Shared unit meshes; the grass, river, keys, shadow and player are all
+        # instances of these, scaled and tinted per draw.
+        self.renderer = InstancedRenderer(self.assets.shader(*INSTANCED_SHADER))
+        self.rect_mesh = acquire_mesh("rect", 0, 0, 1.0, 1.0, [1.0, 1.0, 1.0])
+        self.key_mesh = acquire_mesh("square", [0, 0, 0], 1.0, [1.0, 1.0, 1.0])
+        self.circle_mesh = acquire_mesh("circle", [0, 0, 0], 1.0, [1.0, 1.0, 1.0], points=30)
+
+    def draw(self, sim, alpha):
+        self.draw_world(sim, alpha)
+        self.draw_hud(sim)
+
+    def draw_world(self, sim, alpha):
+        render_x = lerp(sim.prev_x, sim.player_pos[0], alpha)
+        render_y = lerp(sim.prev_y, sim.player_pos[1], alpha)
+        render_jump = lerp(sim.prev_jump, sim.jump_offset, alpha)
+
+        # --- Render Background ---
+        glViewport(0, 0, self.wm.width, self.wm.height)
+        glClearColor(0.2, 0.2, 0.2, 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        # Each mesh is drawn in the order it is first submitted, so submitting
+        # back to front keeps the layering of the old per-object draws.
+        self.renderer.submit(self.rect_mesh, -1.0, -1.0, 0.3, 2.0, (0.0, 0.8, 0.0))
+        self.renderer.submit(self.rect_mesh, -0.7, -1.0, 1.4, 2.0, (0.0, 0.0, 0.7))
+        self.renderer.submit(self.rect_mesh, 0.7, -1.0, 0.3, 2.0, (0.0, 0.8, 0.0))
+        for wave in sim.waves:
+            wave.draw(self.renderer, alpha)
+        for lp in sim.lily_pads:
+            lp.draw(self.renderer, alpha)
+        for key in sim.keys:
+            if not key.get('collected', False):
+                lp = key['lily_pad']
+                self.renderer.submit(self.key_mesh, lp.render_x(alpha), lp.pos[1]*2, self.key_size, self.key_size, (1.0, 1.0, 0.0))
+
+        # Render player shadow and player if visible
+        shadow_scale = max(0.3, 1.0 - render_jump/sim.jump_height)
+        if sim.player_visible:
+            shadow_radius = 0.05 * shadow_scale
+            self.renderer.submit(self.circle_mesh, render_x, render_y - 0.01,
+                                 shadow_radius, shadow_radius, (0.2, 0.2, 0.2))
+            self.renderer.submit(self.circle_mesh, render_x, render_y + render_jump,
+                                 sim.player["radius"], sim.player["radius"], (1.0, 0.5, 0.0))
+        self.renderer.flush()
+
+    def draw_hud(self, sim):
+        # Render HUD
+        glUseProgram(0)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.wm.width, 0, self.wm.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        collected_count = sim.collected_count()
+        prompt = None
+        if sim.result != "lose" and collected_count < 3:
+            prompt = "Collect all the keys to complete biome"
+        self.hud.update(sim.lives, sim.health, 100, collected_count, prompt)
+        self.hud.draw()
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def delete(self):
+        self.hud.delete()
+        self.renderer.delete()
+        for mesh in (self.rect_mesh, self.key_mesh, self.circle_mesh):
+            release_mesh(mesh)
+        self.assets.release()
 
-    # Create a shadow for the player
-    shadow_vertices, shadow_indices = create_circle([0,0,0], 0.05, [0.2, 0.2, 0.2], points=30)
-    shadow_vao, shadow_count = create_object(shadow_vertices, shadow_indices)
+def create_view(wm):
+    return RiverView(wm)
+
+# --- Game Loop with Integrated Pause Menu ---
+def run_game_loop(wm, assets):
+    sim = RiverSim(assets)
+    player, lily_pads, waves, keys = sim.player, sim.lily_pads, sim.waves, sim.keys
+    view = RiverView(wm)
+    profiler = FrameProfiler(wm)
+    outcome = None
+    hud_font = view.font
     
+    clock = pygame.time.Clock()
+    stepper = FixedTimestep()
+    jump_pressed = False
+
     width, height_screen = wm.width, wm.height
 
     # ---- Pause Menu Variables ----
@@ -244,11 +364,13 @@ def run_game_loop(wm, assets, modelLoc, shader_program):
 
     running = True
     while running:
-        dt = clock.tick(60) / 1000.0
+        frame_time = clock.tick(wm.max_fps) / 1000.0
+        profiler.begin_frame()
 
         # Process events
         for event in pygame.event.get():
             if event.type == QUIT:
+                outcome = "Exit"
                 running = False
             elif event.type == KEYDOWN:
                 if paused:
@@ -260,239 +382,50 @@ def run_game_loop(wm, assets, modelLoc, shader_program):
                     elif event.key == pygame.K_DOWN:
                         pause_selected = (pause_selected + 1) % len(pause_options)
                     elif event.key == pygame.K_RETURN:
-                        option = pause_options[pause_selected]
-                        if option == "New Game":
-                            new_game(wm)
-                        elif option == "Load Game":
-                            load_game(wm)
-                        elif option == "Select Biome":
-                            start_game(wm)
-                        elif option == "Exit":
-                            wm.quit()
-                            pygame.font.quit()
-                            pygame.quit()
-                            sys.exit()
+                        # The launcher starts whatever was picked once this
+                        # loop has cleaned up after itself.
+                        outcome = pause_options[pause_selected]
+                        running = False
                 else:
                     # Normal game input
-                    if event.key == pygame.K_SPACE and not is_jumping:
-                        is_jumping = True
-                        jump_time = 0
+                    if event.key == pygame.K_SPACE:
+                        jump_pressed = True
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
                     elif event.key == pygame.K_F5:
-                        collected_count = sum(1 for k in keys if k['collected'])
-                        save_checkpoint(lives, health, collected_count, waves, lily_pads, keys)
+                        sim.journal.compact()
+                        print("Checkpoint saved.")
                     elif event.key == pygame.K_F9:
                         try:
                             data = load_checkpoint_data()
-                            lives = data.get("lives", lives)
-                            health = data.get("health", health)
-                            keys_data = data.get("keys", [])
-                            for i, d in enumerate(keys_data):
-                                if i < len(keys):
-                                    keys[i]['collected'] = d.get("collected", keys[i]['collected'])
+                            sim.lives, sim.health = data["player"][0].tolist()
+                            for key, d in zip(keys, data["keys"]):
+                                key['collected'] = bool(d["collected"])
                             print("Checkpoint loaded.")
                         except Exception as e:
                             print("Error loading checkpoint:", e)
                     elif event.key == pygame.K_ESCAPE:
                         paused = True
 
-        if not paused:
-            # Movement input
-            keys_pressed = pygame.key.get_pressed()
-            move_speed = 0.8 * (0.5 if is_jumping else 1)
-            if keys_pressed[pygame.K_a]:
-                player_pos[0] -= move_speed * dt
-            if keys_pressed[pygame.K_d]:
-                player_pos[0] += move_speed * dt
-            if keys_pressed[pygame.K_w]:
-                player_pos[1] += move_speed * dt
-            if keys_pressed[pygame.K_s]:
-                player_pos[1] -= move_speed * dt
-
-            # Start jump if active
-            if is_jumping:
-                jump_time += 1
-                t = jump_time / jump_duration
-                jump_offset = jump_height * 4 * t * (1 - t)
-                if jump_time >= jump_duration:
-                    is_jumping = False
-            else:
-                jump_offset = 0
-
-            # Update blinking if under health cooldown
-            if health_cooldown > 0:
-                health_cooldown -= dt
-                blink_timer += dt
-                if blink_timer >= blink_interval:
-                    player_visible = not player_visible
-                    blink_timer = 0
-            else:
-                player_visible = True
-
-            # Clamp player position
-            player_pos[0] = max(-1.0, min(1.0, player_pos[0]))
-            player_pos[1] = max(-1.0, min(1.0, player_pos[1]))
-            effective_y = player_pos[1] + jump_offset
-
-            # Update waves
-            for wave in waves:
-                wave.update(dt)
-                if wave.collides_with_player(player_pos[0], effective_y) and health_cooldown <= 0:
-                    health -= 5
-                    collected_count = sum(1 for k in keys if k['collected'])
-                    save_checkpoint(lives, health, collected_count, waves, lily_pads, keys)
-                    health_cooldown = 0.5
-                    if health <= 0:
-                        lives -= 1
-                        collected_count = sum(1 for k in keys if k['collected'])
-                        save_checkpoint(lives, health, collected_count, waves, lily_pads, keys)
-                        if lives <= 0:
-                            game_over = True
-                        else:
-                            player_pos = [-0.8, 0.0, 0.0]
-                            health = 100
-
-            # Check for lily pad collisions and key collection
-            if -0.7 <= player_pos[0] <= 0.7:
-                on_lily_pad = False
-                for lp in lily_pads:
-                    distance = np.sqrt((player_pos[0] - lp.pos[0])**2 + ((effective_y) - lp.pos[1]*2)**2)
-                    if distance < 0.15:
-                        on_lily_pad = True
-                        for key in keys:
-                            if not key['collected'] and key['lily_pad'] == lp:
-                                if distance < 0.1:
-                                    key['collected'] = True
-                                    collected_count = sum(1 for k in keys if k['collected'])
-                                    save_checkpoint(lives, health, collected_count, waves, lily_pads, keys)
-                        break
-                if not on_lily_pad and not is_jumping:
-                    lives -= 1
-                    collected_count = sum(1 for k in keys if k['collected'])
-                    save_checkpoint(lives, health, collected_count, waves, lily_pads, keys)
-                    if lives <= 0:
-                        game_over = True
-                        collected_count = sum(1 for k in keys if k['collected'])
-                        save_checkpoint(lives, health, collected_count, waves, lily_pads, keys)
-                    else:
-                        player_pos = [-0.8, 0.0, 0.0]
+        profiler.mark("events")
 
-            # Check win condition: if player reaches right side and all keys are collected.
-            if player_pos[0] > 0.7:
-                all_keys_collected = all(key['collected'] for key in keys)
-                if all_keys_collected:
+        # Game logic runs in fixed ticks; rendering interpolates between them.
+        if paused:
+            stepper.reset()
+        else:
+            for _ in range(stepper.advance(frame_time)):
+                sim.snapshot()
+                sim.step(read_keyboard(jump_pressed), stepper.dt)
+                jump_pressed = False
+                if sim.result:
                     running = False
-                    with open("saves/river_checkpoint.txt", "w") as file:
-                        file.write("")
-                else:
-                    player_pos[0] = min(0.75, player_pos[0])
-
-            # Update lily pads
-            for lp in lily_pads:
-                lp.update(dt)
-        
-        # --- Render Background ---
-        glViewport(0, 0, width, height_screen)
-        glClearColor(0.2, 0.2, 0.2, 1.0)
-        glClear(GL_COLOR_BUFFER_BIT)
-        
-        shader_program.use()
-        identity = np.eye(4, dtype=np.float32)
-        glUniformMatrix4fv(modelLoc, 1, GL_TRUE, identity)
-        
-        glBindVertexArray(left_grass_vao)
-        glDrawElements(GL_TRIANGLES, left_grass_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        
-        glBindVertexArray(river_vao)
-        glDrawElements(GL_TRIANGLES, river_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        
-        glBindVertexArray(right_grass_vao)
-        glDrawElements(GL_TRIANGLES, right_grass_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        
-        for wave in waves:
-            wave_model = translation_matrix(wave.pos[0], wave.pos[1], wave.pos[2])
-            glUniformMatrix4fv(modelLoc, 1, GL_TRUE, wave_model)
-            glBindVertexArray(wave.vao)
-            glDrawElements(GL_TRIANGLES, wave.count, GL_UNSIGNED_INT, None)
-            glBindVertexArray(0)
-        
-        for lp in lily_pads:
-            model = translation_matrix(lp.pos[0], lp.pos[1], lp.pos[2])
-            glUniformMatrix4fv(modelLoc, 1, GL_TRUE, model)
-            glBindVertexArray(lp.vao)
-            glDrawElements(GL_TRIANGLES, lp.count, GL_UNSIGNED_INT, None)
-            glBindVertexArray(0)
-        
-        for key in keys:
-            if not key.get('collected', False):
-                key_pos = key['lily_pad'].pos
-                key_model = translation_matrix(key_pos[0], key_pos[1]*2, key_pos[2])
-                glUniformMatrix4fv(modelLoc, 1, GL_TRUE, key_model)
-                glBindVertexArray(key['vao'])
-                glDrawElements(GL_TRIANGLES, key['count'], GL_UNSIGNED_INT, None)
-                glBindVertexArray(0)
-        
-        # Render player shadow and player if visible
-        shadow_scale = max(0.3, 1.0 - jump_offset/jump_height)
-        shadow_model = np.array([
-            [shadow_scale, 0, 0, player_pos[0]],
-            [0, shadow_scale, 0, player_pos[1] - 0.01],
-            [0, 0, 1, player_pos[2]],
-            [0, 0, 0, 1]
-        ], dtype=np.float32)
-        if player_visible:
-            glUniformMatrix4fv(modelLoc, 1, GL_TRUE, shadow_model)
-            glBindVertexArray(shadow_vao)
-            glDrawElements(GL_TRIANGLES, shadow_count, GL_UNSIGNED_INT, None)
-            glBindVertexArray(0)
-            
-            model = translation_matrix(player_pos[0], effective_y, player_pos[2])
-            glUniformMatrix4fv(modelLoc, 1, GL_TRUE, model)
-            glBindVertexArray(player["vao"])
-            glDrawElements(GL_TRIANGLES, player["count"], GL_UNSIGNED_INT, None)
-            glBindVertexArray(0)
-        
-        # Render HUD
-        glUseProgram(0)
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, width, 0, height_screen, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        
-        hud_text = f"Lives: {'♥'*lives}"
-        draw_text(hud_text, hud_font, 20, height_screen - 40)
-        health_bar_width = 200
-        glColor3f(0.5, 0.5, 0.5)
-        glBegin(GL_QUADS)
-        glVertex2f(20, height_screen - 50)
-        glVertex2f(20, height_screen - 70)
-        glVertex2f(20 + health_bar_width, height_screen - 70)
-        glVertex2f(20 + health_bar_width, height_screen - 50)
-        glEnd()
-        glColor3f(1.0, 0.0, 0.0)
-        glBegin(GL_QUADS)
-        glVertex2f(20, height_screen - 50)
-        glVertex2f(20, height_screen - 70)
-        glVertex2f(20 + health_bar_width * (health / 100), height_screen - 70)
-        glVertex2f(20 + health_bar_width * (health / 100), height_screen - 50)
-        glEnd()
-        key_text = f"Keys: {sum(key['collected'] for key in keys)}/3"
-        draw_text(key_text, hud_font, 20, height_screen - 100)
-        
-        if not game_over and sum(key['collected'] for key in keys) < 3:
-            prompt = "Collect all the keys to complete biome"
-            prompt_width, _ = hud_font.size(prompt)
-            draw_text(prompt, hud_font, (width - prompt_width) // 2, 20)
-        
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+                    break
+        profiler.mark("update")
+        alpha = stepper.alpha
+        view.draw_world(sim, alpha)
+        profiler.mark("world")
+        view.draw_hud(sim)
+        profiler.mark("hud")
         
         # --- Render Pause Menu Overlay if Paused ---
         if paused:
@@ -523,59 +456,33 @@ def run_game_loop(wm, assets, modelLoc, shader_program):
             glPopMatrix()
             glMatrixMode(GL_MODELVIEW)
         
+        profiler.mark("pause")
+        profiler.draw()
+        profiler.mark("overlay")
         wm.swap_buffers()
+        profiler.mark("swap")
         
-        if game_over:
-            running = False
-        
-    # End of game loop: clear checkpoint on win
-    if not game_over:
-        with open("saves/river_checkpoint.txt", "w") as file:
-            file.write("")
-    
-    option = display_end_screen(wm, won=(not game_over))
-    print("User selected:", option)
-    if option == "New Game":
-        new_game(wm)
-    elif option == "Select Biome":
-        start_game(wm)
-    else:
-        wm.quit()
-        pygame.font.quit()
-        sys.exit()
+    view.delete()
+    sim.release()
+    if sim.journal:
+        sim.journal.close()
+
+    return sim.result or outcome
 
 # --- Entry Points ---
 def new_game(wm):
-    def load_shader_source(filepath):
-        with open(filepath, 'r') as f:
-            return f.read()
-    vertex_shader_source = load_shader_source("assets/shaders/default.vert")
-    fragment_shader_source = load_shader_source("assets/shaders/default.frag")
-    shader_program = Shader(vertex_shader_source, fragment_shader_source)
-    shader_program.use()
-    global modelLoc
-    modelLoc = glGetUniformLocation(shader_program.ID, "model")
     state_data = None
-    assets = initialize_game_state(state_data, modelLoc)
-    run_game_loop(wm, assets, modelLoc, shader_program)
+    assets = initialize_game_state(state_data)
+    return run_game_loop(wm, assets)
 
 def load_game(wm):
-    def load_shader_source(filepath):
-        with open(filepath, 'r') as f:
-            return f.read()
-    vertex_shader_source = load_shader_source("assets/shaders/default.vert")
-    fragment_shader_source = load_shader_source("assets/shaders/default.frag")
-    shader_program = Shader(vertex_shader_source, fragment_shader_source)
-    shader_program.use()
-    global modelLoc
-    modelLoc = glGetUniformLocation(shader_program.ID, "model")
     try:
         state_data = load_checkpoint_data()
     except Exception as e:
         print("No checkpoint found; starting new game.", e)
         state_data = None
-    assets = initialize_game_state(state_data, modelLoc)
-    run_game_loop(wm, assets, modelLoc, shader_program)
+    assets = initialize_game_state(state_data)
+    return run_game_loop(wm, assets)
 
 if __name__ == "__main__":
     pygame.init()
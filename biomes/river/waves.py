@@ -1,27 +1,43 @@
 import random
-from assets.objects.objects import create_object, create_rect
+from assets.objects.objects import acquire_mesh, release_mesh
+from utils.loop import lerp
 
 class Wave:
+    # Unit rectangle shared by every wave, scaled to the wave's current size.
     def __init__(self, x, speed, color=[0.0, 0.0, 1.0], width=0.1, height=1.8):
         self.pos = [x, 0.0, 0.0]
+        self.prev_x = x
         self.speed = speed
         self.width = width
         self.height = height
-        vertices, indices = create_rect(0, -1, self.width, self.height, color)
-        self.vao, self.count = create_object(vertices, indices)
+        self.color = tuple(color)
+        self.mesh = None  # acquired on first draw
         
     def reset_position(self, x=None):
         if x is None:
             x = -0.65
         self.pos = [x, 0.0, 0.0]
+        self.prev_x = x
         self.speed = random.uniform(0.05, 0.2)
         self.width = random.uniform(0.1, 0.2)
         self.height = random.uniform(1.2, 2.0)
         
     def update(self, dt):
+        self.prev_x = self.pos[0]
         self.pos[0] += self.speed * dt
         if self.pos[0] + self.width > 0.68:
             self.reset_position()
+
+    def draw(self, renderer, alpha=1.0):
+        if self.mesh is None:
+            self.mesh = acquire_mesh("rect", 0, 0, 1.0, 1.0, [1.0, 1.0, 1.0])
+        x = lerp(self.prev_x, self.pos[0], alpha)
+        renderer.submit(self.mesh, x, self.pos[1] - 1, self.width, self.height, self.color)
+
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
             
     def collides_with_player(self, player_x, player_y):
         return (self.pos[0] - self.width/2 <= player_x <= self.pos[0] + self.width/2)
\ No newline at end of file
@@ -1,200 +1,144 @@
-import sys
 import os
 import pygame
 import numpy as np
 import math
-import ctypes
 import random
-import json
 from OpenGL.GL import *
 from pygame.locals import DOUBLEBUF, OPENGL, QUIT, KEYDOWN
 
-from src.end_screen import display_end_screen
-from src.game_launcher import start_game  # imported to allow restarting via the launcher
-
 # Import helper modules:
 from utils.window_manager import WindowManager
-from utils.graphics import Shader
-from assets.objects.objects import create_rect, create_circle, create_object
-
-# --- HUD Text Function ---
-def draw_text(text, font_obj, pos_x, pos_y, color=(255, 255, 255)):
-    """Renders text onto a texture and draws it as a quad with its bottom-left corner at (pos_x, pos_y)."""
-    text_surface = font_obj.render(text, True, color).convert_alpha()
-    text_width, text_height = text_surface.get_size()
-    text_data = pygame.image.tostring(text_surface, 'RGBA', True)
-
-    texture = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, texture)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, text_width, text_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
-
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, texture)
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(pos_x, pos_y)
-    glTexCoord2f(1, 0); glVertex2f(pos_x + text_width, pos_y)
-    glTexCoord2f(1, 1); glVertex2f(pos_x + text_width, pos_y + text_height)
-    glTexCoord2f(0, 1); glVertex2f(pos_x, pos_y + text_height)
-    glEnd()
-    glDisable(GL_TEXTURE_2D)
-    glDeleteTextures([texture])
-
-# --- Utility Function ---
-def translation_matrix(x, y, z):
-    return np.array([
-        [1, 0, 0, x],
-        [0, 1, 0, y],
-        [0, 0, 1, z],
-        [0, 0, 0, 1]
-    ], dtype=np.float32)
+from utils.graphics import InstancedRenderer, INSTANCED_SHADER
+from utils.assets import AssetScope
+from utils.text import draw_text
+from utils.hud import HUD
+from utils.pool import ProjectilePool
+from utils.loop import FixedTimestep, lerp
+from utils.sim import read_keyboard
+from utils.profiler import FrameProfiler
+from utils import checkpoint
+from utils.collision import SpatialHash, platform_box, closes
+from assets.objects.objects import acquire_mesh, release_mesh
 
 # --- Background Setup ---
 bg_path = os.path.join(os.path.dirname(__file__), "../../assets/textures/space.jpg")
-try:
-    bg_image = pygame.image.load(bg_path).convert_alpha()
-except Exception as e:
-    print("Error loading background image:", e)
-    sys.exit(1)
-bg_width, bg_height = bg_image.get_size()
-bg_data = pygame.image.tostring(bg_image, "RGBA", True)
-bg_texture = glGenTextures(1)
-glBindTexture(GL_TEXTURE_2D, bg_texture)
-glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, bg_width, bg_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, bg_data)
-glBindTexture(GL_TEXTURE_2D, 0)
 
 # --- Checkpoint Functions ---
-CHECKPOINT_FILE = "saves/space_checkpoint.json"
-
-def save_checkpoint(player, platforms, keys):
-    data = {}
-    data["player"] = {"lives": player.lives, "health": player.health}
-    data["platforms"] = []
-    for plat in platforms:
-        if isinstance(plat, WinningPlatform):
-            ptype = "winning"
-        elif isinstance(plat, EvilPlatform):
-            ptype = "evil"
-        else:
-            ptype = "normal"
-        data["platforms"].append({"type": ptype, "width": plat.width, "speed": plat.speed})
-    data["keys"] = []
+CHECKPOINT_FILE = "saves/space_checkpoint.ckpt"
+CHECKPOINT_SCHEMA = checkpoint.Schema(
+    "space", 1,
+    player=[("x", "<f4"), ("y", "<f4"), ("lives", "<i2"), ("health", "<i2")],
+    # kind indexes PLATFORM_KINDS.
+    platforms=[("kind", "u1"), ("x", "<f4"), ("y", "<f4"), ("width", "<f4"), ("height", "<f4"),
+               ("speed", "<f4"), ("direction", "i1"), ("lower_bound", "<f4"), ("upper_bound", "<f4")],
+    keys=[("platform", "<i2"), ("collected", "?")],
+    journal=[("player", "lives"), ("player", "health"), ("keys", "collected")],
+)
+
+def checkpoint_records(player, platforms, keys):
+    records = {"player": [(player.x, player.y, player.lives, player.health)]}
+    records["platforms"] = [(PLATFORM_KINDS.index(type(plat)), plat.x, plat.y, plat.width, plat.height,
+                             plat.speed, plat.direction, plat.lower_bound, plat.upper_bound)
+                            for plat in platforms]
+    keys_records = []
     for key in keys:
         try:
             index = platforms.index(key.platform)
         except ValueError:
             index = -1
-        data["keys"].append({"platform_index": index, "collected": key.collected})
-    with open(CHECKPOINT_FILE, "w") as f:
-        json.dump(data, f)
+        keys_records.append((index, key.collected))
+    records["keys"] = keys_records
+    return records
+
+def save_checkpoint(player, platforms, keys):
+    checkpoint.save(CHECKPOINT_FILE, CHECKPOINT_SCHEMA, checkpoint_records(player, platforms, keys))
     print("Checkpoint saved.")
 
 def load_checkpoint_data():
-    with open(CHECKPOINT_FILE, "r") as f:
-        return json.load(f)
+    return checkpoint.load(CHECKPOINT_FILE, CHECKPOINT_SCHEMA)
 
 # --- Classes for Game Assets ---
 # (These classes follow your original structure.)
 class Platform:
-    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, model_loc):
+    # Unit rectangle (bottom-center origin) shared by every platform; each one is
+    # drawn as an instance scaled to its width/height and tinted with its color.
+    color = (0.0, 1.0, 0.0)
+    # What landing on the platform does; checked by Player.update.
+    deadly = False
+    goal = False
+    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound):
         self.x = x; self.y = y; self.width = width; self.height = height
         self.speed = speed; self.direction = 1
         self.lower_bound = lower_bound; self.upper_bound = upper_bound
-        vertices, indices = create_rect(-width/2, 0, width, height, [0.0, 1.0, 0.0])
-        self.vao, self.count = create_object(vertices, indices)
-        self.model_loc = model_loc
+        # Where the latest update() moved from, for swept landing tests.
+        self.last_y = y
+        self.snapshot()
+        # Meshes are acquired on first draw so platforms can be simulated without GL.
+        self.mesh = None
+    def build_mesh(self):
+        return acquire_mesh("rect", -0.5, 0, 1.0, 1.0, [1.0, 1.0, 1.0])
     def update(self, dt):
+        self.last_y = self.y
         self.y += self.speed * self.direction * dt
         if self.y > self.upper_bound or self.y < self.lower_bound:
             self.direction *= -1
-    def draw(self):
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+    def snapshot(self):
+        self.prev_x = self.x; self.prev_y = self.y
+    def render_pos(self, alpha):
+        return lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha)
+    def draw(self, renderer, alpha=1.0):
+        if self.mesh is None:
+            self.mesh = self.build_mesh()
+        x, y = self.render_pos(alpha)
+        renderer.submit(self.mesh, x, y, self.width, self.height, self.color)
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
 
 class EvilPlatform(Platform):
-    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, model_loc):
-        super().__init__(x, y, width, height, speed, lower_bound, upper_bound, model_loc)
-        vertices, indices = create_rect(-width/2, 0, width, height, [1.0, 0.0, 0.0])
-        self.vao, self.count = create_object(vertices, indices)
-        self.spikes = []
-        n_spikes = 3; spike_height = 0.05; spike_base = width / (n_spikes * 1.5)
-        for i in range(n_spikes):
-            spike_center_x = -width/2 + (i+1) * width/(n_spikes+1)
-            v1 = [spike_center_x - spike_base/2, self.height, 0]
-            v2 = [spike_center_x + spike_base/2, self.height, 0]
-            v3 = [spike_center_x, self.height + spike_height, 0]
-            spike_color = [1.0, 1.0, 1.0]
-            spike_vertices = [
-                v1[0], v1[1], v1[2], *spike_color,
-                v2[0], v2[1], v2[2], *spike_color,
-                v3[0], v3[1], v3[2], *spike_color,
-            ]
-            spike_vertices = np.array(spike_vertices, dtype=np.float32)
-            spike_indices = np.array([0, 1, 2], dtype=np.uint32)
-            vao_spike = glGenVertexArrays(1)
-            glBindVertexArray(vao_spike)
-            vbo_spike = glGenBuffers(1)
-            glBindBuffer(GL_ARRAY_BUFFER, vbo_spike)
-            glBufferData(GL_ARRAY_BUFFER, spike_vertices.nbytes, spike_vertices, GL_STATIC_DRAW)
-            stride = 6 * ctypes.sizeof(ctypes.c_float)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * ctypes.sizeof(ctypes.c_float)))
-            glEnableVertexAttribArray(1)
-            ebo_spike = glGenBuffers(1)
-            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo_spike)
-            glBufferData(GL_ELEMENT_ARRAY_BUFFER, spike_indices.nbytes, spike_indices, GL_STATIC_DRAW)
-            glBindVertexArray(0)
-            self.spikes.append((vao_spike, len(spike_indices)))
-    def draw(self):
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        for spike_vao, spike_count in self.spikes:
-            glBindVertexArray(spike_vao)
-            glDrawElements(GL_TRIANGLES, spike_count, GL_UNSIGNED_INT, None)
-            glBindVertexArray(0)
+    # Body and spikes are one unit-width mesh with the colors baked in, so an
+    # evil platform is a single instance scaled to its width.
+    color = (1.0, 1.0, 1.0)
+    deadly = True
+    def build_mesh(self):
+        return acquire_mesh("spiked_rect", self.height, 0.05, [1.0, 0.0, 0.0], [1.0, 1.0, 1.0], n_spikes=3)
+    def draw(self, renderer, alpha=1.0):
+        if self.mesh is None:
+            self.mesh = self.build_mesh()
+        x, y = self.render_pos(alpha)
+        renderer.submit(self.mesh, x, y, self.width, 1.0, self.color)
 
 class WinningPlatform(Platform):
-    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, model_loc):
-        super().__init__(x, y, width, height, speed, lower_bound, upper_bound, model_loc)
-        vertices, indices = create_rect(-width/2, 0, width, height, [0.0, 0.0, 1.0])
-        self.vao, self.count = create_object(vertices, indices)
+    color = (0.0, 0.0, 1.0)
+    goal = True
+
+PLATFORM_KINDS = (Platform, EvilPlatform, WinningPlatform)
 
 class Key:
-    def __init__(self, platform, model_loc):
+    def __init__(self, platform):
         self.platform = platform
         self.collected = False
         self.offset_x = 0
         self.offset_y = platform.height + 0.02
         self.size = 0.04
-        vertices, indices = create_rect(-self.size/2, -self.size/2, self.size, self.size, [1.0, 1.0, 0.0])
-        self.vao, self.count = create_object(vertices, indices)
-        self.model_loc = model_loc
-    def draw(self):
+        self.mesh = None
+    def draw(self, renderer, alpha=1.0):
         if self.collected:
             return
-        key_x = self.platform.x + self.offset_x
-        key_y = self.platform.y + self.offset_y
-        model = translation_matrix(key_x, key_y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+        if self.mesh is None:
+            self.mesh = acquire_mesh("rect", -0.5, -0.5, 1.0, 1.0, [1.0, 1.0, 1.0])
+        plat_x, plat_y = self.platform.render_pos(alpha)
+        key_x = plat_x + self.offset_x
+        key_y = plat_y + self.offset_y
+        renderer.submit(self.mesh, key_x, key_y, self.size, self.size, (1.0, 1.0, 0.0))
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
 
 class Player:
-    def __init__(self, x, y, diameter, model_loc):
+    def __init__(self, x, y, diameter):
         self.x = x
         self.y = y
         self.diameter = diameter
@@ -210,32 +154,44 @@ class Player:
         self.health = 100
         self.max_health = 100
         self.damage_cooldown = 0.0
-        vertices, indices = create_circle([0, 0, 0], diameter/2, [1.0, 0.0, 0.0], points=30)
-        self.vao, self.count = create_object(vertices, indices)
-        self.model_loc = model_loc
-    def update(self, dt, platforms):
+        self.won = False
+        self.snapshot()
+        self.mesh = None
+    def update(self, dt, platforms, grid, all_keys_collected):
+        """
+        Falls, then lands on (or dies on, or wins on) the platforms grid finds
+        near the player. Landing is swept over the tick, so a fast fall or a
+        fast platform cannot pass through within one step.
+        """
         if not self.on_ground:
             self.vy += self.gravity * dt
+        radius = self.diameter/2
+        start_bottom = self.y - radius
         self.y += self.vy * dt
         self.on_ground = False
-        player_bottom = self.y - self.diameter/2
-        for plat in platforms:
+        player_bottom = self.y - radius
+        for i in grid.query(self.x - radius, min(start_bottom, player_bottom) - 0.02,
+                            self.x + radius, max(start_bottom, player_bottom) + 0.02):
+            plat = platforms[i]
             plat_left = plat.x - plat.width/2
             plat_right = plat.x + plat.width/2
             plat_top = plat.y + plat.height
-            if (self.x + self.diameter/2 >= plat_left and self.x - self.diameter/2 <= plat_right):
-                if isinstance(plat, EvilPlatform):
-                    if abs(player_bottom - plat_top) < 0.02 and self.vy <= 0:
+            if (self.x + radius >= plat_left and self.x - radius <= plat_right):
+                # The gap from the player's bottom to the platform's top,
+                # before the platform's last move and the player's fall, and after.
+                if self.vy <= 0 and closes(start_bottom - (plat.last_y + plat.height), player_bottom - plat_top, 0.02):
+                    if plat.deadly:
                         self.lives -= 1
                         if self.lives > 0:
                             self.respawn()
                         return
-                else:
-                    if abs(player_bottom - plat_top) < 0.02 and self.vy <= 0:
-                        self.y = plat_top + self.diameter/2
-                        self.vy = 0
-                        self.on_ground = True
-                        self.jumps_remaining = self.max_jumps
+                    self.y = plat_top + radius
+                    self.vy = 0
+                    self.on_ground = True
+                    self.jumps_remaining = self.max_jumps
+                    # The goal only counts once it has carried the player to the top.
+                    if plat.goal and all_keys_collected and self.y + radius >= 1.0:
+                        self.won = True
         if self.y - self.diameter/2 < -1:
             self.y = -1 + self.diameter/2
             self.vy = 0
@@ -264,100 +220,291 @@ class Player:
         self.y = self.spawn_y
         self.vy = 0
         self.jumps_remaining = self.max_jumps
-    def draw(self):
+        # Teleport rather than sliding back to the spawn point.
+        self.snapshot()
+    def snapshot(self):
+        self.prev_x = self.x; self.prev_y = self.y
+    def draw(self, renderer, alpha=1.0):
         if self.damage_cooldown > 0:
             if (pygame.time.get_ticks() // 100) % 2 == 0:
                 return
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-
-class Asteroid:
-    def __init__(self, x, y, radius, vx, model_loc):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.vx = vx
-        vertices, indices = create_circle([0, 0, 0], radius, [0.5, 0.5, 0.5], points=20)
-        self.vao, self.count = create_object(vertices, indices)
-        self.model_loc = model_loc
-    def update(self, dt):
-        self.x += self.vx * dt
-    def draw(self):
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+        if self.mesh is None:
+            self.mesh = acquire_mesh("circle", [0, 0, 0], 1.0, [1.0, 1.0, 1.0], points=30)
+        radius = self.diameter / 2
+        x = lerp(self.prev_x, self.x, alpha)
+        y = lerp(self.prev_y, self.y, alpha)
+        renderer.submit(self.mesh, x, y, radius, radius, (1.0, 0.0, 0.0))
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
+
+# Asteroids live in a ProjectilePool rather than as objects; a slot's w and h
+# both hold the asteroid's radius.
+MAX_ASTEROIDS = 256
 
 # --- State Initialization ---
-def initialize_game_state(state_data, model_loc):
+def initialize_game_state(state_data):
+    """
+    Builds the player, platforms and keys: a fresh random layout, or the one
+    in state_data (sections read by load_checkpoint_data). A checkpoint
+    without platforms, as saved at the end of a game, keeps only lives and health.
+    """
     # Create the player
-    if state_data:
-        p_data = state_data.get("player", {})
-        player = Player(0, -0.8, 0.1, model_loc)
-        player.lives = p_data.get("lives", 3)
-        player.health = p_data.get("health", 100)
-    else:
-        player = Player(0, -0.8, 0.1, model_loc)
+    player = Player(0, -0.8, 0.1)
+    if state_data and len(state_data["player"]):
+        p_data = state_data["player"][0]
+        player.lives = int(p_data["lives"])
+        player.health = int(p_data["health"])
     # Create platforms and keys
     platforms = []
     keys = []
-    if not state_data:
+    if not state_data or not len(state_data["platforms"]):
         platforms = [
-            WinningPlatform(0.8, 0.75, 0.3, 0.05, speed=0.4, lower_bound=0.75, upper_bound=1.0, model_loc=model_loc),
-            Platform(-0.8, -0.75, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.8, upper_bound=-0.6, model_loc=model_loc),
-            Platform(-0.5, -0.5, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.5, upper_bound=-0.3, model_loc=model_loc),
-            Platform(0, -0.2, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.2, upper_bound=0.0, model_loc=model_loc),
-            Platform(0.5, 0.1, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=0.1, upper_bound=0.3, model_loc=model_loc),
-            Platform(0.7, 0.5, random.uniform(0.2, 0.3), 0.05, random.uniform(0.1, 0.2), lower_bound=0.1, upper_bound=0.6, model_loc=model_loc),
-            EvilPlatform(random.uniform(-0.8, -0.5), 0, 0.3, 0.05, random.uniform(0.2, 0.4), lower_bound=-0.5, upper_bound=0.2, model_loc=model_loc),
-            EvilPlatform(0.3, 0.5, 0.3, 0.05, random.uniform(0.2, 0.4), lower_bound=-0.5, upper_bound=0.7, model_loc=model_loc)
+            WinningPlatform(0.8, 0.75, 0.3, 0.05, speed=0.4, lower_bound=0.75, upper_bound=1.0),
+            Platform(-0.8, -0.75, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.8, upper_bound=-0.6),
+            Platform(-0.5, -0.5, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.5, upper_bound=-0.3),
+            Platform(0, -0.2, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.2, upper_bound=0.0),
+            Platform(0.5, 0.1, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=0.1, upper_bound=0.3),
+            Platform(0.7, 0.5, random.uniform(0.2, 0.3), 0.05, random.uniform(0.1, 0.2), lower_bound=0.1, upper_bound=0.6),
+            EvilPlatform(random.uniform(-0.8, -0.5), 0, 0.3, 0.05, random.uniform(0.2, 0.4), lower_bound=-0.5, upper_bound=0.2),
+            EvilPlatform(0.3, 0.5, 0.3, 0.05, random.uniform(0.2, 0.4), lower_bound=-0.5, upper_bound=0.7)
         ]
         normal_platforms = [p for p in platforms if type(p) == Platform]
         selected_platforms = random.sample(normal_platforms, 3)
         for p in selected_platforms:
-            keys.append(Key(p, model_loc))
+            keys.append(Key(p))
     else:
-        platforms = [
-            WinningPlatform(0.8, 0.75, 0.3, 0.05, speed=0.4, lower_bound=0.75, upper_bound=1.0, model_loc=model_loc),
-            Platform(-0.8, -0.75, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.8, upper_bound=-0.6, model_loc=model_loc),
-            Platform(-0.5, -0.5, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.5, upper_bound=-0.3, model_loc=model_loc),
-            Platform(0, -0.2, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=-0.2, upper_bound=0.0, model_loc=model_loc),
-            Platform(0.5, 0.1, random.uniform(0.4, 0.6), 0.05, random.uniform(0.1, 0.2), lower_bound=0.1, upper_bound=0.3, model_loc=model_loc),
-            Platform(0.7, 0.5, random.uniform(0.2, 0.3), 0.05, random.uniform(0.1, 0.2), lower_bound=0.1, upper_bound=0.6, model_loc=model_loc),
-            EvilPlatform(random.uniform(-0.8, -0.5), 0, 0.3, 0.05, random.uniform(0.2, 0.4), lower_bound=-0.5, upper_bound=0.2, model_loc=model_loc),
-            EvilPlatform(0.3, 0.5, 0.3, 0.05, random.uniform(0.2, 0.4), lower_bound=-0.5, upper_bound=0.7, model_loc=model_loc)
-        ]
-        cp = state_data.get("platforms", [])
-        for i, plat in enumerate(platforms):
-            if i < len(cp):
-                plat.width = cp[i].get("width", plat.width)
-                plat.speed = cp[i].get("speed", plat.speed)
-        normal_platforms = [p for p in platforms if type(p) == Platform]
-        selected_platforms = random.sample(normal_platforms, 3)
-        for p in selected_platforms:
-            key = Key(p, model_loc)
-            keys.append(key)
-        cp_keys = state_data.get("keys", [])
-        for i, key in enumerate(keys):
-            if i < len(cp_keys):
-                key.collected = cp_keys[i].get("collected", False)
+        p_data = state_data["player"][0]
+        player.x = float(p_data["x"]); player.y = float(p_data["y"])
+        player.snapshot()
+        for d in state_data["platforms"].tolist():
+            kind, x, y, width, height, speed, direction, lower_bound, upper_bound = d
+            plat = PLATFORM_KINDS[kind](x, y, width, height, speed, lower_bound, upper_bound)
+            plat.direction = direction
+            platforms.append(plat)
+        for index, collected in state_data["keys"].tolist():
+            if 0 <= index < len(platforms):
+                key = Key(platforms[index])
+                key.collected = collected
+                keys.append(key)
     return {"player": player, "platforms": platforms, "keys": keys}
 
+# --- Simulation ---
+class SpaceSim:
+    """
+    Game state and per-tick logic for the space biome. Nothing here needs a
+    window or a GL context; run_game_loop feeds it keyboard input and draws
+    it, and utils/sim.py runs it headless with scripted input.
+    """
+    def __init__(self, assets, autosave=True):
+        self.player = assets["player"]
+        self.platforms = assets["platforms"]
+        self.keys = assets["keys"]
+        self.asteroids = ProjectilePool(MAX_ASTEROIDS)
+        self.asteroid_spawn_timer = 0
+        self.index_platforms()
+        self.autosave = autosave
+        # Logs lives, health and collected keys as they change; see checkpoint().
+        self.journal = checkpoint.Journal(CHECKPOINT_FILE, CHECKPOINT_SCHEMA, self.checkpoint_records) if autosave else None
+        self.result = None  # "win" or "lose" once the game is over
+        self.checkpoint()
+
+    def snapshot(self):
+        self.player.snapshot()
+        for plat in self.platforms:
+            plat.snapshot()
+        self.asteroids.snapshot()
+
+    def checkpoint_records(self):
+        return checkpoint_records(self.player, self.platforms, self.keys)
+
+    def index_platforms(self):
+        """
+        Buckets each platform, and each key riding one, by the whole range it
+        travels, so the grids stay valid as they move. Call again after
+        changing a platform's size or bounds.
+        """
+        self.platform_grid = SpatialHash()
+        for i, plat in enumerate(self.platforms):
+            self.platform_grid.insert(i, *platform_box(plat))
+        self.key_grid = SpatialHash()
+        for i, key in enumerate(self.keys):
+            left, bottom, right, top = platform_box(key.platform)
+            x = key.platform.x + key.offset_x
+            half = key.size/2
+            self.key_grid.insert(i, x - half, bottom + key.offset_y - half, x + half, top + key.offset_y + half)
+
+    def checkpoint(self):
+        """Journals any change to lives, health or collected keys since the last tick."""
+        if self.journal is None:
+            return
+        self.journal.track("player", "lives", 0, self.player.lives)
+        self.journal.track("player", "health", 0, self.player.health)
+        for i, key in enumerate(self.keys):
+            self.journal.track("keys", "collected", i, key.collected)
+
+    def release(self):
+        """Frees the meshes the entities acquired when they were drawn."""
+        for entity in [self.player, *self.platforms, *self.keys]:
+            entity.release()
+
+    def step(self, inputs, dt):
+        """Advances the game by one fixed tick of dt seconds."""
+        player, platforms, keys, asteroids = self.player, self.platforms, self.keys, self.asteroids
+        # Asteroid spawning
+        self.asteroid_spawn_timer -= dt
+        if self.asteroid_spawn_timer <= 0:
+            spawn_y = random.uniform(-0.9, 0.9)
+            spawn_x = 1.1
+            radius = random.uniform(0.03, 0.07)
+            vx = -random.uniform(0.1, 0.3)
+            asteroids.spawn(spawn_x, spawn_y, vx, radius, radius)
+            self.asteroid_spawn_timer = random.uniform(1.0, 3.0)
+
+        if inputs.action:
+            player.jump()
+        move_speed = 0.5
+        if inputs.left:
+            player.x -= move_speed * dt
+        if inputs.right:
+            player.x += move_speed * dt
+        if player.x - player.diameter/2 < -1:
+            player.x = -1 + player.diameter/2
+        if player.x + player.diameter/2 > 1:
+            player.x = 1 - player.diameter/2
+
+        player.update(dt, platforms, self.platform_grid, all(key.collected for key in keys))
+        for plat in platforms:
+            plat.update(dt)
+        radius = player.diameter/2
+        for i in self.key_grid.query(player.x - radius, player.y - radius, player.x + radius, player.y + radius):
+            key = keys[i]
+            if not key.collected:
+                key_center_x = key.platform.x + key.offset_x
+                key_center_y = key.platform.y + key.offset_y
+                dx = player.x - key_center_x
+                dy = player.y - key_center_y
+                if math.sqrt(dx*dx + dy*dy) < (player.diameter/2 + key.size/2):
+                    key.collected = True
+        # Move, cull and hit-test every asteroid at once.
+        asteroids.integrate(dt)
+        n = asteroids.count
+        asteroids.despawn_where(asteroids.x[:n] + asteroids.w[:n] < -1)
+        hits = asteroids.circle_hits(player.x, player.y, radius)
+        for _ in range(np.count_nonzero(hits)):
+            player.take_damage(10)
+        asteroids.despawn_where(hits)
+
+        # Decided after this tick's hits, and a hit that takes the last life
+        # outweighs reaching the goal in the same tick.
+        if player.lives <= 0:
+            self.result = "lose"
+        elif player.won:
+            self.result = "win"
+        self.checkpoint()
+
+def create_simulation(state_data=None, autosave=True):
+    """Builds a GL-free SpaceSim, from checkpoint data if given."""
+    return SpaceSim(initialize_game_state(state_data), autosave)
+
+# --- Rendering ---
+class SpaceView:
+    """
+    Draws a SpaceSim: the background, the world through one instanced
+    renderer, and the HUD. Owns every GL resource the scene needs.
+    """
+    def __init__(self, wm):
+        self.wm = wm
+        self.assets = AssetScope()
+        self.font = self.assets.font(24)
+        self.hud = HUD(wm, self.font)
+        self.renderer = InstancedRenderer(self.assets.shader(*INSTANCED_SHADER))
+        self.asteroid_mesh = acquire_mesh("circle", [0, 0, 0], 1.0, [1.0, 1.0, 1.0], points=20)
+
+    def draw(self, sim, alpha):
+        self.draw_world(sim, alpha)
+        self.draw_hud(sim)
+
+    def draw_world(self, sim, alpha):
+        # --- Render Background ---
+        glUseProgram(0)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.wm.width, 0, self.wm.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glEnable(GL_TEXTURE_2D)
+        # Uploaded on the first frame drawn, freed when the view is deleted.
+        # It is stretched over the window, so texels beyond the window size
+        # would never be seen, and it is never minified, so it has no mipmaps.
+        self.assets.texture(bg_path, (self.wm.width, self.wm.height)).bind()
+        glBegin(GL_QUADS)
+        glTexCoord2f(0, 0); glVertex2f(0, 0)
+        glTexCoord2f(1, 0); glVertex2f(self.wm.width, 0)
+        glTexCoord2f(1, 1); glVertex2f(self.wm.width, self.wm.height)
+        glTexCoord2f(0, 1); glVertex2f(0, self.wm.height)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+        # --- Render Game World ---
+        glViewport(0, 0, self.wm.width, self.wm.height)
+        glClearColor(0.0, 0.0, 0.0, 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        for plat in sim.platforms:
+            plat.draw(self.renderer, alpha)
+        self.renderer.submit_many(self.asteroid_mesh, sim.asteroids.instances((0.5, 0.5, 0.5), alpha=alpha))
+        for key in sim.keys:
+            key.draw(self.renderer, alpha)
+        sim.player.draw(self.renderer, alpha)
+        self.renderer.flush()
+
+    def draw_hud(self, sim):
+        # --- Render HUD ---
+        glUseProgram(0)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.wm.width, 0, self.wm.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        self.hud.update(sim.player.lives, sim.player.health, sim.player.max_health,
+                        sum(1 for key in sim.keys if key.collected))
+        self.hud.draw()
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def delete(self):
+        self.hud.delete()
+        self.renderer.delete()
+        release_mesh(self.asteroid_mesh)
+        self.assets.release()
+
+def create_view(wm):
+    return SpaceView(wm)
+
 # --- Game Loop with Integrated Pause Menu ---
-def run_game_loop(wm, assets, model_loc, shader):
-    player = assets["player"]
-    platforms = assets["platforms"]
-    keys = assets["keys"]
-    asteroids = []
-    asteroid_spawn_timer = 0
+def run_game_loop(wm, assets):
+    sim = SpaceSim(assets)
+    player, platforms, keys, asteroids = sim.player, sim.platforms, sim.keys, sim.asteroids
+    view = SpaceView(wm)
+    profiler = FrameProfiler(wm)
+    outcome = None
+    hud_font = view.font
     clock = pygame.time.Clock()
+    stepper = FixedTimestep()
+    jump_pressed = False
     running = True
-    game_won = False
-    hud_font = pygame.font.SysFont("Arial", 24)
 
     # Pause menu variables
     paused = False
@@ -365,11 +512,13 @@ def run_game_loop(wm, assets, model_loc, shader):
     pause_selected = 0
 
     while running:
-        dt = clock.tick(60) / 1000.0
+        frame_time = clock.tick(wm.max_fps) / 1000.0
+        profiler.begin_frame()
 
         # Process events
         for event in pygame.event.get():
             if event.type == QUIT:
+                outcome = "Exit"
                 running = False
             elif event.type == KEYDOWN:
                 if paused:
@@ -381,167 +530,56 @@ def run_game_loop(wm, assets, model_loc, shader):
                     elif event.key == pygame.K_DOWN:
                         pause_selected = (pause_selected + 1) % len(pause_options)
                     elif event.key == pygame.K_RETURN:
-                        option = pause_options[pause_selected]
-                        if option == "New Game":
-                            new_game(wm)
-                        elif option == "Load Game":
-                            load_game(wm)
-                        elif option == "Select Biome":
-                            start_game(wm)
-                        elif option == "Exit":
-                            wm.quit()
-                            pygame.font.quit()
-                            pygame.quit()
-                            sys.exit()
+                        # The launcher starts whatever was picked once this
+                        # loop has cleaned up after itself.
+                        outcome = pause_options[pause_selected]
+                        running = False
                 else:
                     # Normal game input
                     if event.key == pygame.K_SPACE:
-                        player.jump()
+                        jump_pressed = True
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
                     elif event.key == pygame.K_F5:
-                        save_checkpoint(player, platforms, keys)
+                        sim.journal.compact()
+                        print("Checkpoint saved.")
                     elif event.key == pygame.K_F9:
                         try:
                             data = load_checkpoint_data()
-                            player.lives = data["player"]["lives"]
-                            player.health = data["player"]["health"]
-                            for i, plat in enumerate(platforms):
-                                plat.width = data["platforms"][i]["width"]
-                                plat.speed = data["platforms"][i]["speed"]
-                            for i, key in enumerate(keys):
-                                key.collected = data["keys"][i]["collected"]
+                            p_data = data["player"][0]
+                            player.lives = int(p_data["lives"])
+                            player.health = int(p_data["health"])
+                            for plat, d in zip(platforms, data["platforms"]):
+                                plat.width = float(d["width"])
+                                plat.speed = float(d["speed"])
+                            for key, d in zip(keys, data["keys"]):
+                                key.collected = bool(d["collected"])
+                            sim.index_platforms()
                             print("Checkpoint loaded.")
                         except Exception as e:
                             print("Error loading checkpoint:", e)
                     elif event.key == pygame.K_ESCAPE:
                         paused = True
 
-        # When not paused, update game objects
-        if not paused:
-            # Asteroid spawning
-            asteroid_spawn_timer -= dt
-            if asteroid_spawn_timer <= 0:
-                spawn_y = random.uniform(-0.9, 0.9)
-                spawn_x = 1.1
-                radius = random.uniform(0.03, 0.07)
-                vx = -random.uniform(0.1, 0.3)
-                asteroids.append(Asteroid(spawn_x, spawn_y, radius, vx, model_loc))
-                asteroid_spawn_timer = random.uniform(1.0, 3.0)
-
-            keys_pressed = pygame.key.get_pressed()
-            move_speed = 0.5
-            if keys_pressed[pygame.K_a]:
-                player.x -= move_speed * dt
-            if keys_pressed[pygame.K_d]:
-                player.x += move_speed * dt
-            if player.x - player.diameter/2 < -1:
-                player.x = -1 + player.diameter/2
-            if player.x + player.diameter/2 > 1:
-                player.x = 1 - player.diameter/2
-
-            player.update(dt, platforms)
-            for plat in platforms:
-                plat.update(dt)
-            for key in keys:
-                if not key.collected:
-                    key_center_x = key.platform.x + key.offset_x
-                    key_center_y = key.platform.y + key.offset_y
-                    dx = player.x - key_center_x
-                    dy = player.y - key_center_y
-                    if math.sqrt(dx*dx + dy*dy) < (player.diameter/2 + key.size/2):
-                        key.collected = True
-                        save_checkpoint(player, platforms, keys)
-            for asteroid in asteroids[:]:
-                asteroid.update(dt)
-                if asteroid.x + asteroid.radius < -1:
-                    asteroids.remove(asteroid)
-                else:
-                    dx = player.x - asteroid.x
-                    dy = player.y - asteroid.y
-                    if math.sqrt(dx*dx + dy*dy) < (player.diameter/2 + asteroid.radius):
-                        player.take_damage(10)
-                        if asteroid in asteroids:
-                            asteroids.remove(asteroid)
-
-            # Check win condition
-            all_keys_collected = all(key.collected for key in keys)
-            for plat in platforms:
-                if isinstance(plat, WinningPlatform) and all_keys_collected:
-                    plat_left = plat.x - plat.width/2
-                    plat_right = plat.x + plat.width/2
-                    plat_top = plat.y + plat.height
-                    if (player.x + player.diameter/2 >= plat_left and player.x - player.diameter/2 <= plat_right):
-                        if abs((player.y - player.diameter/2) - plat_top) < 0.02 and (player.y + player.diameter/2) >= 1.0:
-                            game_won = True
-
-        # --- Render Background ---
-        glUseProgram(0)
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, wm.width, 0, wm.height, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, bg_texture)
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex2f(0, 0)
-        glTexCoord2f(1, 0); glVertex2f(wm.width, 0)
-        glTexCoord2f(1, 1); glVertex2f(wm.width, wm.height)
-        glTexCoord2f(0, 1); glVertex2f(0, wm.height)
-        glEnd()
-        glBindTexture(GL_TEXTURE_2D, 0)
-        glDisable(GL_TEXTURE_2D)
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
-
-        # --- Render Game World ---
-        glViewport(0, 0, wm.width, wm.height)
-        glClearColor(0.0, 0.0, 0.0, 1.0)
-        glClear(GL_COLOR_BUFFER_BIT)
-        shader.use()
-        for plat in platforms:
-            plat.draw()
-        for asteroid in asteroids:
-            asteroid.draw()
-        for key in keys:
-            key.draw()
-        player.draw()
+        profiler.mark("events")
 
-        # --- Render HUD ---
-        glUseProgram(0)
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, wm.width, 0, wm.height, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        hud_text = f"Lives: {'♥'*player.lives}"
-        draw_text(hud_text, hud_font, 20, wm.height - 40)
-        health_bar_width = 200
-        glColor3f(0.5, 0.5, 0.5)
-        glBegin(GL_QUADS)
-        glVertex2f(20, wm.height - 50)
-        glVertex2f(20, wm.height - 70)
-        glVertex2f(20 + health_bar_width, wm.height - 70)
-        glVertex2f(20 + health_bar_width, wm.height - 50)
-        glEnd()
-        glColor3f(1.0, 0.0, 0.0)
-        glBegin(GL_QUADS)
-        glVertex2f(20, wm.height - 50)
-        glVertex2f(20, wm.height - 70)
-        glVertex2f(20 + health_bar_width * (player.health / player.max_health), wm.height - 70)
-        glVertex2f(20 + health_bar_width * (player.health / player.max_health), wm.height - 50)
-        glEnd()
-        keys_text = f"Keys: {sum(1 for key in keys if key.collected)}/3"
-        draw_text(keys_text, hud_font, 20, wm.height - 100)
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+        # When not paused, update game objects in fixed ticks
+        if paused:
+            stepper.reset()
+        else:
+            for _ in range(stepper.advance(frame_time)):
+                sim.snapshot()
+                sim.step(read_keyboard(jump_pressed), stepper.dt)
+                jump_pressed = False
+                if sim.result:
+                    break
+        profiler.mark("update")
+        alpha = stepper.alpha
+
+        view.draw_world(sim, alpha)
+        profiler.mark("world")
+        view.draw_hud(sim)
+        profiler.mark("hud")
 
         # --- If Paused, Render Pause Menu Overlay ---
         if paused:
@@ -575,62 +613,44 @@ def run_game_loop(wm, assets, model_loc, shader):
             glPopMatrix()
             glMatrixMode(GL_MODELVIEW)
 
+        profiler.mark("pause")
+        profiler.draw()
+        profiler.mark("overlay")
         wm.swap_buffers()
+        profiler.mark("swap")
 
-        if game_won:
+        if sim.result == "win":
             print("You Win!")
             running = False
-        if player.lives <= 0:
+        elif sim.result == "lose":
             print("Game Over!")
             running = False
 
-    # --- After game loop: Show End Screen ---
-    option = display_end_screen(wm, won=game_won)
-    print("User selected:", option)
-    if option == "New Game":
-        save_checkpoint(player, [], [])
-        new_game(wm)
-    elif option == "Select Biome":
+    view.delete()
+    sim.release()
+    if sim.journal:
+        sim.journal.close()
+
+    # A finished game keeps only the player's lives and health.
+    if sim.result:
         save_checkpoint(player, [], [])
-        start_game(wm)  # Calls the launcher to select a new biome/game mode
-    else:
-        wm.quit()
-        pygame.font.quit()
-        pygame.quit()
-        sys.exit()
+        return sim.result
+    return outcome
 
 # --- Entry Points ---
 def new_game(wm):
-    def load_shader_source(filepath):
-        with open(filepath, 'r') as f:
-            return f.read()
-    vertex_shader_source = load_shader_source("assets/shaders/default.vert")
-    fragment_shader_source = load_shader_source("assets/shaders/default.frag")
-    shader = Shader(vertex_shader_source, fragment_shader_source)
-    shader.use()
-    global model_loc
-    model_loc = glGetUniformLocation(shader.ID, "model")
     state_data = None
-    assets = initialize_game_state(state_data, model_loc)
-    run_game_loop(wm, assets, model_loc, shader)
+    assets = initialize_game_state(state_data)
+    return run_game_loop(wm, assets)
 
 def load_game(wm):
-    def load_shader_source(filepath):
-        with open(filepath, 'r') as f:
-            return f.read()
-    vertex_shader_source = load_shader_source("assets/shaders/default.vert")
-    fragment_shader_source = load_shader_source("assets/shaders/default.frag")
-    shader = Shader(vertex_shader_source, fragment_shader_source)
-    shader.use()
-    global model_loc
-    model_loc = glGetUniformLocation(shader.ID, "model")
     try:
         state_data = load_checkpoint_data()
     except Exception as e:
         print("No checkpoint found; starting new game.", e)
         state_data = None
-    assets = initialize_game_state(state_data, model_loc)
-    run_game_loop(wm, assets, model_loc, shader)
+    assets = initialize_game_state(state_data)
+    return run_game_loop(wm, assets)
 
 if __name__ == "__main__":
     pygame.init()
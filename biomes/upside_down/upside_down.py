@@ -1,163 +1,123 @@
-import sys
 import pygame
 import numpy as np
 import math
-import ctypes
 import random
-import json
 import os
 from OpenGL.GL import *
 from pygame.locals import DOUBLEBUF, OPENGL, QUIT, KEYDOWN, K_SPACE
 
-from src.end_screen import display_end_screen
-from src.game_launcher import start_game  # Avoid circular imports
-
-# Initialize pygame and the font module.
-pygame.init()
-hud_font = pygame.font.SysFont("Segoe UI Symbol", 24)
-
 # Import helper modules.
 from utils.window_manager import WindowManager
-from utils.graphics import Shader
-from assets.objects.objects import create_rect, create_circle, create_object
+from utils.graphics import InstancedRenderer, INSTANCED_SHADER
+from utils.assets import AssetScope
+from utils.text import draw_text
+from utils.hud import HUD
+from utils.pool import ProjectilePool
+from utils.loop import FixedTimestep, lerp
+from utils.sim import read_keyboard
+from utils.profiler import FrameProfiler
+from utils import checkpoint
+from utils.collision import SpatialHash, platform_box, closes
+from assets.objects.objects import acquire_mesh, release_mesh
 
 # --- Checkpoint Functions ---
-CHECKPOINT_FILE = "saves/upside_down_checkpoint.json"
-
-def save_checkpoint(state):
-    if state is None:
-        if os.path.exists(CHECKPOINT_FILE):
-            os.remove(CHECKPOINT_FILE)
-        print("Checkpoint cleared.")
-        return
-    with open(CHECKPOINT_FILE, "w") as f:
-        json.dump(state, f)
-    print("Checkpoint saved.")
+CHECKPOINT_FILE = "saves/upside_down_checkpoint.ckpt"
+CHECKPOINT_SCHEMA = checkpoint.Schema(
+    "upside_down", 1,
+    player=[("x", "<f4"), ("y", "<f4"), ("gravity_direction", "i1"), ("lives", "<i2"), ("health", "<i2")],
+    # kind indexes PLATFORM_KINDS.
+    platforms=[("kind", "u1"), ("x", "<f4"), ("y", "<f4"), ("speed", "<f4"), ("direction", "i1"),
+               ("lower_bound", "<f4"), ("upper_bound", "<f4"), ("flip_spike", "?")],
+    keys=[("platform", "<i2"), ("collected", "?")],
+    journal=[("player", "lives"), ("player", "health"), ("keys", "collected")],
+)
+
+def checkpoint_records(player, platforms, keys):
+    return {
+        "player": [(player.x, player.y, player.gravity_direction, player.lives, player.health)],
+        "platforms": [(PLATFORM_KINDS.index(type(p)), p.x, p.y, p.speed, p.direction,
+                       p.lower_bound, p.upper_bound, getattr(p, "flip_spike", False))
+                      for p in platforms],
+        "keys": [(platforms.index(k.platform), k.collected) for k in keys],
+    }
+
+def clear_checkpoint():
+    checkpoint.remove(CHECKPOINT_FILE)
+    print("Checkpoint cleared.")
 
 def load_checkpoint():
+    checkpoint.flush()
     if not os.path.exists(CHECKPOINT_FILE):
         print("No checkpoint found.")
         return None
-    with open(CHECKPOINT_FILE, "r") as f:
-        state = json.load(f)
+    try:
+        state = checkpoint.load(CHECKPOINT_FILE, CHECKPOINT_SCHEMA)
+    except ValueError as e:
+        print("Error loading checkpoint:", e)
+        return None
     print("Checkpoint loaded.")
     return state
 
-# --- Utility Functions ---
-def draw_text(text, font_obj, pos_x, pos_y, color=(255,255,255)):
-    text_surface = font_obj.render(text, True, color).convert_alpha()
-    text_width, text_height = text_surface.get_size()
-    text_data = pygame.image.tostring(text_surface, 'RGBA', True)
-    
-    texture = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, texture)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, text_width, text_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
-    
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, texture)
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(pos_x, pos_y)
-    glTexCoord2f(1, 0); glVertex2f(pos_x + text_width, pos_y)
-    glTexCoord2f(1, 1); glVertex2f(pos_x + text_width, pos_y + text_height)
-    glTexCoord2f(0, 1); glVertex2f(pos_x, pos_y + text_height)
-    glEnd()
-    glDisable(GL_TEXTURE_2D)
-    glDeleteTextures([texture])
-
-def translation_matrix(x, y, z):
-    return np.array([[1,0,0,x],
-                     [0,1,0,y],
-                     [0,0,1,z],
-                     [0,0,0,1]], dtype=np.float32)
-
 # --- Classes for Game Assets ---
 class Platform:
-    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, model_loc):
+    # Unit rectangle (bottom-center origin) shared by every platform; each one is
+    # drawn as an instance scaled to its width/height and tinted with its color.
+    color = (0.0, 1.0, 0.0)
+    # What landing on the platform does; checked by Player.update.
+    deadly = False
+    goal = False
+    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound):
         self.x = x; self.y = y; self.width = width; self.height = height
         self.speed = speed; self.direction = 1
         self.lower_bound = lower_bound; self.upper_bound = upper_bound
-        vertices, indices = create_rect(-width/2, 0, width, height, [0.0, 1.0, 0.0])
-        self.vao, self.count = create_object(vertices.flatten().astype(np.float32), indices)
-        self.model_loc = model_loc
+        # Where the latest update() moved from, for swept landing tests.
+        self.last_y = y
+        self.snapshot()
+        # Meshes are acquired on first draw so platforms can be simulated without GL.
+        self.mesh = None
+    def build_mesh(self):
+        return acquire_mesh("rect", -0.5, 0, 1.0, 1.0, [1.0, 1.0, 1.0])
     def update(self, dt):
+        self.last_y = self.y
         self.y += self.speed * self.direction * dt
         if self.y > self.upper_bound or self.y < self.lower_bound:
             self.direction *= -1
-    def draw(self):
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+    def snapshot(self):
+        self.prev_x = self.x; self.prev_y = self.y
+    def render_pos(self, alpha):
+        return lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha)
+    def draw(self, renderer, alpha=1.0):
+        if self.mesh is None:
+            self.mesh = self.build_mesh()
+        x, y = self.render_pos(alpha)
+        renderer.submit(self.mesh, x, y, self.width, self.height, self.color)
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
 
 class WinningPlatform(Platform):
-    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, model_loc):
-        super().__init__(x, y, width, height, speed, lower_bound, upper_bound, model_loc)
-        vertices, indices = create_rect(-width/2, 0, width, height, [1.0, 0.84, 0.0])
-        self.vao, self.count = create_object(vertices.flatten().astype(np.float32), indices)
-    def draw(self):
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+    color = (1.0, 0.84, 0.0)
+    goal = True
 
 class EvilPlatform(Platform):
-    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, model_loc, flip_spike=False):
-        super().__init__(x, y, width, height, speed, lower_bound, upper_bound, model_loc)
-        vertices, indices = create_rect(-width/2, 0, width, height, [1.0, 0.0, 0.0])
-        self.vao, self.count = create_object(vertices.flatten().astype(np.float32), indices)
-        self.spikes = []
-        n_spikes = 3
-        spike_height = 0.05
-        spike_base = width / (n_spikes * 1.5)
-        for i in range(n_spikes):
-            spike_center_x = -width/2 + (i+1)*width/(n_spikes+1)
-            if not flip_spike:
-                v1 = [spike_center_x - spike_base/2, self.height, 0]
-                v2 = [spike_center_x + spike_base/2, self.height, 0]
-                v3 = [spike_center_x, self.height + spike_height, 0]
-            else:
-                v1 = [spike_center_x - spike_base/2, 0, 0]
-                v2 = [spike_center_x + spike_base/2, 0, 0]
-                v3 = [spike_center_x, -spike_height, 0]
-            spike_color = [1.0, 1.0, 1.0]
-            spike_vertices = [v1[0], v1[1], v1[2], *spike_color,
-                              v2[0], v2[1], v2[2], *spike_color,
-                              v3[0], v3[1], v3[2], *spike_color]
-            spike_vertices = np.array(spike_vertices, dtype=np.float32)
-            spike_indices = np.array([0,1,2], dtype=np.uint32)
-            vao_spike = glGenVertexArrays(1)
-            glBindVertexArray(vao_spike)
-            vbo_spike = glGenBuffers(1)
-            glBindBuffer(GL_ARRAY_BUFFER, vbo_spike)
-            glBufferData(GL_ARRAY_BUFFER, spike_vertices.nbytes, spike_vertices, GL_STATIC_DRAW)
-            stride = 6 * ctypes.sizeof(ctypes.c_float)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * ctypes.sizeof(ctypes.c_float)))
-            glEnableVertexAttribArray(1)
-            ebo_spike = glGenBuffers(1)
-            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo_spike)
-            glBufferData(GL_ELEMENT_ARRAY_BUFFER, spike_indices.nbytes, spike_indices, GL_STATIC_DRAW)
-            glBindVertexArray(0)
-            self.spikes.append((vao_spike, len(spike_indices)))
+    # Body and spikes are one unit-width mesh with the colors baked in, so an
+    # evil platform is a single instance scaled to its width.
+    color = (1.0, 1.0, 1.0)
+    deadly = True
+    def __init__(self, x, y, width, height, speed, lower_bound, upper_bound, flip_spike=False):
         self.flip_spike = flip_spike
-    def draw(self):
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        for spike_vao, spike_count in self.spikes:
-            glBindVertexArray(spike_vao)
-            glDrawElements(GL_TRIANGLES, spike_count, GL_UNSIGNED_INT, None)
-            glBindVertexArray(0)
+        super().__init__(x, y, width, height, speed, lower_bound, upper_bound)
+    def build_mesh(self):
+        return acquire_mesh("spiked_rect", self.height, 0.05, [1.0, 0.0, 0.0], [1.0, 1.0, 1.0],
+                            n_spikes=3, flip=self.flip_spike)
+    def draw(self, renderer, alpha=1.0):
+        if self.mesh is None:
+            self.mesh = self.build_mesh()
+        x, y = self.render_pos(alpha)
+        renderer.submit(self.mesh, x, y, self.width, 1.0, self.color)
+
+PLATFORM_KINDS = (Platform, EvilPlatform, WinningPlatform)
 
 class Key:
     def __init__(self, platform):
@@ -168,55 +128,27 @@ class Key:
             self.offset = np.array([0, platform.height+0.03, 0])
         else:
             self.offset = np.array([0, -0.03, 0])
-        vertices, indices = create_rect(-self.size/2, -self.size/2, self.size, self.size, [1.0, 1.0, 0.0])
-        self.vao, self.count = create_object(vertices.flatten().astype(np.float32), indices)
-    def draw(self, model_loc):
+        self.mesh = None
+    def draw(self, renderer, alpha=1.0):
         if self.collected:
             return
-        key_x = self.platform.x + self.offset[0]
-        key_y = self.platform.y + self.offset[1]
-        model = translation_matrix(key_x, key_y, 0)
-        glUniformMatrix4fv(model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-
-class Arrow:
-    def __init__(self, x, y, width, height, vx):
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.vx = vx
-        vertices = [
-            -width/2,  height/2, 0.0, 1.0, 1.0, 1.0,
-            -width/2, -height/2, 0.0, 1.0, 1.0, 1.0,
-             width/2,  0.0,      0.0, 1.0, 1.0, 1.0
-        ]
-        indices = [0, 1, 2]
-        vertices = np.array(vertices, dtype=np.float32)
-        indices = np.array(indices, dtype=np.uint32)
-        self.vao, self.count = create_object(vertices, indices)
-    def update(self, dt):
-        self.x += self.vx * dt
-    def draw(self, model_loc):
-        if self.vx < 0:
-            scale_matrix = np.array([
-                [-1,0,0,0],
-                [0,1,0,0],
-                [0,0,1,0],
-                [0,0,0,1]
-            ], dtype=np.float32)
-            model = translation_matrix(self.x, self.y, 0) @ scale_matrix
-        else:
-            model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+        if self.mesh is None:
+            self.mesh = acquire_mesh("rect", -0.5, -0.5, 1.0, 1.0, [1.0, 1.0, 1.0])
+        plat_x, plat_y = self.platform.render_pos(alpha)
+        key_x = plat_x + self.offset[0]
+        key_y = plat_y + self.offset[1]
+        renderer.submit(self.mesh, key_x, key_y, self.size, self.size, (1.0, 1.0, 0.0))
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
+
+# Arrows live in a ProjectilePool rather than as objects; a slot's w and h are
+# the arrow's width and height.
+MAX_ARROWS = 256
 
 class Player:
-    def __init__(self, x, y, diameter, model_loc):
+    def __init__(self, x, y, diameter):
         self.x = x
         self.y = y
         self.diameter = diameter
@@ -234,9 +166,8 @@ class Player:
         self.max_health = 100
         self.damage_cooldown = 0.0
         self.won = False
-        vertices, indices = create_circle([0,0,0], diameter/2, [1.0, 0.0, 0.0], points=30)
-        self.vao, self.count = create_object(vertices, indices)
-        self.model_loc = model_loc
+        self.snapshot()
+        self.mesh = None
     def take_damage(self, amount):
         if self.damage_cooldown > 0:
             return
@@ -251,77 +182,57 @@ class Player:
         self.y = self.spawn_y
         self.vy = 0
         self.jumps_remaining = self.max_jumps
+        # Teleport rather than sliding back to the spawn point.
+        self.snapshot()
         print("Respawning... Lives left:", self.lives)
-    def update(self, dt, platforms, all_keys_collected):
+    def snapshot(self):
+        self.prev_x = self.x; self.prev_y = self.y
+    def update(self, dt, platforms, grid, all_keys_collected):
+        """
+        Falls toward the current gravity, then lands on (or dies on, or wins
+        on) the platforms grid finds near the player. Landing is swept over
+        the tick, so a fast fall or a fast platform cannot pass through
+        within one step.
+        """
         if not self.on_ground:
             self.vy += (self.gravity * self.gravity_direction)*dt
+        radius = self.diameter/2
+        start_y = self.y
         self.y += self.vy*dt
         self.on_ground = False
-        for plat in platforms:
+        for i in grid.query(self.x - radius, min(start_y, self.y) - radius - 0.02,
+                            self.x + radius, max(start_y, self.y) + radius + 0.02):
+            plat = platforms[i]
             plat_left = plat.x - plat.width/2
             plat_right = plat.x + plat.width/2
-            if self.x + self.diameter/2 >= plat_left and self.x - self.diameter/2 <= plat_right:
-                if isinstance(plat, WinningPlatform):
-                    if self.gravity_direction == -1:
-                        player_bottom = self.y - self.diameter/2
-                        plat_top = plat.y + plat.height
-                        if abs(player_bottom - plat_top) < 0.02 and self.vy <= 0:
-                            if all_keys_collected:
-                                print("You win!")
-                                self.won = True
-                                return
-                            else:
-                                self.y = plat_top + self.diameter/2
-                                self.vy = 0
-                                self.on_ground = True
-                                self.jumps_remaining = self.max_jumps
-                    else:
-                        player_top = self.y + self.diameter/2
-                        plat_bottom = plat.y
-                        if abs(player_top - plat_bottom) < 0.02 and self.vy >= 0:
-                            if all_keys_collected:
-                                print("You win!")
-                                self.won = True
-                                return
-                            else:
-                                self.y = plat_bottom - self.diameter/2
-                                self.vy = 0
-                                self.on_ground = True
-                                self.jumps_remaining = self.max_jumps
-                elif isinstance(plat, EvilPlatform):
-                    if self.gravity_direction == -1:
-                        player_bottom = self.y - self.diameter/2
-                        plat_top = plat.y + plat.height
-                        if abs(player_bottom - plat_top) < 0.02 and self.vy <= 0:
-                            self.lives -= 1
-                            print("Ouch! Landed on spikes. Lives left:", self.lives)
-                            self.respawn()
-                            return
-                    else:
-                        player_top = self.y + self.diameter/2
-                        plat_bottom = plat.y
-                        if abs(player_top - plat_bottom) < 0.02 and self.vy >= 0:
-                            self.lives -= 1
-                            print("Ouch! Landed on spikes. Lives left:", self.lives)
-                            self.respawn()
-                            return
-                else:
-                    if self.gravity_direction == -1:
-                        player_bottom = self.y - self.diameter/2
-                        plat_top = plat.y + plat.height
-                        if abs(player_bottom - plat_top) < 0.02 and self.vy <= 0:
-                            self.y = plat_top + self.diameter/2
-                            self.vy = 0
-                            self.on_ground = True
-                            self.jumps_remaining = self.max_jumps
-                    else:
-                        player_top = self.y + self.diameter/2
-                        plat_bottom = plat.y
-                        if abs(player_top - plat_bottom) < 0.02 and self.vy >= 0:
-                            self.y = plat_bottom - self.diameter/2
-                            self.vy = 0
-                            self.on_ground = True
-                            self.jumps_remaining = self.max_jumps
+            if not (self.x + radius >= plat_left and self.x - radius <= plat_right):
+                continue
+            # The gap between the player and the platform face it falls
+            # toward, before the platform's last move and the player's fall,
+            # and after.
+            if self.gravity_direction == -1:
+                landed = self.vy <= 0 and closes((start_y - radius) - (plat.last_y + plat.height),
+                                                 (self.y - radius) - (plat.y + plat.height), 0.02)
+                rest_y = plat.y + plat.height + radius
+            else:
+                landed = self.vy >= 0 and closes(plat.last_y - (start_y + radius),
+                                                 plat.y - (self.y + radius), 0.02)
+                rest_y = plat.y - radius
+            if not landed:
+                continue
+            if plat.goal and all_keys_collected:
+                print("You win!")
+                self.won = True
+                return
+            if plat.deadly:
+                self.lives -= 1
+                print("Ouch! Landed on spikes. Lives left:", self.lives)
+                self.respawn()
+                return
+            self.y = rest_y
+            self.vy = 0
+            self.on_ground = True
+            self.jumps_remaining = self.max_jumps
         if self.gravity_direction == -1 and self.y - self.diameter/2 < -1:
             self.y = -1 + self.diameter/2
             self.vy = 0
@@ -344,79 +255,260 @@ class Player:
     def flip_gravity(self):
         self.gravity_direction *= -1
         self.vy = 0
-    def draw(self):
+    def draw(self, renderer, alpha=1.0):
         if self.damage_cooldown > 0:
             if (pygame.time.get_ticks() // 100) % 2 == 0:
                 return
-        model = translation_matrix(self.x, self.y, 0)
-        glUniformMatrix4fv(self.model_loc, 1, GL_TRUE, model)
-        glBindVertexArray(self.vao)
-        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+        if self.mesh is None:
+            self.mesh = acquire_mesh("circle", [0,0,0], 1.0, [1.0, 1.0, 1.0], points=30)
+        radius = self.diameter / 2
+        x = lerp(self.prev_x, self.x, alpha)
+        y = lerp(self.prev_y, self.y, alpha)
+        renderer.submit(self.mesh, x, y, radius, radius, (1.0, 0.0, 0.0))
+    def release(self):
+        if self.mesh is not None:
+            release_mesh(self.mesh)
+            self.mesh = None
                 
 
 # --- Game State Initialization ---
-def initialize_game_state(state_data, model_loc):
+def initialize_game_state(state_data):
+    player = Player(0, 0, 0.1)
     if state_data:
-        p_data = state_data.get("player", {})
-        player = Player(p_data.get("x", 0), p_data.get("y", 0), 0.1, model_loc)
-        player.lives = p_data.get("lives", 3)
-        player.health = p_data.get("health", 100)
-    else:
-        player = Player(0, 0, 0.1, model_loc)
+        p_data = state_data["player"][0]
+        player.x = float(p_data["x"]); player.y = float(p_data["y"])
+        player.gravity_direction = int(p_data["gravity_direction"])
+        player.lives = int(p_data["lives"])
+        player.health = int(p_data["health"])
+        player.snapshot()
     platforms = []
     keys = []
     x_positions = [-0.8, -0.4, 0.0, 0.4, 0.8]
     if not state_data:
         for i, x in enumerate(x_positions):
             if i == len(x_positions)-1:
-                p = WinningPlatform(x, -1.0, 0.4, 0.05, random.uniform(0.1,0.2), -1.0, -0.85, model_loc)
+                p = WinningPlatform(x, -1.0, 0.4, 0.05, random.uniform(0.1,0.2), -1.0, -0.85)
             elif i % 2 == 0:
-                p = Platform(x, -1.0, 0.4, 0.05, random.uniform(0.1,0.2), -1.0, -0.85, model_loc)
+                p = Platform(x, -1.0, 0.4, 0.05, random.uniform(0.1,0.2), -1.0, -0.85)
             else:
-                p = EvilPlatform(x, -1.0, 0.4, 0.05, random.uniform(0.2,0.4), -1.0, -0.75, model_loc, flip_spike=False)
+                p = EvilPlatform(x, -1.0, 0.4, 0.05, random.uniform(0.2,0.4), -1.0, -0.75, flip_spike=False)
             platforms.append(p)
         for i, x in enumerate(x_positions):
             if i % 2 == 0:
-                p = Platform(x, 0.85, 0.4, 0.05, random.uniform(0.1,0.2), 0.85, 0.95, model_loc)
+                p = Platform(x, 0.85, 0.4, 0.05, random.uniform(0.1,0.2), 0.85, 0.95)
             else:
-                p = EvilPlatform(x, 0.85, 0.4, 0.05, random.uniform(0.2,0.4), 0.75, 0.95, model_loc, flip_spike=True)
+                p = EvilPlatform(x, 0.85, 0.4, 0.05, random.uniform(0.2,0.4), 0.75, 0.95, flip_spike=True)
             platforms.append(p)
         candidate_indices = [i for i, p in enumerate(platforms) if not isinstance(p, EvilPlatform) and not isinstance(p, WinningPlatform)]
         key_indices = random.sample(candidate_indices, 3)
         for idx in key_indices:
             keys.append(Key(platforms[idx]))
     else:
-        for plat_data in state_data.get("platforms", []):
-            plat_type = plat_data.get("type", "Platform")
-            x = plat_data.get("x", 0)
-            y = plat_data.get("y", 0)
-            speed = plat_data.get("speed", 0.1)
-            lower_bound = plat_data.get("lower_bound", -1.0)
-            upper_bound = plat_data.get("upper_bound", -0.85)
-            if plat_type == "WinningPlatform":
-                p = WinningPlatform(x, y, 0.4, 0.05, speed, lower_bound, upper_bound, model_loc)
-            elif plat_type == "EvilPlatform":
-                p = EvilPlatform(x, y, 0.4, 0.05, speed, lower_bound, plat_data.get("upper_bound", -0.75), model_loc, flip_spike=plat_data.get("flip_spike", False))
+        for d in state_data["platforms"].tolist():
+            kind, x, y, speed, direction, lower_bound, upper_bound, flip_spike = d
+            if PLATFORM_KINDS[kind] is EvilPlatform:
+                p = EvilPlatform(x, y, 0.4, 0.05, speed, lower_bound, upper_bound, flip_spike=flip_spike)
             else:
-                p = Platform(x, y, 0.4, 0.05, speed, lower_bound, upper_bound, model_loc)
+                p = PLATFORM_KINDS[kind](x, y, 0.4, 0.05, speed, lower_bound, upper_bound)
+            p.direction = direction
             platforms.append(p)
-        for key_data in state_data.get("keys", []):
-            plat_idx = key_data.get("platform_index", 0)
+        for plat_idx, collected in state_data["keys"].tolist():
             k = Key(platforms[plat_idx])
-            k.collected = key_data.get("collected", False)
+            k.collected = collected
             keys.append(k)
     return {"player": player, "platforms": platforms, "keys": keys}
 
+# --- Simulation ---
+class UpsideDownSim:
+    """
+    Game state and per-tick logic for the upside-down biome, with no window
+    or GL needed. run_game_loop drives it from the keyboard; utils/sim.py
+    runs it headless with scripted input.
+    """
+    def __init__(self, assets, autosave=True):
+        self.player = assets["player"]
+        self.platforms = assets["platforms"]
+        self.keys = assets["keys"]
+        self.arrows = ProjectilePool(MAX_ARROWS)
+        self.index_platforms()
+        self.autosave = autosave
+        # Logs lives, health and collected keys as they change; see checkpoint().
+        self.journal = checkpoint.Journal(CHECKPOINT_FILE, CHECKPOINT_SCHEMA, self.checkpoint_records) if autosave else None
+        self.result = None  # "win" or "lose" once the game is over
+        self.checkpoint()
+
+    def snapshot(self):
+        self.player.snapshot()
+        for plat in self.platforms:
+            plat.snapshot()
+        self.arrows.snapshot()
+
+    def checkpoint_records(self):
+        return checkpoint_records(self.player, self.platforms, self.keys)
+
+    def index_platforms(self):
+        """
+        Buckets each platform, and each key riding one, by the whole range it
+        travels, so the grids stay valid as they move.
+        """
+        self.platform_grid = SpatialHash()
+        for i, plat in enumerate(self.platforms):
+            self.platform_grid.insert(i, *platform_box(plat))
+        self.key_grid = SpatialHash()
+        for i, key in enumerate(self.keys):
+            left, bottom, right, top = platform_box(key.platform)
+            x = key.platform.x + key.offset[0]
+            half = key.size/2
+            self.key_grid.insert(i, x - half, bottom + key.offset[1] - half, x + half, top + key.offset[1] + half)
+
+    def checkpoint(self):
+        """Journals any change to lives, health or collected keys since the last tick."""
+        if self.journal is None:
+            return
+        self.journal.track("player", "lives", 0, self.player.lives)
+        self.journal.track("player", "health", 0, self.player.health)
+        for i, key in enumerate(self.keys):
+            self.journal.track("keys", "collected", i, key.collected)
+
+    def release(self):
+        """Frees the meshes the entities acquired when they were drawn."""
+        for entity in [self.player, *self.platforms, *self.keys]:
+            entity.release()
+
+    def step(self, inputs, dt):
+        """Advances the game by one fixed tick of dt seconds."""
+        player, platforms, keys, arrows = self.player, self.platforms, self.keys, self.arrows
+        if inputs.action:
+            player.flip_gravity()
+        move_speed = 0.5
+        if inputs.left:
+            player.x -= move_speed * dt
+        if inputs.right:
+            player.x += move_speed * dt
+        if player.x - player.diameter/2 < -1:
+            player.x = -1 + player.diameter/2
+        if player.x + player.diameter/2 > 1:
+            player.x = 1 - player.diameter/2
+
+        if random.random() < 0.02:
+            if random.choice([True, False]):
+                x_arrow = -1.1
+                vx = random.uniform(0.3, 0.6)
+            else:
+                x_arrow = 1.1
+                vx = -random.uniform(0.3, 0.6)
+            y_arrow = random.uniform(-0.8, 0.8)
+            arrows.spawn(x_arrow, y_arrow, vx, 0.1, 0.1)
+
+        for plat in platforms:
+            plat.update(dt)
+        radius = player.diameter/2
+        for i in self.key_grid.query(player.x - radius, player.y - radius, player.x + radius, player.y + radius):
+            key = keys[i]
+            if not key.collected:
+                key_x = key.platform.x + key.offset[0]
+                key_y = key.platform.y + key.offset[1]
+                dx = player.x - key_x
+                dy = player.y - key_y
+                if math.hypot(dx, dy) < (player.diameter/2 + key.size/2):
+                    key.collected = True
+                    print("Key collected!")
+
+        all_keys_collected = all(k.collected for k in keys)
+        player.update(dt, platforms, self.platform_grid, all_keys_collected)
+
+        # Move, cull and hit-test every arrow at once.
+        arrows.integrate(dt)
+        n = arrows.count
+        arrows.despawn_where(np.abs(arrows.x[:n]) > 1.2)
+        hits = arrows.box_hits(player.x, player.y, radius, radius)
+        for _ in range(np.count_nonzero(hits)):
+            player.take_damage(10)
+        arrows.despawn_where(hits)
+
+        # Decided after this tick's hits, and a hit that takes the last life
+        # outweighs reaching the goal in the same tick.
+        if player.lives <= 0:
+            self.result = "lose"
+        elif player.won:
+            self.result = "win"
+        self.checkpoint()
+
+def create_simulation(state_data=None, autosave=True):
+    """Builds a GL-free UpsideDownSim, from checkpoint data if given."""
+    return UpsideDownSim(initialize_game_state(state_data), autosave)
+
+# --- Rendering ---
+class UpsideDownView:
+    """
+    Draws an UpsideDownSim: the world through one instanced renderer, then
+    the HUD. Owns every GL resource the scene needs.
+    """
+    def __init__(self, wm):
+        self.wm = wm
+        self.assets = AssetScope()
+        self.font = self.assets.font(24, "Segoe UI Symbol")
+        self.hud = HUD(wm, self.font, top_offset=70)
+        self.renderer = InstancedRenderer(self.assets.shader(*INSTANCED_SHADER))
+        # Unit arrowhead pointing right; left-moving arrows use a negative x scale.
+        self.arrow_mesh = acquire_mesh("triangle", [-0.5, 0.5, 0.0], [-0.5, -0.5, 0.0], [0.5, 0.0, 0.0], [1.0, 1.0, 1.0])
+
+    def draw(self, sim, alpha):
+        self.draw_world(sim, alpha)
+        self.draw_hud(sim)
+
+    def draw_world(self, sim, alpha):
+        # Rendering.
+        glViewport(0, 0, self.wm.width, self.wm.height)
+        glClearColor(0.0, 0.0, 0.0, 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        for plat in sim.platforms:
+            plat.draw(self.renderer, alpha)
+        for key in sim.keys:
+            key.draw(self.renderer, alpha)
+        self.renderer.submit_many(self.arrow_mesh, sim.arrows.instances((1.0, 1.0, 1.0), mirror=True, alpha=alpha))
+        sim.player.draw(self.renderer, alpha)
+        self.renderer.flush()
+        glUseProgram(0)
+
+    def draw_hud(self, sim):
+        # HUD rendering.
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.wm.width, 0, self.wm.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        self.hud.update(sim.player.lives, sim.player.health, sim.player.max_health,
+                        sum(1 for key in sim.keys if key.collected))
+        self.hud.draw()
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def delete(self):
+        self.hud.delete()
+        self.renderer.delete()
+        release_mesh(self.arrow_mesh)
+        self.assets.release()
+
+def create_view(wm):
+    return UpsideDownView(wm)
+
 # --- Game Loop Function with Integrated Pause Menu ---
-def run_game_loop(wm, assets, model_loc, shader):
-    player = assets["player"]
-    platforms = assets["platforms"]
-    keys = assets["keys"]
-    arrows = []
+def run_game_loop(wm, assets):
+    sim = UpsideDownSim(assets)
+    player, platforms, keys, arrows = sim.player, sim.platforms, sim.keys, sim.arrows
+    view = UpsideDownView(wm)
+    profiler = FrameProfiler(wm)
+    outcome = None
+    hud_font = view.font
     clock = pygame.time.Clock()
+    stepper = FixedTimestep()
+    flip_pressed = False
     running = True
-    game_result = None  # "win" or "lose"
 
     # Pause menu variables.
     paused = False
@@ -424,13 +516,14 @@ def run_game_loop(wm, assets, model_loc, shader):
     pause_selected = 0
 
     while running:
-        dt = clock.tick(60) / 1000.0
+        frame_time = clock.tick(wm.max_fps) / 1000.0
+        profiler.begin_frame()
         
         # Process events.
         for event in pygame.event.get():
             if event.type == QUIT:
+                outcome = "Exit"
                 running = False
-                game_result = None
             elif event.type == KEYDOWN:
                 if paused:
                     # When paused, process menu navigation.
@@ -441,156 +534,37 @@ def run_game_loop(wm, assets, model_loc, shader):
                     elif event.key == pygame.K_DOWN:
                         pause_selected = (pause_selected + 1) % len(pause_options)
                     elif event.key == pygame.K_RETURN:
-                        option = pause_options[pause_selected]
-                        if option == "New Game":
-                            new_game(wm)
-                        elif option == "Load Game":
-                            load_game(wm)
-                        elif option == "Select Biome":
-                            start_game(wm)
-                        elif option == "Exit":
-                            wm.quit()
-                            pygame.quit()
-                            sys.exit()
+                        # The launcher starts whatever was picked once this
+                        # loop has cleaned up after itself.
+                        outcome = pause_options[pause_selected]
+                        running = False
                 else:
                     if event.key == pygame.K_ESCAPE:
                         paused = True
                     elif event.key == K_SPACE:
-                        player.flip_gravity()
-        
-        # When not paused, process continuous key presses and update game objects.
-        if not paused:
-            keys_pressed = pygame.key.get_pressed()
-            move_speed = 0.5
-            if keys_pressed[pygame.K_a]:
-                player.x -= move_speed * dt
-            if keys_pressed[pygame.K_d]:
-                player.x += move_speed * dt
-            if player.x - player.diameter/2 < -1:
-                player.x = -1 + player.diameter/2
-            if player.x + player.diameter/2 > 1:
-                player.x = 1 - player.diameter/2
-
-            if random.random() < 0.02:
-                if random.choice([True, False]):
-                    x_arrow = -1.1
-                    vx = random.uniform(0.3, 0.6)
-                else:
-                    x_arrow = 1.1
-                    vx = -random.uniform(0.3, 0.6)
-                y_arrow = random.uniform(-0.8, 0.8)
-                arrow = Arrow(x_arrow, y_arrow, 0.1, 0.1, vx)
-                arrows.append(arrow)
-            
-            for plat in platforms:
-                plat.update(dt)
-            for key in keys:
-                if not key.collected:
-                    key_x = key.platform.x + key.offset[0]
-                    key_y = key.platform.y + key.offset[1]
-                    dx = player.x - key_x
-                    dy = player.y - key_y
-                    if math.hypot(dx, dy) < (player.diameter/2 + key.size/2):
-                        key.collected = True
-                        print("Key collected!")
-                        state = {
-                            "player": {
-                                "x": player.x,
-                                "y": player.y,
-                                "lives": player.lives,
-                                "health": player.health
-                            },
-                            "platforms": [],
-                            "keys": []
-                        }
-                        for idx, p in enumerate(platforms):
-                            p_type = "Platform"
-                            if isinstance(p, WinningPlatform):
-                                p_type = "WinningPlatform"
-                            elif isinstance(p, EvilPlatform):
-                                p_type = "EvilPlatform"
-                            state["platforms"].append({
-                                "type": p_type,
-                                "x": p.x,
-                                "y": p.y,
-                                "speed": p.speed,
-                                "lower_bound": p.lower_bound,
-                                "upper_bound": p.upper_bound,
-                                "flip_spike": getattr(p, "flip_spike", False)
-                            })
-                        for idx, k in enumerate(keys):
-                            state["keys"].append({
-                                "platform_index": idx,
-                                "collected": k.collected
-                            })
-                        save_checkpoint(state)
-            
-            all_keys_collected = all(k.collected for k in keys)
-            player.update(dt, platforms, all_keys_collected)
-            
-            if player.won:
-                game_result = "win"
-                running = False
-            if player.lives <= 0:
-                game_result = "lose"
-                running = False
+                        flip_pressed = True
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
+        profiler.mark("events")
 
-            for arrow in arrows[:]:
-                arrow.update(dt)
-                if arrow.x < -1.2 or arrow.x > 1.2:
-                    arrows.remove(arrow)
-                else:
-                    if (abs(player.x - arrow.x) < (player.diameter/2 + arrow.width/2) and
-                        abs(player.y - arrow.y) < (player.diameter/2 + arrow.height/2)):
-                        player.take_damage(10)
-                        if arrow in arrows:
-                            arrows.remove(arrow)
-        
-        # Rendering.
-        glViewport(0, 0, wm.width, wm.height)
-        glClearColor(0.0, 0.0, 0.0, 1.0)
-        glClear(GL_COLOR_BUFFER_BIT)
-        shader.use()
-        for plat in platforms:
-            plat.draw()
-        for key in keys:
-            key.draw(model_loc)
-        for arrow in arrows:
-            arrow.draw(model_loc)
-        player.draw()
-        glUseProgram(0)
-        
-        # HUD rendering.
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, wm.width, 0, wm.height, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        hud_text = f"Lives: {'♥'*player.lives}"
-        draw_text(hud_text, hud_font, 20, wm.height-70)
-        health_bar_width = 200
-        glColor3f(0.5, 0.5, 0.5)
-        glBegin(GL_QUADS)
-        glVertex2f(20, wm.height-80)
-        glVertex2f(20, wm.height-100)
-        glVertex2f(20+health_bar_width, wm.height-100)
-        glVertex2f(20+health_bar_width, wm.height-80)
-        glEnd()
-        glColor3f(1.0, 0.0, 0.0)
-        glBegin(GL_QUADS)
-        glVertex2f(20, wm.height-80)
-        glVertex2f(20, wm.height-100)
-        glVertex2f(20+health_bar_width*(player.health/player.max_health), wm.height-100)
-        glVertex2f(20+health_bar_width*(player.health/player.max_health), wm.height-80)
-        glEnd()
-        keys_text = f"Keys: {sum(1 for key in keys if key.collected)}/3"
-        draw_text(keys_text, hud_font, 20, wm.height-130)
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+        # When not paused, update game objects in fixed ticks.
+        if paused:
+            stepper.reset()
+        else:
+            for _ in range(stepper.advance(frame_time)):
+                sim.snapshot()
+                sim.step(read_keyboard(flip_pressed), stepper.dt)
+                flip_pressed = False
+                if sim.result:
+                    running = False
+                    break
+        profiler.mark("update")
+        alpha = stepper.alpha
+
+        view.draw_world(sim, alpha)
+        profiler.mark("world")
+        view.draw_hud(sim)
+        profiler.mark("hud")
         
         # If the game is paused, render the menu overlay on top of the scene.
         if paused:
@@ -624,80 +598,33 @@ def run_game_loop(wm, assets, model_loc, shader):
             glPopMatrix()
             glMatrixMode(GL_MODELVIEW)
         
+        profiler.mark("pause")
+        profiler.draw()
+        profiler.mark("overlay")
         wm.swap_buffers()
+        profiler.mark("swap")
         
-    # Game result handling.
-    if game_result in ("win", "lose"):
-        save_checkpoint(None)
-        option = display_end_screen(wm, won=(game_result=="win"))
-        print("User selected:", option)
-        if option == "New Game":
-            new_game(wm)
-        elif option == "Select Biome":
-            start_game(wm)
-        else:
-            wm.quit()
-            pygame.quit()
-            sys.exit()
-    else:
-        wm.quit()
-        pygame.quit()
-        sys.exit()
+    view.delete()
+    sim.release()
+    if sim.journal:
+        sim.journal.close()
+
+    # A finished game starts over next time.
+    if sim.result:
+        clear_checkpoint()
+        return sim.result
+    return outcome
 
 # --- Entry Points ---
 def new_game(wm):
-    vertex_src = """
-    #version 330 core
-    layout(location = 0) in vec3 aPos;
-    layout(location = 1) in vec3 aColor;
-    out vec3 vertexColor;
-    uniform mat4 model;
-    void main(){
-         gl_Position = model * vec4(aPos, 1.0);
-         vertexColor = aColor;
-    }
-    """
-    fragment_src = """
-    #version 330 core
-    in vec3 vertexColor;
-    out vec4 FragColor;
-    void main(){
-         FragColor = vec4(vertexColor, 1.0);
-    }
-    """
-    shader = Shader(vertex_src, fragment_src)
-    shader.use()
-    model_loc = glGetUniformLocation(shader.ID, "model")
     state_data = None
-    assets = initialize_game_state(state_data, model_loc)
-    run_game_loop(wm, assets, model_loc, shader)
+    assets = initialize_game_state(state_data)
+    return run_game_loop(wm, assets)
 
 def load_game(wm):
     state_data = load_checkpoint()
-    vertex_src = """
-    #version 330 core
-    layout(location = 0) in vec3 aPos;
-    layout(location = 1) in vec3 aColor;
-    out vec3 vertexColor;
-    uniform mat4 model;
-    void main(){
-         gl_Position = model * vec4(aPos, 1.0);
-         vertexColor = aColor;
-    }
-    """
-    fragment_src = """
-    #version 330 core
-    in vec3 vertexColor;
-    out vec4 FragColor;
-    void main(){
-         FragColor = vec4(vertexColor, 1.0);
-    }
-    """
-    shader = Shader(vertex_src, fragment_src)
-    shader.use()
-    model_loc = glGetUniformLocation(shader.ID, "model")
-    assets = initialize_game_state(state_data, model_loc)
-    run_game_loop(wm, assets, model_loc, shader)
+    assets = initialize_game_state(state_data)
+    return run_game_loop(wm, assets)
 
 if __name__ == "__main__":
     wm = WindowManager(800,600,"Keys, Arrows & Winning Platform Example")
@@ -2,17 +2,13 @@
 
 import sys
 from utils.window_manager import WindowManager
-from src.welcome import display_welcome_screen
 from src.game_launcher import start_game
 
 def main():
     wm = WindowManager(800, 800, "2D Platformer")
     
-    # --- Welcome Screen ---
-    welcome_choice = display_welcome_screen(wm)
-    
-    # Start the game loop.
-    start_game(wm)
+    # Runs the welcome screen, the menus and the biomes until the player exits.
+    start_game(wm, ("welcome",))
     
     # Cleanup when the game loop ends.
     wm.quit()
@@ -1,47 +1,94 @@
 # game_launcher.py
 
-import sys
-from utils.window_manager import WindowManager
+import importlib
+from src.welcome import display_welcome_screen
 from src.select_biome import display_biome_menu
 from src.select_game_mode import display_game_menu
+from src.end_screen import display_end_screen
+from src.menu import MENU_FONT
+from utils.fonts import prewarm_fonts
+from utils.gpu import tracker
 
-def start_game(wm):
-    # --- Biome Selection ---
-    selected_biome = display_biome_menu(wm)
+BIOME_MODULES = {
+    "river": "biomes.river.river",
+    "space": "biomes.space.space",
+    "upside down": "biomes.upside_down.upside_down",
+}
+
+# Every (font, size) the scenes draw with. They are opened, and their glyph
+# atlases baked, while the menus wait for the player, so no biome pays for
+# them on its first frame. System font names are looked up in the background
+# (see prewarm_fonts), so every menu on the way to a game warms again.
+GAME_FONTS = (
+    (MENU_FONT, 28),
+    ("Arial", 24),            # river and space HUD
+    ("Segoe UI Symbol", 24),  # upside down HUD
+    ("Consolas", 16),         # F3 profiler overlay
+)
+
+# Scenes run one after another from a single loop in start_game. Each is a
+# function taking the window manager and its own arguments; it runs until the
+# player leaves it, releases whatever it loaded, and returns the next scene as
+# (name, *args), or None to quit. Nothing calls the next scene itself, so the
+# stack stays the same depth however long the session runs.
+
+def warm_fonts():
+    prewarm_fonts(GAME_FONTS)
+
+def welcome(wm):
+    display_welcome_screen(wm, on_shown=warm_fonts)
+    return ("select_biome",)
+
+def select_biome(wm):
+    selected_biome = display_biome_menu(wm, on_shown=warm_fonts)
     print("Selected Biome:", selected_biome)
-    
-    # --- Game Mode Menu ---
-    game_mode = display_game_menu(wm)
+    return ("select_mode", selected_biome)
+
+def select_mode(wm, biome):
+    game_mode = display_game_menu(wm, on_shown=warm_fonts)
     print("Game Mode Selected:", game_mode)
-    
-    # --- Launch the Appropriate Biome ---
-    if selected_biome.lower() == "river":
-        from biomes.river import river
-        if game_mode.lower() == "new game":
-            river.new_game(wm)
-        elif game_mode.lower() == "load game":
-            river.load_game(wm)
-        else:
-            print("Invalid game mode selected.")
-            sys.exit(1)
-    elif selected_biome.lower() == "space":
-        from biomes.space import space
-        if game_mode.lower() == "new game":
-            space.new_game(wm)
-        elif game_mode.lower() == "load game":
-            space.load_game(wm)
-        else:
-            print("Invalid game mode selected.")
-            sys.exit(1)
-    elif selected_biome.lower() == "upside down":
-        from biomes.upside_down import upside_down
-        if game_mode.lower() == "new game":
-            upside_down.new_game(wm)
-        elif game_mode.lower() == "load game":
-            upside_down.load_game(wm)
-        else:
-            print("Invalid game mode selected.")
-            sys.exit(1)
+    return ("play", biome, game_mode)
+
+def play(wm, biome, game_mode):
+    module = importlib.import_module(BIOME_MODULES[biome.lower()])
+    if game_mode.lower() == "load game":
+        outcome = module.load_game(wm)
     else:
-        print("Biome not implemented. Exiting.")
-        sys.exit(1)
+        outcome = module.new_game(wm)
+    if outcome in ("win", "lose"):
+        return ("end", biome, outcome == "win")
+    return after_choice(biome, outcome)
+
+def end(wm, biome, won):
+    option = display_end_screen(wm, won=won)
+    print("User selected:", option)
+    return after_choice(biome, option)
+
+def after_choice(biome, option):
+    """Maps an option picked on the pause menu or end screen to the next scene."""
+    if option in ("New Game", "Load Game"):
+        return ("play", biome, option)
+    if option == "Select Biome":
+        return ("select_biome",)
+    return None
+
+SCENES = {
+    "welcome": welcome,
+    "select_biome": select_biome,
+    "select_mode": select_mode,
+    "play": play,
+    "end": end,
+}
+
+def start_game(wm, scene=("select_biome",)):
+    """
+    Runs scenes, starting from the given one, until one of them quits. GL
+    objects a scene creates are tracked under its name (plus its biome), and
+    any still alive once it returns are reported as leaks.
+    """
+    while scene is not None:
+        name, *args = scene
+        owner = f"{name}:{args[0]}" if args else name
+        with tracker.scene(owner):
+            scene = SCENES[name](wm, *args)
+        tracker.check_scene(owner)
@@ -0,0 +1,131 @@
+# src/menu.py
+
+import sys
+import pygame
+from pygame.locals import (KEYDOWN, NOEVENT, QUIT, K_UP, K_DOWN, K_RETURN, K_ESCAPE,
+                           VIDEOEXPOSE, VIDEORESIZE, ACTIVEEVENT,
+                           WINDOWEXPOSED, WINDOWSHOWN, WINDOWRESTORED, WINDOWSIZECHANGED)
+import OpenGL.GL as gl
+from utils.assets import AssetScope
+from utils.text import TextBatch, text_size
+
+MENU_FONT = "assets/fonts/minecraft_font.ttf"
+
+# A menu is a static screen, so instead of redrawing every frame it sleeps
+# until something happens. It still repaints this often while idle, in case
+# the window system lost the contents without telling us.
+IDLE_REFRESH_MS = 500
+
+# Events after which a menu may look different: key presses can move the
+# selection, the rest mean the window was exposed, resized or refocused.
+# Mouse motion and the like wake the menu up but do not repaint it.
+REDRAW_EVENTS = frozenset((KEYDOWN, VIDEOEXPOSE, VIDEORESIZE, ACTIVEEVENT,
+                           WINDOWEXPOSED, WINDOWSHOWN, WINDOWRESTORED, WINDOWSIZECHANGED))
+
+
+def wait_for_events(timeout_ms=IDLE_REFRESH_MS):
+    """
+    Sleeps until an event arrives or timeout_ms passes, then returns
+    (events, redraw): every pending event, and whether the screen should be
+    repainted because one of them may change it or because none arrived.
+    """
+    event = pygame.event.wait(timeout_ms)
+    events = [] if event.type == NOEVENT else [event, *pygame.event.get()]
+    redraw = not events or any(e.type in REDRAW_EVENTS for e in events)
+    return events, redraw
+
+
+class Menu:
+    """
+    A title above a centered column of options. Up and Down move the
+    highlight, Enter picks the highlighted option and Escape picks `cancel`,
+    if there is one.
+
+    Every string is measured and placed once, when the menu opens; after that
+    a redraw only queues each string's cached quads from the font's glyph
+    atlas, in the plain or highlight color, and draws them in one batch.
+    """
+    def __init__(self, wm, title, options, title_top=150, options_y=None, spacing=50,
+                 color=(255, 255, 255), highlight=(255, 255, 0),
+                 clear_color=(0.1, 0.1, 0.1, 1), cancel=None, font_size=28, on_shown=None):
+        self.wm = wm
+        self.title = title
+        self.options = list(options)
+        self.title_top = title_top
+        self.options_y = wm.height // 2 if options_y is None else options_y
+        self.spacing = spacing
+        self.color = color
+        self.highlight = highlight
+        self.clear_color = clear_color
+        self.cancel = cancel
+        self.font_size = font_size
+        # Called once, right after the first frame is on screen: work done
+        # there overlaps with the player reading the menu.
+        self.on_shown = on_shown
+        self.selected = 0
+
+    def layout(self, font):
+        """Returns the bottom-left corner of the title and of each option."""
+        width, height = self.wm.width, self.wm.height
+        title_width, _ = text_size(self.title, font)
+        title_pos = ((width - title_width) // 2, height - self.title_top)
+        option_pos = []
+        for i, option in enumerate(self.options):
+            option_width, _ = text_size(option, font)
+            option_pos.append(((width - option_width) // 2, self.options_y - i * self.spacing))
+        return title_pos, option_pos
+
+    def draw(self, font, title_pos, option_pos):
+        gl.glClearColor(*self.clear_color)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+
+        gl.glMatrixMode(gl.GL_PROJECTION)
+        gl.glLoadIdentity()
+        gl.glOrtho(0, self.wm.width, 0, self.wm.height, -1, 1)
+        gl.glMatrixMode(gl.GL_MODELVIEW)
+        gl.glLoadIdentity()
+
+        batch = TextBatch()
+        batch.add(self.title, font, *title_pos, self.color)
+        for i, (option, pos) in enumerate(zip(self.options, option_pos)):
+            batch.add(option, font, *pos, self.highlight if i == self.selected else self.color)
+        batch.draw()
+        self.wm.swap_buffers()
+
+    def handle(self, event):
+        """Applies one event; returns the picked option, or None while the menu stays open."""
+        if event.type == QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type != KEYDOWN:
+            return None
+        if event.key == K_UP:
+            self.selected = (self.selected - 1) % len(self.options)
+        elif event.key == K_DOWN:
+            self.selected = (self.selected + 1) % len(self.options)
+        elif event.key == K_RETURN:
+            return self.options[self.selected]
+        elif event.key == K_ESCAPE and self.cancel is not None:
+            return self.cancel
+        return None
+
+    def run(self):
+        """Shows the menu until an option is picked and returns it."""
+        assets = AssetScope()
+        try:
+            font = assets.font(self.font_size, MENU_FONT)
+            title_pos, option_pos = self.layout(font)
+            redraw = True
+            while True:
+                if redraw:
+                    self.draw(font, title_pos, option_pos)
+                if self.on_shown is not None:
+                    on_shown, self.on_shown = self.on_shown, None
+                    on_shown()
+                events, redraw = wait_for_events()
+                for event in events:
+                    choice = self.handle(event)
+                    if choice is not None:
+                        return choice
+        finally:
+            assets.release()
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import numpy as np
+import pygame
+from utils.bundle import bundled
+from utils.graphics import Texture, load_shader, surface_pixels
+from utils.fonts import get_font
+
+# Textures, fonts and shader programs are loaded the first time something asks
+# for them and shared by everyone asking for the same file. Each acquire_* must
+# be paired with a release_asset; an asset is freed, along with its GL objects,
+# once the last user releases it. Shader programs and fonts are the exception:
+# programs stay linked in utils.graphics for the life of the GL context, and
+# fonts stay open, atlas and all, in utils.fonts, so a scene that comes back
+# gets them without compiling or rasterizing again. Nothing here touches
+# pygame or GL on import.
+
+# Decoded images are saved here as .npy files of RGBA pixels, one per source
+# file and size, so later runs memory-map them instead of decoding again. A
+# source that changes gets a new file; delete the folder to clear old ones.
+TEXTURE_CACHE_DIR = os.path.join(".cache", "textures")
+
+_assets = {}      # key -> {"asset": asset, "refs": n}
+_asset_keys = {}  # asset -> key
+
+
+def _acquire(key, load):
+    entry = _assets.get(key)
+    if entry is None:
+        entry = {"asset": load(), "refs": 0}
+        _assets[key] = entry
+        _asset_keys[entry["asset"]] = key
+    entry["refs"] += 1
+    return entry["asset"]
+
+
+def _texture_cache_path(cache_dir, path, max_size):
+    stat = os.stat(path)
+    digest = hashlib.sha256(repr((os.path.abspath(path), stat.st_mtime_ns, stat.st_size,
+                                  max_size)).encode())
+    return os.path.join(cache_dir, digest.hexdigest() + ".npy")
+
+
+def _decode_texture(path, max_size):
+    surface = pygame.image.load(path)
+    if max_size is not None:
+        # Never store more texels than the image is drawn with; smaller
+        # images are left alone rather than blown up.
+        width, height = surface.get_size()
+        size = (min(width, max_size[0]), min(height, max_size[1]))
+        if size != (width, height):
+            if surface.get_bitsize() not in (24, 32):
+                # smoothscale only takes true-color surfaces, such as this copy.
+                rgba = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+                rgba.blit(surface, (0, 0))
+                surface = rgba
+            surface = pygame.transform.smoothscale(surface, size)
+    return surface_pixels(surface)
+
+
+def load_texture_pixels(path, max_size=None, cache_dir=TEXTURE_CACHE_DIR):
+    """
+    Returns an image file as an array of RGBA pixels ready for Texture, at
+    most max_size (width, height) if given. The pixels come memory-mapped
+    from the asset bundle if it holds the image at a size that fits, else
+    from cache_dir when a previous run already decoded the same file at the
+    same size, and are saved there otherwise. Pass cache_dir=None to always
+    decode.
+    """
+    pixels = bundled("texture", path)
+    if pixels is not None and (max_size is None or (pixels.shape[1] <= max_size[0]
+                                                    and pixels.shape[0] <= max_size[1])):
+        return pixels
+    if cache_dir is None:
+        return _decode_texture(path, max_size)
+    cache_path = _texture_cache_path(cache_dir, path, max_size)
+    try:
+        pixels = np.load(cache_path, mmap_mode="r")
+        if pixels.dtype == np.uint8 and pixels.ndim == 3 and pixels.shape[2] == 4:
+            return pixels
+    except (OSError, ValueError):
+        pass
+    pixels = _decode_texture(path, max_size)
+    # A missing or read-only cache only costs a decode next time.
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, pixels)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return pixels
+
+
+def acquire_texture(path, max_size=None, mipmaps=False):
+    """
+    Returns the shared Texture for an image file, uploading it on first use
+    (see load_texture_pixels and Texture).
+    """
+    return _acquire(("texture", path, max_size, mipmaps),
+                    lambda: Texture(load_texture_pixels(path, max_size), mipmaps))
+
+
+def acquire_font(size, name="Arial"):
+    """
+    Returns the shared pygame font for a font file or family name at the
+    given size (see fonts.resolve_font).
+    """
+    return _acquire(("font", name, size), lambda: get_font(size, name))
+
+
+def acquire_shader(vertex_path, fragment_path):
+    """Returns the shared Shader linked from two source files (see graphics.load_shader)."""
+    return _acquire(("shader", vertex_path, fragment_path),
+                    lambda: load_shader(vertex_path, fragment_path))
+
+
+def release_asset(asset):
+    """Drops one reference to an asset from acquire_*, freeing it on the last one."""
+    key = _asset_keys.get(asset)
+    if key is None:
+        return
+    entry = _assets[key]
+    entry["refs"] -= 1
+    if entry["refs"] > 0:
+        return
+    del _assets[key]
+    del _asset_keys[asset]
+    if key[0] == "texture":
+        asset.delete()
+
+
+def asset_stats():
+    """Returns (live assets, outstanding references) held by the registry."""
+    return len(_assets), sum(entry["refs"] for entry in _assets.values())
+
+
+class AssetScope:
+    """
+    The assets one scene uses. Each is acquired the first time the scene asks
+    for it and handed back on later calls without another reference, so a
+    view can ask for its assets every frame. release() drops all of them when
+    the scene exits; assets no other scene holds are freed there and then.
+    """
+    def __init__(self):
+        self._held = {}
+
+    def _get(self, key, acquire, *args):
+        asset = self._held.get(key)
+        if asset is None:
+            asset = acquire(*args)
+            self._held[key] = asset
+        return asset
+
+    def texture(self, path, max_size=None, mipmaps=False):
+        return self._get(("texture", path, max_size, mipmaps), acquire_texture,
+                         path, max_size, mipmaps)
+
+    def font(self, size, name="Arial"):
+        return self._get(("font", name, size), acquire_font, size, name)
+
+    def shader(self, vertex_path, fragment_path):
+        return self._get(("shader", vertex_path, fragment_path), acquire_shader,
+                         vertex_path, fragment_path)
+
+    def release(self):
+        for asset in self._held.values():
+            release_asset(asset)
+        self._held.clear()
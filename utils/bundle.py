@@ -0,0 +1,209 @@
+"""
+Packs the game's assets into one file that is memory-mapped at start-up.
+
+    python -m utils.bundle bake      # write .cache/assets.bundle
+    python -m utils.bundle info      # list what is in it and whether it is stale
+
+The bundle holds decoded RGBA pixels for every image in assets/textures,
+the source of every shader in assets/shaders and the bytes of every font in
+assets/fonts. At run time utils.assets, utils.graphics and utils.fonts ask it
+first and read the original file only for what it does not have.
+
+Layout: a header (magic, format version, index length), a JSON index, then
+each entry's data, aligned to ENTRY_ALIGNMENT bytes so pixels can be handed
+to GL straight from the mapping. Every entry records the size, modification
+time and SHA-256 of the file it was made from. When an entry's source file
+no longer matches its size and time, the file is hashed; if that hash also
+differs, the entry is stale and is ignored until the next bake. The bundle's
+own content hash is the SHA-256 of all entry hashes, shown by info.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import numpy as np
+import pygame
+
+BUNDLE_PATH = os.path.join(".cache", "assets.bundle")
+BUNDLE_MAGIC = b"ABND"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<4sIQ")  # magic, format version, index length
+ENTRY_ALIGNMENT = 64
+
+# Source files by kind, relative to the directory the game runs from.
+BUNDLE_SOURCES = {
+    "texture": ("assets/textures/*",),
+    "shader": ("assets/shaders/*.vert", "assets/shaders/*.frag"),
+    "font": ("assets/fonts/*.ttf", "assets/fonts/*.otf"),
+}
+
+
+def bundle_key(path):
+    """The name a file is stored under: its path relative to the working directory."""
+    return os.path.relpath(os.path.abspath(path)).replace(os.sep, "/")
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _bake_entry(kind, path):
+    """Returns (metadata, data bytes) for one source file, or None if it cannot be baked."""
+    if kind == "texture":
+        try:
+            surface = pygame.image.load(path)
+        except pygame.error:
+            return None
+        width, height = surface.get_size()
+        data = pygame.image.tostring(surface, "RGBA", True)
+        return {"shape": [height, width, 4]}, data
+    with open(path, "rb") as f:
+        return {}, f.read()
+
+
+def bake(path=BUNDLE_PATH, sources=BUNDLE_SOURCES):
+    """Writes a bundle of every source file pygame can read, and returns its index."""
+    entries = {}
+    blobs = []
+    offset = 0
+    for kind, patterns in sources.items():
+        for source in sorted({f for pattern in patterns for f in glob.glob(pattern)}):
+            baked = _bake_entry(kind, source)
+            if baked is None:
+                print(f"Skipped {source}: pygame cannot decode it.")
+                continue
+            meta, data = baked
+            stat = os.stat(source)
+            offset += -offset % ENTRY_ALIGNMENT
+            entries[bundle_key(source)] = {
+                "kind": kind, "offset": offset, "length": len(data),
+                "source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns,
+                "sha256": _file_digest(source), **meta,
+            }
+            blobs.append((offset, data))
+            offset += len(data)
+    content_hash = hashlib.sha256()
+    for key in sorted(entries):
+        content_hash.update(entries[key]["sha256"].encode())
+    index = {"content_hash": content_hash.hexdigest(), "entries": entries}
+
+    index_data = json.dumps(index).encode()
+    data_start = BUNDLE_HEADER.size + len(index_data)
+    data_start += -data_start % ENTRY_ALIGNMENT
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_data)))
+        f.write(index_data)
+        for blob_offset, data in blobs:
+            f.seek(data_start + blob_offset)
+            f.write(data)
+    os.replace(tmp_path, path)
+    return index
+
+
+class Bundle:
+    """
+    A baked bundle, memory-mapped. get() hands out read-only views into the
+    mapping, so nothing is copied until a caller copies it.
+    """
+    def __init__(self, path=BUNDLE_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = BUNDLE_HEADER.unpack_from(self._map)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} asset bundle")
+        index_end = BUNDLE_HEADER.size + index_length
+        index = json.loads(self._map[BUNDLE_HEADER.size:index_end])
+        self.content_hash = index["content_hash"]
+        self.entries = index["entries"]
+        self._data_start = index_end + -index_end % ENTRY_ALIGNMENT
+        data_end = max((e["offset"] + e["length"] for e in self.entries.values()), default=0)
+        if len(self._map) < self._data_start + data_end:
+            self._map.close()
+            raise ValueError(f"{path} is truncated")
+        self._checked = {}  # key -> whether the entry still matches its source
+
+    def is_fresh(self, key):
+        """Whether an entry still matches its source file; a missing source counts as a match."""
+        fresh = self._checked.get(key)
+        if fresh is None:
+            entry = self.entries[key]
+            try:
+                stat = os.stat(key)
+            except OSError:
+                fresh = True
+            else:
+                fresh = ((stat.st_size, stat.st_mtime_ns)
+                         == (entry["source_size"], entry["source_mtime_ns"])
+                         or _file_digest(key) == entry["sha256"])
+            self._checked[key] = fresh
+        return fresh
+
+    def get(self, kind, path):
+        """
+        Returns the bundled data for a source file as a memoryview, or as an
+        array of RGBA pixels for a texture; None if the bundle does not hold
+        the file or its entry is stale.
+        """
+        key = bundle_key(path)
+        entry = self.entries.get(key)
+        if entry is None or entry["kind"] != kind or not self.is_fresh(key):
+            return None
+        start = self._data_start + entry["offset"]
+        if kind == "texture":
+            return np.frombuffer(self._map, dtype=np.uint8, count=entry["length"],
+                                 offset=start).reshape(entry["shape"])
+        return memoryview(self._map)[start:start + entry["length"]]
+
+
+_bundle = None
+_bundle_opened = False
+
+
+def get_bundle():
+    """Returns the Bundle at BUNDLE_PATH, mapped on first use, or None if there is no usable one."""
+    global _bundle, _bundle_opened
+    if not _bundle_opened:
+        _bundle_opened = True
+        try:
+            _bundle = Bundle(BUNDLE_PATH)
+        except (OSError, ValueError, struct.error):
+            _bundle = None
+    return _bundle
+
+
+def bundled(kind, path):
+    """Returns get_bundle().get(kind, path), or None when there is no bundle."""
+    bundle = get_bundle()
+    return None if bundle is None else bundle.get(kind, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake or inspect the asset bundle.")
+    parser.add_argument("--path", default=BUNDLE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("bake", help="pack the current assets into the bundle")
+    commands.add_parser("info", help="list the bundle's entries and flag stale ones")
+    args = parser.parse_args()
+
+    if args.command == "bake":
+        index = bake(args.path)
+        print(f"Baked {len(index['entries'])} assets into {args.path} "
+              f"({os.path.getsize(args.path) / 1024:.1f} KB, hash {index['content_hash'][:16]}).")
+    else:
+        bundle = Bundle(args.path)
+        print(f"{args.path}: hash {bundle.content_hash}")
+        for key, entry in sorted(bundle.entries.items()):
+            state = "" if bundle.is_fresh(key) else "  (stale)"
+            print(f"  {entry['kind']:<8} {entry['length'] / 1024:>9.1f} KB  {key}{state}")
+
+
+if __name__ == "__main__":
+    main()
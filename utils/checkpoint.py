@@ -0,0 +1,425 @@
+"""
+Checkpoint files for the biomes.
+
+A checkpoint is a small binary file: a fixed header naming the biome's schema
+and its version, then one block per section (player, platforms, keys, ...),
+each a count followed by that many fixed-layout records. Each biome declares
+its sections as NumPy structured dtypes in a Schema, so a file is written
+with one tobytes() per section and read back with np.frombuffer.
+
+Between full checkpoints, a Journal appends the fields that change often
+(health, lives, keys collected) to a log beside the file, a few bytes per
+change, and load() replays that log over the snapshot it was written against.
+
+Files are written on a background thread (see CheckpointWriter). To inspect
+or hand-edit one as JSON, or to compare size and parse time with JSON:
+
+    python -m utils.checkpoint export saves/space_checkpoint.ckpt --output space.json
+    python -m utils.checkpoint import space.json saves/space_checkpoint.ckpt
+    python -m utils.checkpoint bench
+"""
+import argparse
+import atexit
+import importlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from utils.sim import BIOMES
+
+MAGIC = b"CKPT"
+FORMAT_VERSION = 1
+
+# magic, format version, schema name, schema version, section count
+HEADER = struct.Struct("<4sH16sHH")
+# section name, record size, record count
+SECTION_HEADER = struct.Struct("<16sHI")
+
+# Journal log: magic, format version, CRC32 of the snapshot it applies to,
+# then one record per change: journal field, record index, new value.
+JOURNAL_MAGIC = b"CKJL"
+JOURNAL_HEADER = struct.Struct("<4sHI")
+JOURNAL_RECORD = struct.Struct("<BHf")
+# Changes logged before a Journal folds them into a new snapshot.
+MAX_DELTAS = 256
+
+# How long the writer waits after the first save of a burst before writing,
+# so saves issued in the same tick (or the next few) become one write.
+COALESCE_DELAY = 0.05
+
+_REMOVE = object()
+
+
+class _Append:
+    """Pending bytes to add to the end of a file rather than replace it."""
+    __slots__ = ("chunks",)
+
+    def __init__(self, data):
+        self.chunks = [data]
+
+
+class Schema:
+    """
+    Record layouts for one biome's checkpoint.
+
+    sections maps a section name to a list of (field, dtype) pairs, as taken
+    by np.dtype. Bump version whenever a layout changes; files written with
+    another version are rejected rather than misread. journal lists the
+    (section, field) pairs a Journal may log changes to; their order is part
+    of the layout too.
+    """
+    def __init__(self, name, version, journal=(), **sections):
+        self.name = name
+        self.version = version
+        self.sections = {section: np.dtype(fields) for section, fields in sections.items()}
+        self.journal = tuple(journal)
+
+    def pack(self, records):
+        """
+        Serializes records, a dict of section name -> structured array or
+        sequence of tuples in field order. Missing sections are written empty.
+        """
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, self.name.encode(), self.version, len(self.sections))]
+        for section, dtype in self.sections.items():
+            array = np.asarray(records.get(section, []), dtype)
+            parts.append(SECTION_HEADER.pack(section.encode(), dtype.itemsize, len(array)))
+            parts.append(array.tobytes())
+        return b"".join(parts)
+
+    def unpack(self, data):
+        """
+        Reads what pack() wrote and returns a dict of section name ->
+        read-only structured array. Raises ValueError if data is not a
+        checkpoint for this schema and version.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("checkpoint is truncated")
+        magic, format_version, name, version, count = HEADER.unpack_from(data)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError("not a checkpoint file, or written by an unsupported version")
+        name = name.rstrip(b"\0").decode()
+        if name != self.name or version != self.version:
+            raise ValueError(f"checkpoint is for {name} v{version}, expected {self.name} v{self.version}")
+        sections = {}
+        offset = HEADER.size
+        for _ in range(count):
+            if offset + SECTION_HEADER.size > len(data):
+                raise ValueError("checkpoint is truncated")
+            section, itemsize, records = SECTION_HEADER.unpack_from(data, offset)
+            section = section.rstrip(b"\0").decode()
+            offset += SECTION_HEADER.size
+            dtype = self.sections.get(section)
+            if dtype is None or dtype.itemsize != itemsize:
+                raise ValueError(f"checkpoint section {section!r} does not match the schema")
+            if offset + itemsize * records > len(data):
+                raise ValueError("checkpoint is truncated")
+            sections[section] = np.frombuffer(data, dtype, count=records, offset=offset)
+            offset += itemsize * records
+        for section, dtype in self.sections.items():
+            if section not in sections:
+                sections[section] = np.zeros(0, dtype)
+        return sections
+
+    def to_json(self, sections):
+        """Converts unpacked sections to plain lists of dicts, for reading or diffing."""
+        data = {"schema": self.name, "version": self.version}
+        for section, array in sections.items():
+            names = array.dtype.names
+            data[section] = [dict(zip(names, record)) for record in array.tolist()]
+        return data
+
+    def from_json(self, data):
+        """Inverse of to_json(): builds the sections from plain lists of dicts."""
+        if data.get("schema") != self.name or data.get("version") != self.version:
+            raise ValueError(f"JSON is for {data.get('schema')} v{data.get('version')}, "
+                             f"expected {self.name} v{self.version}")
+        return {section: np.array([tuple(record[field] for field in dtype.names)
+                                   for record in data.get(section, [])], dtype)
+                for section, dtype in self.sections.items()}
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoint files on a background thread.
+
+    save() takes the file contents (bytes, a string, or a JSON-serializable
+    dict built from plain values) and returns immediately. Saves to a path
+    that is still pending replace the older one, so a burst of saves costs a
+    single write.
+    Every file is written next to its destination and renamed over it, so a
+    crash mid-write leaves the previous checkpoint intact.
+    """
+    def __init__(self, delay=COALESCE_DELAY):
+        self.delay = delay
+        self._pending = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def save(self, path, data):
+        self._submit(path, data)
+
+    def remove(self, path):
+        """Deletes the checkpoint at path once earlier saves to it are dropped."""
+        self._submit(path, _REMOVE)
+
+    def append(self, path, data):
+        """Adds data to the end of path, after whatever is already pending for it."""
+        with self._cond:
+            item = self._pending.get(path)
+            if isinstance(item, _Append):
+                item.chunks.append(data)
+                return
+            self._submit(path, _Append(data) if item is None else
+                         data if item is _REMOVE else item + data)
+
+    def _submit(self, path, item):
+        with self._cond:
+            self._pending[path] = item
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self):
+        """Blocks until every save submitted so far is on disk."""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.delay)
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                self._busy = True
+            for path, item in batch.items():
+                try:
+                    if item is _REMOVE:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    elif isinstance(item, _Append):
+                        with open(path, "ab") as f:
+                            f.write(b"".join(item.chunks))
+                            f.flush()
+                            os.fsync(f.fileno())
+                    else:
+                        write_atomic(path, item if isinstance(item, (str, bytes)) else json.dumps(item))
+                except OSError as e:
+                    print("Error saving checkpoint:", e)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+def write_atomic(path, text):
+    """Writes text (or bytes) to a temporary file beside path and renames it into place."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb" if isinstance(text, bytes) else "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+writer = CheckpointWriter()
+# The writer thread is a daemon; make sure the last checkpoint lands before exit.
+atexit.register(writer.flush)
+
+flush = writer.flush
+
+
+def journal_path(path):
+    return f"{path}.log"
+
+
+def save(path, schema, records):
+    """
+    Packs records with schema now and writes them to path in the background.
+    A journal logged against the previous checkpoint no longer applies.
+    """
+    writer.save(path, schema.pack(records))
+
+
+def remove(path):
+    """Deletes the checkpoint at path and its journal."""
+    writer.remove(path)
+    writer.remove(journal_path(path))
+
+
+def load(path, schema):
+    """
+    Waits for pending writes, then reads the checkpoint at path and replays
+    its journal over it. Raises OSError if there is none and ValueError if
+    it does not match schema.
+    """
+    flush()
+    with open(path, "rb") as f:
+        data = f.read()
+    sections = schema.unpack(data)
+    try:
+        with open(journal_path(path), "rb") as f:
+            log = f.read()
+    except OSError:
+        return sections
+    if len(log) < JOURNAL_HEADER.size:
+        return sections
+    magic, format_version, crc = JOURNAL_HEADER.unpack_from(log)
+    if magic != JOURNAL_MAGIC or format_version != FORMAT_VERSION or crc != zlib.crc32(data):
+        # Logged against an older snapshot, whose changes this one already holds.
+        return sections
+    sections = {section: array.copy() for section, array in sections.items()}
+    # A record cut short by a crash mid-append is dropped.
+    count = (len(log) - JOURNAL_HEADER.size) // JOURNAL_RECORD.size
+    records = log[JOURNAL_HEADER.size:JOURNAL_HEADER.size + count * JOURNAL_RECORD.size]
+    for field_id, index, value in JOURNAL_RECORD.iter_unpack(records):
+        section, field = schema.journal[field_id]
+        sections[section][field][index] = value
+    return sections
+
+
+class Journal:
+    """
+    Keeps a checkpoint up to date by logging changes instead of rewriting it.
+
+    track() is given the current value of a journaled field (one of
+    schema.journal). The first value seen for a field is its baseline; after
+    that, a different value appends a 7-byte record to the log. Nothing is
+    written until something changes: the first change writes a full snapshot
+    from source(), a callable returning checkpoint records. After max_deltas
+    changes, or when compact() is called, a new snapshot is taken the same
+    way and the log starts over against it.
+    """
+    def __init__(self, path, schema, source, max_deltas=MAX_DELTAS):
+        self.path = path
+        self.log_path = journal_path(path)
+        self.schema = schema
+        self.source = source
+        self.max_deltas = max_deltas
+        self.field_ids = {field: i for i, field in enumerate(schema.journal)}
+        self.values = {}  # last value tracked for each (section, field, index)
+        self.has_snapshot = False
+        self.deltas = 0
+
+    def track(self, section, field, index, value):
+        key = (section, field, index)
+        if key not in self.values:
+            self.values[key] = value
+            return
+        if self.values[key] == value:
+            return
+        self.values[key] = value
+        if not self.has_snapshot:
+            self.compact()
+            return
+        writer.append(self.log_path, JOURNAL_RECORD.pack(self.field_ids[section, field], index, value))
+        self.deltas += 1
+        if self.deltas >= self.max_deltas:
+            self.compact()
+
+    def compact(self):
+        """Writes a full snapshot of the current state and starts a new log against it."""
+        data = self.schema.pack(self.source())
+        writer.save(self.path, data)
+        writer.save(self.log_path, JOURNAL_HEADER.pack(JOURNAL_MAGIC, FORMAT_VERSION, zlib.crc32(data)))
+        sections = self.schema.unpack(data)
+        self.values = {(section, field, index): value
+                       for section, field in self.schema.journal
+                       for index, value in enumerate(sections[section][field].tolist())}
+        self.has_snapshot = True
+        self.deltas = 0
+
+    def close(self):
+        """Folds any logged changes into the snapshot."""
+        if self.deltas:
+            self.compact()
+
+
+def biome_schema(name):
+    return importlib.import_module(f"biomes.{name}.{name}").CHECKPOINT_SCHEMA
+
+
+def read_schema(path):
+    """
+    Returns the schema a checkpoint file was written with, found by importing
+    the biome it names.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or header[:4] != MAGIC:
+        raise ValueError(f"{path} is not a checkpoint file")
+    return biome_schema(HEADER.unpack(header)[2].rstrip(b"\0").decode())
+
+
+def export_json(path):
+    """Returns the checkpoint at path as JSON text."""
+    schema = read_schema(path)
+    return json.dumps(schema.to_json(load(path, schema)), indent=2)
+
+
+def import_json(text, path):
+    """Writes the JSON produced by export_json() (possibly edited) to path as a checkpoint."""
+    data = json.loads(text)
+    schema = biome_schema(data["schema"])
+    write_atomic(path, schema.pack(schema.from_json(data)))
+
+
+def benchmark(biomes, repeat):
+    """
+    Compares each biome's checkpoint with the same state exported as JSON:
+    file size, and time to parse it (np.frombuffer against json.loads).
+    """
+    for biome in biomes:
+        module = importlib.import_module(f"biomes.{biome}.{biome}")
+        schema = module.CHECKPOINT_SCHEMA
+        sim = module.create_simulation(autosave=False)
+        data = schema.pack(sim.checkpoint_records())
+        text = json.dumps(schema.to_json(schema.unpack(data)))
+        timings = []
+        for parse, payload in ((schema.unpack, data), (json.loads, text)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parse(payload)
+            timings.append((time.perf_counter() - start) / repeat * 1e6)
+        print(f"{biome}: binary {len(data)} B, {timings[0]:.1f} us to parse; "
+              f"JSON {len(text)} B, {timings[1]:.1f} us to parse")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect checkpoint files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="print a checkpoint as JSON")
+    export.add_argument("path")
+    export.add_argument("--output", help="write the JSON here instead of printing it")
+    import_ = commands.add_parser("import", help="write a checkpoint from exported JSON")
+    import_.add_argument("json_path")
+    import_.add_argument("path")
+    bench = commands.add_parser("bench", help="compare size and parse time with JSON")
+    bench.add_argument("biomes", nargs="*", default=list(BIOMES))
+    bench.add_argument("--repeat", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        text = export_json(args.path)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text)
+        else:
+            print(text)
+    elif args.command == "import":
+        with open(args.json_path) as f:
+            import_json(f.read(), args.path)
+    else:
+        benchmark(args.biomes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
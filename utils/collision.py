@@ -0,0 +1,65 @@
+import math
+
+
+class SpatialHash:
+    """
+    Uniform grid that buckets axis-aligned boxes by the cells they overlap.
+
+    Items are small ints (usually indices into a list of entities); query()
+    returns the ones whose cells overlap a box, in ascending order, so callers
+    visit candidates in the same order as a full scan would. Grids are built
+    once from boxes that do not change, such as a platform's whole travel
+    (see platform_box), so items are only ever inserted.
+    """
+    def __init__(self, cell_size=0.25):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def span(self, left, bottom, right, top):
+        size = self.cell_size
+        return (math.floor(left / size), math.floor(bottom / size),
+                math.floor(right / size), math.floor(top / size))
+
+    def insert(self, item, left, bottom, right, top):
+        cx0, cy0, cx1, cy1 = self.span(left, bottom, right, top)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def clear(self):
+        self.cells.clear()
+
+    def query(self, left, bottom, right, top):
+        """Returns the items bucketed in any cell the box overlaps, sorted."""
+        cx0, cy0, cx1, cy1 = self.span(left, bottom, right, top)
+        cells = self.cells
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+
+def platform_box(plat, margin=0.05):
+    """
+    Bounds of everywhere a bouncing platform can be: its width across, and
+    from the bottom to the top of its travel between lower_bound and
+    upper_bound (or its current position, if that is outside them).
+    """
+    half = plat.width / 2
+    return (plat.x - half, min(plat.y, plat.lower_bound) - margin,
+            plat.x + half, max(plat.y, plat.upper_bound) + plat.height + margin)
+
+
+def closes(gap_before, gap_after, tolerance):
+    """
+    Swept contact test along one axis. A gap is the distance from a surface
+    to whatever approaches it, positive while they are apart; given the gap
+    before and after a tick's motion (of either side), returns True if it
+    closed to within tolerance at any point in between, no matter how far
+    the tick moved. Sampling only gap_after misses contacts whenever a tick
+    moves further than tolerance.
+    """
+    return gap_before > -tolerance and gap_after < tolerance
@@ -0,0 +1,124 @@
+import io
+import os
+import threading
+import pygame
+from utils.bundle import bundled
+from utils.gpu import tracker, CONTEXT_SCENE
+from utils.text import get_atlas
+
+# Fonts are opened once per process and kept: a scene asking for a font
+# another scene already used gets the same Font object, with its glyph atlas
+# already baked. Names are resolved once too, bundled fonts first. A family
+# name that is not bundled makes pygame scan the system's fonts, which can
+# take a while; prewarm_fonts does that on a background thread. Nothing here
+# touches pygame or GL on import.
+
+FONT_DIR = "assets/fonts"
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+_bundled = None  # normalized file name -> path, for every font in FONT_DIR
+_paths = {}      # name as asked for -> font file, or None for pygame's default
+_fonts = {}      # (font file, size) -> pygame.font.Font
+_pending = set()  # names handed to a background thread to resolve
+# Held while pygame scans the system's fonts, so a name is only looked up
+# once even if the main thread asks for it while a background scan runs.
+_scan_lock = threading.Lock()
+
+
+def _normalize(name):
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def _bundled_fonts():
+    global _bundled
+    if _bundled is None:
+        _bundled = {}
+        if os.path.isdir(FONT_DIR):
+            for filename in sorted(os.listdir(FONT_DIR)):
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() in FONT_EXTENSIONS:
+                    _bundled[_normalize(stem)] = os.path.join(FONT_DIR, filename)
+    return _bundled
+
+
+def _local_font(name):
+    """The file a name refers to without scanning the system's fonts, or None."""
+    if name is None:
+        return None
+    if os.path.isfile(name):
+        return name
+    bundled = _bundled_fonts()
+    key = _normalize(os.path.splitext(os.path.basename(name))[0])
+    return bundled.get(key) or bundled.get(key + "regular")
+
+
+def _needs_scan(name):
+    return name is not None and name not in _paths and _local_font(name) is None
+
+
+def _match_system_font(name):
+    with _scan_lock:
+        if name not in _paths:
+            _paths[name] = pygame.font.match_font(name)
+        return _paths[name]
+
+
+def resolve_font(name):
+    """
+    Returns the font file a name refers to: the name itself if it is a font
+    file, else the bundled font in FONT_DIR with that name ("minecraft font",
+    "Bungee Spice"), else the installed font pygame matches for that family,
+    else None, meaning pygame's built-in default.
+    """
+    if name in _paths:
+        return _paths[name]
+    if _needs_scan(name):
+        return _match_system_font(name)
+    path = _paths[name] = _local_font(name)
+    return path
+
+
+def get_font(size, name=None):
+    """
+    Returns the shared Font for a font name or file (see resolve_font) at the
+    given size, opening it (from the asset bundle, if it has the file) and
+    baking its glyph atlas on first use. The atlas belongs to the GL context
+    rather than to the scene that happened to ask first, so a GL context must
+    be current.
+    """
+    path = resolve_font(name)
+    font = _fonts.get((path, size))
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        data = None if path is None else bundled("font", path)
+        try:
+            # pygame reads glyphs from the file as it needs them, so the
+            # bundled bytes are copied into a file object the font keeps.
+            font = pygame.font.Font(path if data is None else io.BytesIO(data), size)
+        except (OSError, pygame.error):
+            font = pygame.font.Font(None, size)
+        with tracker.scene(CONTEXT_SCENE):
+            get_atlas(font)
+        _fonts[path, size] = font
+    return font
+
+
+def prewarm_fonts(fonts):
+    """
+    Opens every (name, size) pair whose font file is already known, e.g.
+    while a menu waits for input. Names that need a system font scan are
+    resolved on a background thread instead, and opened by whichever later
+    call finds them resolved, so this never waits for a scan. Calling it
+    from each menu warms everything before a game starts.
+    """
+    scan = []
+    for name, size in fonts:
+        if not _needs_scan(name):
+            get_font(size, name)
+        elif name not in _pending:
+            _pending.add(name)
+            scan.append(name)
+    if scan:
+        threading.Thread(target=lambda: [_match_system_font(name) for name in scan],
+                         name="font-scan", daemon=True).start()
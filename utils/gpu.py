@@ -0,0 +1,90 @@
+import atexit
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Owner of objects created outside any scene (tools, benchmarks, tests).
+DEFAULT_SCENE = "app"
+# Owner of objects meant to live as long as the GL context, such as linked
+# shader programs; they are never reported as a scene's leaks.
+CONTEXT_SCENE = "context"
+
+
+class GPUTracker:
+    """
+    Live GL objects by category ("texture", "buffer", "vertex array",
+    "framebuffer", "program"), with their size in bytes and the scene that
+    created them.
+
+    Code that creates or deletes a GL object reports it here right next to
+    the GL call; that is a dict update, cheap enough to leave on all the time.
+    Sizes are what the game uploaded (buffer data, level 0 RGBA texels), not
+    what the driver actually allocates; programs and vertex arrays count as 0.
+    """
+    def __init__(self):
+        self.objects = {}  # (category, handle) -> [bytes, scene]
+        self._scenes = [DEFAULT_SCENE]
+
+    @property
+    def current_scene(self):
+        return self._scenes[-1]
+
+    @contextmanager
+    def scene(self, name):
+        """Attributes objects created inside the block to the named scene."""
+        self._scenes.append(name)
+        try:
+            yield
+        finally:
+            self._scenes.pop()
+
+    def created(self, category, handle, nbytes=0):
+        self.objects[category, int(handle)] = [nbytes, self.current_scene]
+
+    def resized(self, category, handle, nbytes):
+        entry = self.objects.get((category, int(handle)))
+        if entry is not None:
+            entry[0] = nbytes
+
+    def deleted(self, category, *handles):
+        for handle in handles:
+            self.objects.pop((category, int(handle)), None)
+
+    def totals(self, scene=None):
+        """Returns {(scene, category): [count, bytes]} for one scene, or for all of them."""
+        totals = defaultdict(lambda: [0, 0])
+        for (category, _), (nbytes, owner) in self.objects.items():
+            if scene is None or owner == scene:
+                entry = totals[owner, category]
+                entry[0] += 1
+                entry[1] += nbytes
+        return dict(totals)
+
+    def stats(self):
+        """Returns (live objects, bytes) across every scene."""
+        return len(self.objects), sum(nbytes for nbytes, _ in self.objects.values())
+
+    def report(self, scene=None, title="Live GL objects"):
+        """Formats totals() as a table, or returns "" if there is nothing to report."""
+        totals = self.totals(scene)
+        if not totals:
+            return ""
+        lines = [f"{title}:"]
+        for (owner, category), (count, nbytes) in sorted(totals.items()):
+            lines.append(f"  {owner:<20} {category:<13} {count:>5} {nbytes / 1024:>10.1f} KB")
+        return "\n".join(lines)
+
+    def check_scene(self, scene):
+        """Prints what a scene that just exited left behind, if anything."""
+        report = self.report(scene, f"GL objects left behind by scene '{scene}'")
+        if report:
+            print(report)
+
+
+tracker = GPUTracker()
+
+
+@atexit.register
+def _report_at_exit():
+    report = tracker.report(title="GL objects alive at exit")
+    if report:
+        print(report)
@@ -1,26 +1,227 @@
 import OpenGL.GL as gl
 import ctypes
-from OpenGL.GL.shaders import compileShader, compileProgram
+import hashlib
+import os
+import struct
+import pygame
+import numpy as np
+from OpenGL.GL.shaders import compileShader
+from utils.bundle import bundled
+from utils.gpu import tracker, CONTEXT_SCENE
+
+# (vertex, fragment) source files of the program the biomes draw with.
+INSTANCED_SHADER = ("assets/shaders/instanced.vert", "assets/shaders/default.frag")
+
+# Linked programs are saved here, one file per set of sources and driver, so
+# later runs load them with glProgramBinary instead of compiling. The driver
+# rejects binaries it can no longer use; those are simply compiled again.
+SHADER_CACHE_DIR = os.path.join(".cache", "shaders")
+PROGRAM_BINARY_MAGIC = b"PBIN"
+PROGRAM_BINARY_HEADER = struct.Struct("<4sI")  # magic, binary format
+
+def _program_binaries_supported():
+    return (bool(gl.glGetProgramBinary) and bool(gl.glProgramBinary)
+            and gl.glGetIntegerv(gl.GL_NUM_PROGRAM_BINARY_FORMATS) > 0)
+
+def _program_cache_path(cache_dir, vertex_src, fragment_src):
+    digest = hashlib.sha256()
+    for name in (gl.GL_VENDOR, gl.GL_RENDERER, gl.GL_VERSION):
+        digest.update((gl.glGetString(name) or b"") + b"\0")
+    for src in (vertex_src, fragment_src):
+        digest.update(src.encode() + b"\0")
+    return os.path.join(cache_dir, digest.hexdigest() + ".bin")
+
+def _link_program(vertex_src, fragment_src, retrievable):
+    shaders = [compileShader(vertex_src, gl.GL_VERTEX_SHADER),
+               compileShader(fragment_src, gl.GL_FRAGMENT_SHADER)]
+    program = gl.glCreateProgram()
+    for shader in shaders:
+        gl.glAttachShader(program, shader)
+    if retrievable:
+        gl.glProgramParameteri(program, gl.GL_PROGRAM_BINARY_RETRIEVABLE_HINT, gl.GL_TRUE)
+    gl.glLinkProgram(program)
+    for shader in shaders:
+        gl.glDetachShader(program, shader)
+        gl.glDeleteShader(shader)
+    if gl.glGetProgramiv(program, gl.GL_LINK_STATUS) != gl.GL_TRUE:
+        log = gl.glGetProgramInfoLog(program)
+        gl.glDeleteProgram(program)
+        raise RuntimeError(f"Shader link failure: {log}")
+    return program
+
+def _load_program_binary(path):
+    """Returns a program restored from a saved binary, or None if there is no usable one."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) <= PROGRAM_BINARY_HEADER.size:
+        return None
+    magic, binary_format = PROGRAM_BINARY_HEADER.unpack_from(data)
+    if magic != PROGRAM_BINARY_MAGIC:
+        return None
+    binary = np.frombuffer(data, dtype=np.uint8, offset=PROGRAM_BINARY_HEADER.size)
+    program = gl.glCreateProgram()
+    # Drivers reject a stale or foreign binary either by failing the link or
+    # by raising; both are a miss, and the file is dropped so it is not tried
+    # again before the recompiled program replaces it.
+    try:
+        gl.glProgramBinary(program, binary_format, binary, len(binary))
+        linked = gl.glGetProgramiv(program, gl.GL_LINK_STATUS) == gl.GL_TRUE
+    except gl.GLError:
+        linked = False
+    if not linked:
+        gl.glDeleteProgram(program)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return program
+
+def _save_program_binary(program, path):
+    size = gl.glGetProgramiv(program, gl.GL_PROGRAM_BINARY_LENGTH)
+    if not size:
+        return
+    binary = np.empty(size, dtype=np.uint8)
+    length = gl.GLsizei(0)
+    binary_format = gl.GLenum(0)
+    gl.glGetProgramBinary(program, size, ctypes.byref(length), ctypes.byref(binary_format), binary)
+    # A missing or read-only cache only costs a compile next time.
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(PROGRAM_BINARY_HEADER.pack(PROGRAM_BINARY_MAGIC, binary_format.value))
+            f.write(binary[:length.value].tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
 
 class Shader:
-    def __init__(self, vertex_src, fragment_src):
+    def __init__(self, vertex_src, fragment_src, cache_dir=SHADER_CACHE_DIR):
         """
-        Compiles and links a shader program from the given vertex and fragment shader source strings.
+        Links a shader program from the given vertex and fragment shader source strings.
+        If the driver supports program binaries, a binary saved in cache_dir for the same
+        sources is loaded instead of compiling, and a freshly linked program is saved
+        there; from_cache tells which happened. Pass cache_dir=None to always compile.
         """
-        self.ID = compileProgram(
-            compileShader(vertex_src, gl.GL_VERTEX_SHADER),
-            compileShader(fragment_src, gl.GL_FRAGMENT_SHADER)
-        )
+        self._uniforms = {}
+        self.from_cache = False
+        cache_path = None
+        if cache_dir is not None and _program_binaries_supported():
+            cache_path = _program_cache_path(cache_dir, vertex_src, fragment_src)
+            program = _load_program_binary(cache_path)
+            if program is not None:
+                self.ID = program
+                self.from_cache = True
+                tracker.created("program", self.ID)
+                return
+        self.ID = _link_program(vertex_src, fragment_src, retrievable=cache_path is not None)
+        tracker.created("program", self.ID)
+        if cache_path is not None:
+            _save_program_binary(self.ID, cache_path)
     
     def use(self):
         gl.glUseProgram(self.ID)
+
+    def uniform(self, name):
+        """Returns the location of a uniform, querying GL only the first time."""
+        location = self._uniforms.get(name)
+        if location is None:
+            location = self._uniforms[name] = gl.glGetUniformLocation(self.ID, name)
+        return location
     
     def delete(self):
         gl.glDeleteProgram(self.ID)
+        tracker.deleted("program", self.ID)
+
+_programs = {}  # (context generation, vertex path, fragment path) -> Shader
+# Counts the GL contexts the game has created; WindowManager calls
+# new_context() right after making one.
+_context_generation = 0
+
+def new_context():
+    """
+    Starts a new context generation. Programs linked in earlier contexts went
+    away with them, so they are forgotten and linked again on next use.
+    """
+    global _context_generation
+    _context_generation += 1
+    for shader in _programs.values():
+        tracker.deleted("program", shader.ID)
+    _programs.clear()
+
+def _read_shader_source(path):
+    source = bundled("shader", path)
+    if source is not None:
+        return str(source, "utf-8")
+    with open(path, 'r') as f:
+        return f.read()
+
+def load_shader(vertex_path, fragment_path):
+    """
+    Returns the program linked from two shader source files, read from the
+    asset bundle when it has them. Each program is read and linked once per GL
+    context (see new_context) and shared for as long as the context lives, so
+    callers must not delete it.
+    """
+    key = (_context_generation, vertex_path, fragment_path)
+    shader = _programs.get(key)
+    if shader is None:
+        vertex_src, fragment_src = (_read_shader_source(path)
+                                    for path in (vertex_path, fragment_path))
+        with tracker.scene(CONTEXT_SCENE):
+            shader = Shader(vertex_src, fragment_src)
+        _programs[key] = shader
+    return shader
+
+def surface_pixels(surface):
+    """Returns a surface's pixels as an (height, width, 4) RGBA array, bottom row first."""
+    width, height = surface.get_size()
+    data = pygame.image.tostring(surface, "RGBA", True)
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+
+class Texture:
+    def __init__(self, source, mipmaps=False):
+        """
+        Uploads a pygame surface, flipped so v runs bottom-up, or an array from
+        surface_pixels as an RGBA texture. With mipmaps, the smaller levels are
+        generated too, which costs a third more memory and only helps if the
+        texture is drawn smaller than it is.
+        """
+        pixels = surface_pixels(source) if isinstance(source, pygame.Surface) else source
+        self.height, self.width = pixels.shape[:2]
+        self.ID = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.ID)
+        min_filter = gl.GL_LINEAR_MIPMAP_LINEAR if mipmaps else gl.GL_LINEAR
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, min_filter)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, self.width, self.height,
+                        0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, np.ascontiguousarray(pixels))
+        nbytes = self.width * self.height * 4
+        if mipmaps:
+            gl.glGenerateMipmap(gl.GL_TEXTURE_2D)
+            nbytes = nbytes * 4 // 3
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        tracker.created("texture", self.ID, nbytes)
+
+    def bind(self):
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.ID)
+
+    def unbind(self):
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
+    def delete(self):
+        gl.glDeleteTextures([self.ID])
+        tracker.deleted("texture", self.ID)
 
 class VAO:
     def __init__(self):
         self.ID = gl.glGenVertexArrays(1)
+        tracker.created("vertex array", self.ID)
     
     def bind(self):
         gl.glBindVertexArray(self.ID)
@@ -36,12 +237,14 @@ class VAO:
     
     def delete(self):
         gl.glDeleteVertexArrays(1, [self.ID])
+        tracker.deleted("vertex array", self.ID)
 
 class VBO:
     def __init__(self, data):
         self.ID = gl.glGenBuffers(1)
         gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.ID)
         gl.glBufferData(gl.GL_ARRAY_BUFFER, data.nbytes, data, gl.GL_STATIC_DRAW)
+        tracker.created("buffer", self.ID, data.nbytes)
     
     def bind(self):
         gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.ID)
@@ -51,12 +254,14 @@ class VBO:
     
     def delete(self):
         gl.glDeleteBuffers(1, [self.ID])
+        tracker.deleted("buffer", self.ID)
 
 class EBO:
     def __init__(self, indices):
         self.ID = gl.glGenBuffers(1)
         gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.ID)
         gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, gl.GL_STATIC_DRAW)
+        tracker.created("buffer", self.ID, indices.nbytes)
     
     def bind(self):
         gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.ID)
@@ -66,3 +271,73 @@ class EBO:
     
     def delete(self):
         gl.glDeleteBuffers(1, [self.ID])
+        tracker.deleted("buffer", self.ID)
+
+# Per-instance record: offset.xy, scale.xy, color.rgb
+INSTANCE_FLOATS = 7
+INSTANCE_STRIDE = INSTANCE_FLOATS * ctypes.sizeof(ctypes.c_float)
+
+class InstancedRenderer:
+    """
+    Collects (offset, scale, color) instances per mesh and draws each mesh with a
+    single glDrawElementsInstanced call. A mesh is the (vao, count) pair returned
+    by create_object or acquire_mesh; its vertex colors are multiplied by the instance color.
+    All instances of a flush are streamed to the GPU as one contiguous array.
+    The shader comes from load_shader and belongs to the GL context, which
+    frees it; neither the renderer nor its caller deletes it.
+    """
+    def __init__(self, shader):
+        self.shader = shader
+        self.instance_vbo = gl.glGenBuffers(1)
+        tracker.created("buffer", self.instance_vbo)
+        self._buffer_bytes = 0
+        self._batches = {}
+
+    def submit(self, mesh, x, y, sx=1.0, sy=1.0, color=(1.0, 1.0, 1.0)):
+        """Queues one instance of mesh at (x, y) scaled by (sx, sy)."""
+        self._batches.setdefault(mesh, []).append((x, y, sx, sy, color[0], color[1], color[2]))
+
+    def submit_many(self, mesh, instances):
+        """Queues an (n, 7) float32 array of instance records for mesh."""
+        if len(instances):
+            self._batches.setdefault(mesh, []).append(instances)
+
+    def flush(self):
+        """Draws everything queued since the last flush, one draw call per mesh."""
+        if not self._batches:
+            return
+        groups = []
+        for mesh, items in self._batches.items():
+            rows = [item for item in items if isinstance(item, tuple)]
+            arrays = [item for item in items if not isinstance(item, tuple)]
+            if rows:
+                arrays.insert(0, np.array(rows, dtype=np.float32))
+            groups.append((mesh, arrays[0] if len(arrays) == 1 else np.concatenate(arrays)))
+        self._batches.clear()
+        data = np.ascontiguousarray(np.concatenate([g[1] for g in groups]), dtype=np.float32)
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.instance_vbo)
+        if data.nbytes > self._buffer_bytes:
+            self._buffer_bytes = max(data.nbytes, 2 * self._buffer_bytes)
+            gl.glBufferData(gl.GL_ARRAY_BUFFER, self._buffer_bytes, None, gl.GL_STREAM_DRAW)
+            tracker.resized("buffer", self.instance_vbo, self._buffer_bytes)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, data.nbytes, data)
+
+        self.shader.use()
+        first = 0
+        for (vao, count), instances in groups:
+            gl.glBindVertexArray(vao)
+            base = first * INSTANCE_STRIDE
+            for location, size, offset in ((2, 2, 0), (3, 2, 2), (4, 3, 4)):
+                gl.glVertexAttribPointer(location, size, gl.GL_FLOAT, gl.GL_FALSE, INSTANCE_STRIDE,
+                                         ctypes.c_void_p(base + offset * ctypes.sizeof(ctypes.c_float)))
+                gl.glVertexAttribDivisor(location, 1)
+                gl.glEnableVertexAttribArray(location)
+            gl.glDrawElementsInstanced(gl.GL_TRIANGLES, count, gl.GL_UNSIGNED_INT, None, len(instances))
+            first += len(instances)
+        gl.glBindVertexArray(0)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    def delete(self):
+        gl.glDeleteBuffers(1, [self.instance_vbo])
+        tracker.deleted("buffer", self.instance_vbo)
@@ -0,0 +1,112 @@
+import OpenGL.GL as gl
+from utils.text import TextBatch, text_size
+from utils.gpu import tracker
+
+HEALTH_BAR_WIDTH = 200
+
+
+class HUD:
+    """
+    Retained HUD layer for the biomes.
+
+    Lives, the health bar, the key counter and an optional bottom prompt are
+    composed into an offscreen texture only when one of those values changes.
+    Every other frame the cached texture is drawn as a single textured quad.
+    Expects the caller to have set up an orthographic pixel projection.
+    """
+    def __init__(self, wm, font_obj, top_offset=40, keys_total=3):
+        self.width = wm.width
+        self.height = wm.height
+        self.font = font_obj
+        self.top_offset = top_offset
+        self.keys_total = keys_total
+        self._state = None
+        self._dirty = True
+
+        self.texture = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.texture)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, self.width, self.height,
+                        0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
+        self.fbo = gl.glGenFramebuffers(1)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.fbo)
+        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0,
+                                  gl.GL_TEXTURE_2D, self.texture, 0)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        tracker.created("texture", self.texture, self.width * self.height * 4)
+        tracker.created("framebuffer", self.fbo)
+
+    def update(self, lives, health, max_health, keys_collected, prompt=None):
+        """Records the current values; the layer is recomposed only if any of them changed."""
+        state = (lives, health, max_health, keys_collected, prompt)
+        if state != self._state:
+            self._state = state
+            self._dirty = True
+
+    def _compose(self):
+        lives, health, max_health, keys_collected, prompt = self._state
+        top = self.height - self.top_offset
+
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.fbo)
+        gl.glViewport(0, 0, self.width, self.height)
+        gl.glClearColor(0.0, 0.0, 0.0, 0.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        gl.glDisable(gl.GL_BLEND)
+
+        gl.glColor3f(0.5, 0.5, 0.5)
+        gl.glBegin(gl.GL_QUADS)
+        gl.glVertex2f(20, top - 10)
+        gl.glVertex2f(20, top - 30)
+        gl.glVertex2f(20 + HEALTH_BAR_WIDTH, top - 30)
+        gl.glVertex2f(20 + HEALTH_BAR_WIDTH, top - 10)
+        gl.glEnd()
+        fill = HEALTH_BAR_WIDTH * max(0, health) / max_health
+        gl.glColor3f(1.0, 0.0, 0.0)
+        gl.glBegin(gl.GL_QUADS)
+        gl.glVertex2f(20, top - 10)
+        gl.glVertex2f(20, top - 30)
+        gl.glVertex2f(20 + fill, top - 30)
+        gl.glVertex2f(20 + fill, top - 10)
+        gl.glEnd()
+
+        batch = TextBatch()
+        batch.add(f"Lives: {'♥'*lives}", self.font, 20, top)
+        batch.add(f"Keys: {keys_collected}/{self.keys_total}", self.font, 20, top - 60)
+        if prompt:
+            prompt_width, _ = text_size(prompt, self.font)
+            batch.add(prompt, self.font, (self.width - prompt_width) // 2, 20)
+        batch.draw()
+
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        self._dirty = False
+
+    def draw(self):
+        """Draws the cached layer, recomposing it first if a value changed."""
+        if self._state is None:
+            return
+        if self._dirty:
+            self._compose()
+        gl.glEnable(gl.GL_BLEND)
+        # The layer was composed over transparent black, so it is premultiplied.
+        gl.glBlendFunc(gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glColor4f(1, 1, 1, 1)
+        gl.glEnable(gl.GL_TEXTURE_2D)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.texture)
+        gl.glBegin(gl.GL_QUADS)
+        gl.glTexCoord2f(0, 0); gl.glVertex2f(0, 0)
+        gl.glTexCoord2f(1, 0); gl.glVertex2f(self.width, 0)
+        gl.glTexCoord2f(1, 1); gl.glVertex2f(self.width, self.height)
+        gl.glTexCoord2f(0, 1); gl.glVertex2f(0, self.height)
+        gl.glEnd()
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glDisable(gl.GL_TEXTURE_2D)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+    def delete(self):
+        gl.glDeleteFramebuffers(1, [self.fbo])
+        gl.glDeleteTextures([self.texture])
+        tracker.deleted("framebuffer", self.fbo)
+        tracker.deleted("texture", self.texture)
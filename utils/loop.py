@@ -0,0 +1,41 @@
+# Game logic runs at this rate no matter how fast frames are drawn.
+TICK_RATE = 60
+# Longest stretch of real time simulated in one frame. Anything beyond it
+# (a stall, a window drag, the first frame after loading) is dropped instead
+# of being replayed as a burst of ticks.
+MAX_FRAME_TIME = 0.25
+
+
+class FixedTimestep:
+    """
+    Accumulator for running game logic in fixed-size ticks.
+
+    Each frame, advance() is given the real time that passed and returns how
+    many ticks of dt seconds to simulate. The leftover time is kept for the
+    next frame, and alpha tells the renderer how far it is between the last
+    two ticks so positions can be interpolated.
+    """
+    def __init__(self, tick_rate=TICK_RATE, max_frame_time=MAX_FRAME_TIME):
+        self.dt = 1.0 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Adds frame_time seconds and returns the number of ticks to run."""
+        self.accumulator += min(frame_time, self.max_frame_time)
+        ticks = int(self.accumulator / self.dt)
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        """Fraction of a tick elapsed since the last one, in [0, 1)."""
+        return self.accumulator / self.dt
+
+    def reset(self):
+        """Drops any accumulated time, e.g. while paused, so resuming does not fast-forward."""
+        self.accumulator = 0.0
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
@@ -0,0 +1,186 @@
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+
+class ProjectilePool:
+    """
+    Fixed-capacity store for short-lived projectiles such as asteroids and arrows.
+
+    Every slot is preallocated as one row across a set of NumPy arrays
+    (struct of arrays), so spawning a projectile writes into the next free row
+    and despawning swaps the last live row into the freed one. Both are O(1)
+    and neither allocates. Live projectiles always occupy rows [0, count).
+
+    Per-tick work is done on whole columns: integrate() moves every
+    projectile, circle_hits()/box_hits() test them all against the player,
+    and despawn_where() drops the rows a mask selects. Run
+    `python -m utils.pool` to compare that with a loop over the rows.
+    """
+    FIELDS = ("x", "y", "vx", "vy", "w", "h", "prev_x", "prev_y")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float32))
+        self._instances = np.zeros((capacity, 7), dtype=np.float32)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, vx, w, h, vy=0.0):
+        """Fills the next free slot and returns its index, or -1 if the pool is full."""
+        if self.count == self.capacity:
+            return -1
+        i = self.count
+        self.x[i] = x; self.y[i] = y
+        self.prev_x[i] = x; self.prev_y[i] = y
+        self.vx[i] = vx; self.vy[i] = vy
+        self.w[i] = w; self.h[i] = h
+        self.count += 1
+        return i
+
+    def despawn(self, i):
+        """
+        Frees slot i by moving the last live projectile into it. Walk the pool
+        from the back when despawning during iteration so no slot is skipped.
+        """
+        last = self.count - 1
+        if i != last:
+            for name in self.FIELDS:
+                column = getattr(self, name)
+                column[i] = column[last]
+        self.count = last
+
+    def despawn_where(self, mask):
+        """
+        Frees every live row where mask (a boolean array of length count) is
+        set, packing the survivors to the front in their current order.
+        """
+        keep = np.flatnonzero(~mask)
+        if len(keep) == self.count:
+            return
+        for name in self.FIELDS:
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self.count = len(keep)
+
+    def clear(self):
+        self.count = 0
+
+    def integrate(self, dt):
+        """Moves every live projectile by its velocity over dt seconds."""
+        n = self.count
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+
+    def circle_hits(self, x, y, radius):
+        """
+        Mask of the live projectiles that overlap a circle at (x, y), treating
+        each one as a circle of radius w.
+        """
+        n = self.count
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        reach = self.w[:n] + radius
+        return dx * dx + dy * dy < reach * reach
+
+    def box_hits(self, x, y, half_width, half_height):
+        """
+        Mask of the live projectiles whose w x h box overlaps the box centered
+        at (x, y) with the given half extents.
+        """
+        n = self.count
+        return ((np.abs(self.x[:n] - x) < half_width + self.w[:n] / 2) &
+                (np.abs(self.y[:n] - y) < half_height + self.h[:n] / 2))
+
+    def snapshot(self):
+        """Records the current positions as the previous tick's, for interpolation."""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def instances(self, color, mirror=False, alpha=1.0):
+        """
+        Returns the live projectiles as (n, 7) instance records for
+        InstancedRenderer.submit_many, placed alpha of the way from their
+        previous to their current position. With mirror=True the x scale takes
+        the sign of vx so directional meshes face the way they travel.
+        """
+        n = self.count
+        out = self._instances[:n]
+        out[:, 0] = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+        out[:, 1] = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+        out[:, 2] = self.w[:n]
+        if mirror:
+            out[:, 2] *= np.where(self.vx[:n] < 0, -1.0, 1.0)
+        out[:, 3] = self.h[:n]
+        out[:, 4:7] = color
+        return out
+
+
+def loop_tick(pool, dt, x, y, radius):
+    """The per-row version of one asteroid tick, kept for comparison."""
+    hits = 0
+    # Walk the pool backwards so despawning (swap with last) skips nothing.
+    for i in range(pool.count - 1, -1, -1):
+        pool.x[i] += pool.vx[i] * dt
+        pool.y[i] += pool.vy[i] * dt
+        if pool.x[i] + pool.w[i] < -1:
+            pool.despawn(i)
+        else:
+            dx = x - pool.x[i]
+            dy = y - pool.y[i]
+            if math.sqrt(dx*dx + dy*dy) < radius + pool.w[i]:
+                hits += 1
+                pool.despawn(i)
+    return hits
+
+
+def vector_tick(pool, dt, x, y, radius):
+    """One asteroid tick as the space biome runs it."""
+    pool.integrate(dt)
+    n = pool.count
+    pool.despawn_where(pool.x[:n] + pool.w[:n] < -1)
+    hits = pool.circle_hits(x, y, radius)
+    pool.despawn_where(hits)
+    return int(np.count_nonzero(hits))
+
+
+def benchmark(sizes, ticks, seed=1):
+    """
+    Times loop_tick() against vector_tick() on pools of each size, refilled
+    with the same seeded projectiles before every tick, and reports the
+    smallest size from which the vectorized tick is faster.
+    """
+    crossover = None
+    for size in sizes:
+        timings = []
+        for tick in (loop_tick, vector_tick):
+            rng = random.Random(seed)
+            pool = ProjectilePool(size)
+            elapsed = 0.0
+            for _ in range(ticks):
+                while pool.count < size:
+                    pool.spawn(rng.uniform(-1.0, 1.1), rng.uniform(-0.9, 0.9),
+                               -rng.uniform(0.1, 0.3), 0.05, 0.05)
+                start = time.perf_counter()
+                tick(pool, 1 / 60, 0.0, -0.8, 0.05)
+                elapsed += time.perf_counter() - start
+            timings.append(elapsed / ticks * 1e6)
+        if crossover is None and timings[1] < timings[0]:
+            crossover = size
+        print(f"{size:6d} projectiles: loop {timings[0]:8.1f} us, vectorized {timings[1]:6.1f} us")
+    print("Vectorized is faster from", crossover, "projectiles" if crossover else "(never)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-row and vectorized projectile ticks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 256, 1024, 4096])
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.ticks)
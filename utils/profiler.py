@@ -0,0 +1,240 @@
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import OpenGL.GL as gl
+from utils.text import TextBatch
+from utils.fonts import get_font
+from utils.gpu import tracker
+
+# Entry points that submit geometry. Immediate-mode glBegin/glEnd blocks count
+# as one draw each.
+DRAW_CALLS = frozenset((
+    "glBegin", "glDrawArrays", "glDrawElements",
+    "glDrawArraysInstanced", "glDrawElementsInstanced",
+))
+TEXTURE_UPLOADS = frozenset(("glTexImage2D", "glTexSubImage2D"))
+
+# Phases of a biome frame, in the order run_game_loop marks them.
+PHASES = ("events", "update", "world", "hud", "pause", "overlay", "swap")
+HISTORY = 120
+# The overlay text is rebuilt this often; every frame would be unreadable.
+REFRESH_INTERVAL = 0.25
+
+
+class GLCallCounter:
+    """
+    Counts calls to OpenGL entry points while installed.
+
+    Every gl* function in OpenGL.GL is replaced by a counting wrapper, both on
+    the module itself (for `gl.glFoo` lookups) and in the globals of every
+    loaded module that star-imported it. Each wrapped call costs one extra
+    Python call, so install it only when the numbers are wanted.
+    """
+    def __init__(self):
+        self.counts = Counter()
+        self._patched = []
+
+    @property
+    def installed(self):
+        return bool(self._patched)
+
+    def install(self):
+        if self._patched:
+            return
+        counts = self.counts
+        wrappers = {}
+        for name, func in vars(gl).items():
+            # Entry points the driver lacks are left alone: a wrapper would
+            # always be truthy and defeat `if gl.glFoo:` feature checks.
+            if name.startswith("gl") and callable(func) and func:
+                wrappers[id(func)] = (func, self._wrap(name, func, counts))
+        for module_name, module in list(sys.modules.items()):
+            # PyOpenGL's own modules call each other internally; patching them
+            # would count one game-side call several times.
+            if module_name.startswith("OpenGL") and module is not gl:
+                continue
+            namespace = getattr(module, "__dict__", None)
+            if namespace is None:
+                continue
+            for name, value in list(namespace.items()):
+                entry = wrappers.get(id(value))
+                if entry is not None and entry[0] is value:
+                    namespace[name] = entry[1]
+                    self._patched.append((namespace, name, value))
+
+    @staticmethod
+    def _wrap(name, func, counts):
+        def counted(*args, **kwargs):
+            counts[name] += 1
+            return func(*args, **kwargs)
+        counted.__name__ = name
+        counted.__wrapped__ = func
+        return counted
+
+    def uninstall(self):
+        for namespace, name, func in reversed(self._patched):
+            namespace[name] = func
+        self._patched.clear()
+
+    def take(self):
+        """Returns the counts since the last call and starts counting afresh."""
+        counts = Counter(self.counts)
+        self.counts.clear()
+        return counts
+
+
+def draw_calls(counts):
+    """Number of draw submissions in a Counter returned by GLCallCounter.take."""
+    return sum(counts[name] for name in DRAW_CALLS)
+
+
+def summarize(samples):
+    """Mean, p95, p99 and max of a sequence of timings, in the units given."""
+    values = np.asarray(samples, dtype=np.float64)
+    if not len(values):
+        return {"mean": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": float(values.mean()),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def texture_uploads(counts):
+    """Number of texture uploads in a Counter returned by GLCallCounter.take."""
+    return sum(counts[name] for name in TEXTURE_UPLOADS)
+
+
+# Shared by every FrameProfiler, so the F3 toggle survives a pause-menu restart
+# and nested game loops never wrap the GL functions twice.
+gl_counter = GLCallCounter()
+
+
+class FrameProfiler:
+    """
+    Rolling per-phase timings for a game loop, shown as an overlay on F3.
+
+    The loop calls begin_frame() once per frame and mark(phase) at the end of
+    each phase in PHASES. Times are the CPU time spent issuing each phase; GPU
+    work shows up in whichever phase waits on it, usually swap. While the
+    overlay is shown every GL call is counted, which costs a little itself, so
+    nothing is measured while it is hidden.
+    """
+    def __init__(self, wm, history=HISTORY):
+        self.wm = wm
+        self.font = get_font(16, "Consolas")
+        self._index = {phase: i for i, phase in enumerate(PHASES)}
+        # Columns: one per phase, then the whole frame, GL calls, draws, uploads.
+        self._samples = np.zeros((history, len(PHASES) + 4))
+        self._row = 0
+        self._filled = 0
+        self._frame_start = None
+        self._last = 0.0
+        self._lines = []
+        self._refreshed = 0.0
+        self.enabled = gl_counter.installed
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            gl_counter.install()
+            gl_counter.take()
+        else:
+            gl_counter.uninstall()
+        self._filled = 0
+        self._frame_start = None
+        self._lines = []
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            # Close the previous frame; its GL calls have all been made by now.
+            counts = gl_counter.take()
+            row = self._samples[self._row]
+            n = len(PHASES)
+            row[n] = (now - self._frame_start) * 1000.0
+            row[n + 1] = sum(counts.values())
+            row[n + 2] = draw_calls(counts)
+            row[n + 3] = texture_uploads(counts)
+            self._row = (self._row + 1) % len(self._samples)
+            self._filled = min(self._filled + 1, len(self._samples))
+        else:
+            gl_counter.take()
+        self._samples[self._row] = 0.0
+        self._frame_start = self._last = now
+
+    def mark(self, phase):
+        """Charges the time since the previous mark to `phase`."""
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self._samples[self._row, self._index[phase]] += (now - self._last) * 1000.0
+        self._last = now
+
+    def averages(self):
+        """Mean of each column over the recorded frames, keyed by name."""
+        names = (*PHASES, "frame", "gl_calls", "draw_calls", "texture_uploads")
+        if not self._filled:
+            return dict.fromkeys(names, 0.0)
+        return dict(zip(names, self._samples[:self._filled].mean(axis=0)))
+
+    @staticmethod
+    def _format(stats):
+        frame_ms = stats["frame"]
+        lines = [f"frame {frame_ms:6.2f} ms  {1000.0 / frame_ms if frame_ms else 0.0:5.0f} fps"]
+        lines += [f"{phase:<8}{stats[phase]:6.2f} ms" for phase in PHASES]
+        lines.append(f"GL calls {stats['gl_calls']:7.0f}")
+        lines.append(f"draws    {stats['draw_calls']:7.1f}")
+        lines.append(f"uploads  {stats['texture_uploads']:7.1f}")
+        objects, nbytes = tracker.stats()
+        lines.append(f"GL objs  {objects:7d} {nbytes / 1048576:6.2f} MB")
+        return lines
+
+    def draw(self):
+        """Draws the overlay in the top-right corner, if it is enabled."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if not self._lines or now - self._refreshed >= REFRESH_INTERVAL:
+            self._lines = self._format(self.averages())
+            self._refreshed = now
+        lines = self._lines
+
+        width, height = self.wm.width, self.wm.height
+        line_height = self.font.get_height()
+        box_width = 220
+        box_height = line_height * len(lines) + 10
+        left = width - box_width - 10
+        top = height - 10
+
+        gl.glUseProgram(0)
+        gl.glMatrixMode(gl.GL_PROJECTION)
+        gl.glPushMatrix()
+        gl.glLoadIdentity()
+        gl.glOrtho(0, width, 0, height, -1, 1)
+        gl.glMatrixMode(gl.GL_MODELVIEW)
+        gl.glPushMatrix()
+        gl.glLoadIdentity()
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glColor4f(0, 0, 0, 0.6)
+        gl.glBegin(gl.GL_QUADS)
+        gl.glVertex2f(left, top - box_height)
+        gl.glVertex2f(left + box_width, top - box_height)
+        gl.glVertex2f(left + box_width, top)
+        gl.glVertex2f(left, top)
+        gl.glEnd()
+        gl.glColor4f(1, 1, 1, 1)
+        batch = TextBatch()
+        for i, line in enumerate(lines):
+            batch.add(line, self.font, left + 5, top - 5 - (i + 1) * line_height, (200, 255, 200))
+        batch.draw()
+        gl.glPopMatrix()
+        gl.glMatrixMode(gl.GL_PROJECTION)
+        gl.glPopMatrix()
+        gl.glMatrixMode(gl.GL_MODELVIEW)
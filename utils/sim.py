@@ -0,0 +1,101 @@
+"""
+Headless simulation driver for the biomes.
+
+Each biome module exposes create_simulation(state_data=None, autosave=True),
+which returns an object with snapshot(), step(inputs, dt) and a result
+attribute ("win", "lose" or None). None of that touches pygame's display or
+OpenGL, so a biome can be run here for thousands of ticks without a window:
+
+    python -m utils.sim river --ticks 10000 --seed 1
+"""
+import argparse
+import importlib
+import random
+import time
+
+from utils.loop import TICK_RATE
+
+BIOMES = ("river", "space", "upside_down")
+
+
+class TickInput:
+    """
+    Player input for one simulation tick. left/right/up/down are held keys
+    (A/D/W/S); action is set when SPACE was pressed since the previous tick
+    (jump, or flip gravity in the upside-down biome).
+    """
+    __slots__ = ("left", "right", "up", "down", "action")
+
+    def __init__(self, left=False, right=False, up=False, down=False, action=False):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.action = action
+
+
+def read_keyboard(action=False):
+    """Builds a TickInput from the keys pygame currently reports as held."""
+    import pygame
+    pressed = pygame.key.get_pressed()
+    return TickInput(pressed[pygame.K_a], pressed[pygame.K_d],
+                     pressed[pygame.K_w], pressed[pygame.K_s], action)
+
+
+def random_script(seed=None, hold_ticks=20, action_chance=0.05):
+    """
+    Returns a script (tick, sim) -> TickInput that mashes keys at random,
+    holding each direction for hold_ticks. Reproducible for a given seed.
+    """
+    rng = random.Random(seed)
+    held = TickInput()
+
+    def script(tick, sim):
+        nonlocal held
+        if tick % hold_ticks == 0:
+            held = TickInput(rng.random() < 0.3, rng.random() < 0.5,
+                             rng.random() < 0.3, rng.random() < 0.3)
+        return TickInput(held.left, held.right, held.up, held.down,
+                         rng.random() < action_chance)
+    return script
+
+
+def run_headless(biome, ticks, seed=None, script=None, state_data=None, tick_rate=TICK_RATE):
+    """
+    Runs a biome for up to `ticks` fixed ticks of 1/tick_rate seconds with
+    scripted input and no window. Stops early once the game is won or lost.
+    Checkpoints are not written. Returns (simulation, ticks run).
+    """
+    module = importlib.import_module(f"biomes.{biome}.{biome}")
+    if seed is not None:
+        random.seed(seed)
+    if script is None:
+        script = random_script(seed)
+    sim = module.create_simulation(state_data, autosave=False)
+    dt = 1.0 / tick_rate
+    tick = 0
+    while tick < ticks and sim.result is None:
+        sim.snapshot()
+        sim.step(script(tick, sim), dt)
+        tick += 1
+    return sim, tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a biome's game logic without a window.")
+    parser.add_argument("biome", choices=BIOMES)
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE,
+                        help=f"ticks per simulated second (default {TICK_RATE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sim, ticks = run_headless(args.biome, args.ticks, seed=args.seed, tick_rate=args.tick_rate)
+    elapsed = time.perf_counter() - start
+    print(f"{args.biome}: {ticks} ticks in {elapsed:.3f}s "
+          f"({ticks / elapsed:.0f} ticks/s), result={sim.result}")
+
+
+if __name__ == "__main__":
+    main()
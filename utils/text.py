@@ -0,0 +1,195 @@
+import pygame
+import numpy as np
+import OpenGL.GL as gl
+from utils.gpu import tracker
+
+# Printable ASCII plus the heart used by the HUD. Anything else is added to the
+# atlas the first time it is drawn.
+DEFAULT_CHARSET = "".join(chr(c) for c in range(32, 127)) + "♥"
+
+ATLAS_MAX_WIDTH = 1024
+GLYPH_PADDING = 1
+# Layouts are cached per string; text that changes every frame (timers,
+# profiler readouts) would otherwise grow the cache without bound.
+LAYOUT_CACHE_SIZE = 512
+
+
+class GlyphAtlas:
+    """
+    Bakes every glyph of one pygame font into a single texture.
+    Strings are then laid out as quads that sample from that texture, so drawing
+    text never creates or uploads a texture per call.
+    """
+    def __init__(self, font_obj, charset=DEFAULT_CHARSET):
+        self._font = font_obj
+        self.texture = None
+        self.glyphs = {}
+        self.height = font_obj.get_height()
+        self._layouts = {}
+        self._build(charset)
+
+    def _build(self, charset):
+        surfaces = {}
+        font_obj = self._font
+        for ch in dict.fromkeys(charset):
+            surfaces[ch] = font_obj.render(ch, True, (255, 255, 255))
+
+        # Shelf-pack the glyphs left to right, wrapping at ATLAS_MAX_WIDTH.
+        placements = {}
+        x, y, atlas_width = 0, 0, 0
+        for ch, surf in surfaces.items():
+            w = surf.get_width()
+            if x + w + GLYPH_PADDING > ATLAS_MAX_WIDTH:
+                x = 0
+                y += self.height + GLYPH_PADDING
+            placements[ch] = (x, y)
+            x += w + GLYPH_PADDING
+            atlas_width = max(atlas_width, x)
+        atlas_height = y + self.height
+
+        atlas_surface = pygame.Surface((atlas_width, atlas_height), pygame.SRCALPHA)
+        atlas_surface.fill((0, 0, 0, 0))
+        self.glyphs = {}
+        for ch, surf in surfaces.items():
+            gx, gy = placements[ch]
+            # Glyphs never overlap, so MAX just copies them onto the cleared atlas.
+            atlas_surface.blit(surf, (gx, gy), special_flags=pygame.BLEND_RGBA_MAX)
+            w = surf.get_width()
+            # The atlas is uploaded flipped, so v runs bottom-up.
+            u0 = gx / atlas_width
+            u1 = (gx + w) / atlas_width
+            v0 = 1.0 - (gy + self.height) / atlas_height
+            v1 = 1.0 - gy / atlas_height
+            self.glyphs[ch] = (w, u0, v0, u1, v1)
+
+        atlas_data = pygame.image.tostring(atlas_surface, 'RGBA', True)
+        if self.texture is None:
+            self.texture = gl.glGenTextures(1)
+            tracker.created("texture", self.texture)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.texture)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, atlas_width, atlas_height,
+                        0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, atlas_data)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        tracker.resized("texture", self.texture, atlas_width * atlas_height * 4)
+        self._layouts.clear()
+
+    def _ensure_glyphs(self, text):
+        missing = [ch for ch in text if ch not in self.glyphs]
+        if missing:
+            self._build("".join(self.glyphs) + "".join(missing))
+
+    def size(self, text):
+        """Returns the (width, height) the string occupies when drawn from this atlas."""
+        self._ensure_glyphs(text)
+        return sum(self.glyphs[ch][0] for ch in text), self.height
+
+    def layout(self, text):
+        """
+        Returns (positions, texcoords) for the string with its bottom-left corner at
+        the origin, as (4 * len(text), 2) float32 arrays. Layouts are cached per string.
+        """
+        cached = self._layouts.get(text)
+        if cached is not None:
+            return cached
+        self._ensure_glyphs(text)
+        positions = np.empty((len(text) * 4, 2), dtype=np.float32)
+        texcoords = np.empty((len(text) * 4, 2), dtype=np.float32)
+        x = 0.0
+        h = self.height
+        for i, ch in enumerate(text):
+            w, u0, v0, u1, v1 = self.glyphs[ch]
+            positions[i*4:i*4+4] = ((x, 0), (x + w, 0), (x + w, h), (x, h))
+            texcoords[i*4:i*4+4] = ((u0, v0), (u1, v0), (u1, v1), (u0, v1))
+            x += w
+        if len(self._layouts) >= LAYOUT_CACHE_SIZE:
+            self._layouts.clear()
+        self._layouts[text] = (positions, texcoords)
+        return positions, texcoords
+
+
+# Fonts come from utils.fonts, which keeps them for the life of the process,
+# so their atlases are kept too and live as long as the GL context.
+_atlases = {}
+
+
+def get_atlas(font_obj):
+    """Returns the glyph atlas for a font, building it on first use."""
+    atlas = _atlases.get(font_obj)
+    if atlas is None:
+        atlas = _atlases[font_obj] = GlyphAtlas(font_obj)
+    return atlas
+
+
+def text_size(text, font_obj):
+    """Measures a string using the cached atlas instead of rasterizing it."""
+    return get_atlas(font_obj).size(text)
+
+
+class TextBatch:
+    """
+    Collects strings and draws them with one glDrawArrays call per font atlas.
+    Expects an orthographic pixel projection to be set up by the caller.
+    """
+    def __init__(self):
+        self._items = {}
+
+    def add(self, text, font_obj, pos_x, pos_y, color=(255, 255, 255)):
+        if not text:
+            return
+        atlas = get_atlas(font_obj)
+        # Adds any glyphs the atlas lacks now. That rebuilds the atlas and moves
+        # every glyph, so strings are only turned into quads in draw(), once
+        # nothing queued can change the atlas any more.
+        atlas.layout(text)
+        self._items.setdefault(atlas, []).append((text, pos_x, pos_y, color))
+
+    def draw(self):
+        if not self._items:
+            return
+        gl.glEnable(gl.GL_BLEND)
+        # Accumulate alpha as well so text composes correctly into transparent
+        # offscreen targets such as the cached HUD layer.
+        gl.glBlendFuncSeparate(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA,
+                               gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glEnable(gl.GL_TEXTURE_2D)
+        # The arrays below live in client memory; a VBO left bound by mesh
+        # creation would make GL read them as buffer offsets instead.
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+        for atlas, items in self._items.items():
+            layouts = [atlas.layout(text) for text, _, _, _ in items]
+            positions = np.concatenate([item_positions + (pos_x, pos_y)
+                                        for (item_positions, _), (_, pos_x, pos_y, _)
+                                        in zip(layouts, items)])
+            texcoords = np.concatenate([item_texcoords for _, item_texcoords in layouts])
+            colors = np.concatenate([
+                np.tile(np.array([*color[:3], 255], dtype=np.uint8), (len(item_positions), 1))
+                for (item_positions, _), (_, _, _, color) in zip(layouts, items)
+            ])
+            gl.glBindTexture(gl.GL_TEXTURE_2D, atlas.texture)
+            gl.glVertexPointer(2, gl.GL_FLOAT, 0, positions)
+            gl.glTexCoordPointer(2, gl.GL_FLOAT, 0, texcoords)
+            gl.glColorPointer(4, gl.GL_UNSIGNED_BYTE, 0, colors)
+            gl.glDrawArrays(gl.GL_QUADS, 0, len(positions))
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glDisable(gl.GL_TEXTURE_2D)
+        # Leave the current color white like the old per-string draw_text did.
+        gl.glColor4f(1, 1, 1, 1)
+        self._items.clear()
+
+
+def draw_text(text, font_obj, pos_x, pos_y, color=(255, 255, 255)):
+    """Draws text from the font's glyph atlas with its bottom-left corner at (pos_x, pos_y)."""
+    batch = TextBatch()
+    batch.add(text, font_obj, pos_x, pos_y, color)
+    batch.draw()
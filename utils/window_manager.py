@@ -1,12 +1,17 @@
 import pygame
 from pygame.locals import DOUBLEBUF, OPENGL, QUIT
+from utils.graphics import new_context
 
 class WindowManager:
-    def __init__(self, width, height, title="Game"):
+    def __init__(self, width, height, title="Game", max_fps=60):
         pygame.init()
         self.width = width
         self.height = height
+        # Frame cap for the render loops; 0 means uncapped. Game logic runs at a
+        # fixed tick rate regardless (see utils/loop.py).
+        self.max_fps = max_fps
         self.screen = pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL)
+        new_context()
         pygame.display.set_caption(title)
     
     def process_events(self, event_handler):